@@ -0,0 +1,116 @@
+# benchmarks/bench_analytics.py
+#
+# Cost of turning a collected window into newsletter aggregates. The multi-pass baseline is the
+# previous code path: a regex search per category for every commit and issue, plus the separate
+# contributor counts of generate_newsletter, app.get_top_contributors and DataProcessor. It is
+# timed against one analytics.analyze() pass over the same synthetic windows.
+#
+#   python benchmarks/bench_analytics.py --commits 100000,250000
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from analytics import analyze, summarize_groups, top_contributors
+
+WORDS = ("tensor", "cuda", "kernel", "update", "bump", "remove", "support", "test", "ci", "build", "dtype",
+         "shape", "memory", "graph", "compile", "export", "inductor", "dynamo", "fix", "add", "perf", "docs",
+         "refactor", "new", "cleanup", "improve", "readme", "issue")
+
+
+def make_window(commits, issues, seed=0):
+    rng = random.Random(seed)
+    authors = [f"dev{n}" for n in range(max(commits // 50, 1))]
+    sentence = lambda low, high: " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+    return {
+        "recent_commits": [{"commit": {"author": {"name": rng.choice(authors)},
+                                       "message": f"[{sentence(1, 2)}] {sentence(4, 12)}\n\n{sentence(10, 60)}"}}
+                           for _ in range(commits)],
+        "recent_issues": [{"title": sentence(4, 12), "state": rng.choice(("open", "closed"))} for _ in range(issues)],
+        "recent_pull_requests": [{"title": sentence(4, 12), "state": rng.choice(("open", "closed"))}
+                                 for _ in range(issues)],
+    }
+
+
+def categorize(items, rules, text):
+    groups = {name: [] for name, _ in rules}
+    groups["Other"] = []
+    for item in items:
+        value = text(item).lower()
+        name = next((name for name, pattern in rules if re.search(pattern, value)), "Other")
+        groups[name].append(text(item))
+    return groups
+
+
+def multi_pass(data):
+    commits, issues = data["recent_commits"], data["recent_issues"]
+    generator_contributors = Counter(c['commit']['author']['name'] for c in commits).most_common(5)
+    commit_groups = categorize(commits, [("Bug Fixes", r'fix|bug|issue'), ("Feature Additions", r'feat|add|new'),
+                                         ("Performance Improvements", r'perf|optimiz|improv'),
+                                         ("Documentation Updates", r'doc|readme'),
+                                         ("Refactoring", r'refactor|clean|reorganiz')],
+                               lambda c: c['commit']['message'])
+    issue_groups = categorize(issues, [("Critical Bugs", r'critical|urgent|important|severe'),
+                                       ("Feature Requests", r'feature|request|enhancement'),
+                                       ("Performance Issues", r'performance|slow|optimization'),
+                                       ("Documentation Needs", r'doc|readme|tutorial')],
+                              lambda i: i['title'])
+    app_contributors = {}
+    for commit in commits:
+        author = commit['commit']['author']['name']
+        app_contributors[author] = app_contributors.get(author, 0) + 1
+    processor_contributors = {}
+    for commit in commits:
+        if isinstance(commit, dict) and "commit" in commit:
+            author = commit["commit"].get("author", {}).get("name", "Unknown")
+            processor_contributors[author] = processor_contributors.get(author, 0) + 1
+    open_issues = len([i for i in issues if isinstance(i, dict) and i.get("state") == "open"])
+    closed_issues = len([i for i in issues if isinstance(i, dict) and i.get("state") == "closed"])
+    return ({name: len(items) for name, items in commit_groups.items() if items},
+            {name: len(items) for name, items in issue_groups.items() if items},
+            generator_contributors, open_issues, closed_issues)
+
+
+def single_pass(data):
+    analytics = analyze(data)
+    summarize_groups(analytics["commit_categories"], "commits")
+    summarize_groups(analytics["issue_themes"], "issues")
+    return ({name: group["count"] for name, group in analytics["commit_categories"].items()},
+            {name: group["count"] for name, group in analytics["issue_themes"].items()},
+            top_contributors(analytics, 5), analytics["open_issue_count"], analytics["closed_issue_count"])
+
+
+def best_of(fn, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(data)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-pass vs single-pass window analytics")
+    parser.add_argument("--commits", default="100000,250000", help="Comma-separated window sizes in commits")
+    parser.add_argument("--issues-ratio", type=float, default=0.2, help="Issues (and pull requests) per commit")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the fastest is reported")
+    args = parser.parse_args()
+
+    print(f"{'commits':>9} {'multi-pass s':>13} {'single-pass s':>14} {'speedup':>8}")
+    for size in (int(n) for n in args.commits.split(",")):
+        data = make_window(size, int(size * args.issues_ratio))
+        before, expected = best_of(multi_pass, data, args.repeat)
+        after, actual = best_of(single_pass, data, args.repeat)
+        if actual != expected:
+            sys.exit(f"Aggregates differ at {size} commits:\n{expected}\n{actual}")
+        print(f"{size:>9} {before:>13.3f} {after:>14.3f} {before / after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/bench_collector.py
+#
+# Compares serial collection (one request in flight) with the concurrent, paginated
+# collector against a simulated GitHub API with fixed per-request latency.
+#
+#   python benchmarks/bench_collector.py --latency 0.08 --commit-pages 12
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_collector import GitHubDataCollector, PER_PAGE
+from github_client import get_session
+from http_cache import HTTPCache
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload, last_page=None, url=""):
+        self._payload = payload
+        self.headers = {}
+        self.links = {"last": {"url": f"{url}?page={last_page}"}} if last_page and last_page > 1 else {}
+
+    def json(self):
+        return self._payload
+
+
+def make_fake_get(latency, pages_per_endpoint):
+    def fake_get(url, headers=None, params=None):
+        time.sleep(latency)
+        endpoint = url.rsplit("/", 1)[-1]
+        if endpoint not in pages_per_endpoint:
+            return FakeResponse({"name": "bench", "full_name": "bench/bench"})
+        page = (params or {}).get("page", 1)
+        items = [{"id": f"{endpoint}-{page}-{i}", "updated_at": "2024-09-17T00:00:00Z"} for i in range(PER_PAGE)]
+        return FakeResponse(items, last_page=pages_per_endpoint[endpoint], url=url)
+    return fake_get
+
+
+class BenchCollector(GitHubDataCollector):
+    def save_data(self, data):
+        pass
+
+
+def run(max_workers, fake_get, cache_dir):
+    # Responses carry no validators, so the throwaway cache never short-circuits a request
+    cache = HTTPCache(os.path.join(cache_dir, f"bench_{max_workers}.sqlite3"))
+    collector = BenchCollector("https://github.com/bench/bench", max_workers=max_workers, http_cache=cache)
+    end_date = datetime(2024, 9, 17)
+    start_date = end_date - timedelta(days=7)
+    with mock.patch.object(get_session(), "get", fake_get):
+        started = time.perf_counter()
+        data = collector.collect_data(start_date, end_date)
+        elapsed = time.perf_counter() - started
+    return elapsed, sum(len(v) for k, v in data.items() if k != "repo_info")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GitHubDataCollector timing comparison")
+    parser.add_argument("--latency", type=float, default=0.08, help="Simulated seconds per request")
+    parser.add_argument("--commit-pages", type=int, default=12)
+    parser.add_argument("--issue-pages", type=int, default=6)
+    parser.add_argument("--pull-pages", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    pages = {"commits": args.commit_pages, "issues": args.issue_pages, "pulls": args.pull_pages}
+    fake_get = make_fake_get(args.latency, pages)
+    requests_made = 1 + sum(pages.values())
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        serial_time, serial_items = run(1, fake_get, cache_dir)
+        concurrent_time, concurrent_items = run(args.workers, fake_get, cache_dir)
+
+    print(f"{requests_made} requests, {args.latency * 1000:.0f} ms simulated latency each")
+    print(f"serial     (1 worker):  {serial_time:.2f}s  {serial_items} items")
+    print(f"concurrent ({args.workers} workers): {concurrent_time:.2f}s  {concurrent_items} items")
+    print(f"speedup: {serial_time / concurrent_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# benchmarks/bench_pipeline.py
+#
+# Runs a newsletter job (POST /result, waited on until done) and /summarize end to end without the network. GitHub data
+# comes from the stored github_data snapshots, diffs are synthesized behind a fixed fetch latency,
+# and the LM is a ReplayLM serving the recorded tape (synthetic completions for anything missing).
+# A zero-latency pass first measures the pipeline's own overhead.
+#
+#   python benchmarks/bench_pipeline.py --repo pytorch/pytorch --concurrency 1,4,16
+#   LM_BACKEND=record python src/main.py ...   # records a tape to replay here
+
+import argparse
+import copy
+import glob
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import app as app_module
+import item_analysis
+import llm_integration
+from config import LM_TAPE_PATH
+from item_analysis import PreAnalyzer
+from jobs import DONE, FAILED, JobQueue
+from lm_backend import LatencyModel, ReplayLM
+from snapshot_store import SnapshotStore
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'github_data')
+
+
+def load_snapshot(repo):
+    store_path = os.path.join(DATA_DIR, 'snapshots.sqlite3')
+    if os.path.exists(store_path):
+        data = SnapshotStore(store_path).load_latest(repo)
+        if data is not None:
+            return data
+    files = sorted(glob.glob(os.path.join(DATA_DIR, f"{repo.replace('/', '_')}_*.json")))
+    if not files:
+        sys.exit(f"No stored snapshot for {repo} in {DATA_DIR}")
+    with open(files[-1]) as f:
+        return json.load(f)
+
+
+class SnapshotCollector:
+    def __init__(self, data):
+        self.data = data
+
+    def collect_data(self, start_date, end_date, incremental=False):
+        return copy.deepcopy(self.data)
+
+    def load_trends(self):
+        return None
+
+
+def make_fake_diff(latency, lines):
+    def fake_diff(repo_name, ident):
+        time.sleep(latency)
+        body = "\n".join(f"+    value_{n} = compute({n})" for n in range(lines))
+        return f"diff --git a/src/{ident}.py b/src/{ident}.py\n@@ -1,0 +1,{lines} @@\n{body}"
+    return fake_diff
+
+
+def items_of(data, limit):
+    # Interleaved so every level clicks through a mix of commits, issues and pull requests
+    sections = [[("commit", c) for c in data['recent_commits']],
+                [("issue", i) for i in data['recent_issues']],
+                [("pull_request", p) for p in data.get('recent_pull_requests', [])]]
+    items = [item for group in zip_longest(*sections) for item in group if item is not None]
+    return items[:limit]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_pass(lm, data, latency, diff_latency, args, preanalysis):
+    lm.latency = latency
+    before = lm.stats()
+    pre_analyzer = PreAnalyzer() if preanalysis else None
+    client = app_module.app.test_client()
+    job_queue = JobQueue(workers=1)
+    fake_diff = make_fake_diff(diff_latency, args.diff_lines)
+    patches = [
+        mock.patch.object(app_module, "create_collector", lambda repo_url: SnapshotCollector(data)),
+        mock.patch.object(app_module, "get_pre_analyzer", lambda: pre_analyzer),
+        mock.patch.object(app_module, "get_job_queue", lambda: job_queue),
+        mock.patch.object(app_module, "get_result_cache", lambda: None),
+        mock.patch.object(item_analysis, "get_commit_diff", fake_diff),
+        mock.patch.object(item_analysis, "get_pr_diff", fake_diff),
+        mock.patch.object(llm_integration, "get_llm_cache", lambda: None),
+    ]
+    for patch in patches:
+        patch.start()
+    try:
+        started = time.perf_counter()
+        response = client.post('/result', data={
+            "repo_url": f"https://github.com/{args.repo}", "start_date": "2024-09-10", "end_date": "2024-09-17"},
+            headers={"Accept": "application/json"})
+        assert response.status_code == 202, response.status_code
+        status = job_queue.wait(response.json['job_id'])
+        while status['state'] not in (DONE, FAILED):
+            status = job_queue.wait(response.json['job_id'], after_version=status['version'])
+        result_seconds = time.perf_counter() - started
+        assert status['state'] == DONE, status['error']
+        result_lm = {key: value - before[key] for key, value in lm.stats().items()}
+
+        rows = []
+        for concurrency in args.concurrency:
+            items = items_of(data, args.items)
+
+            def summarize(item):
+                started = time.perf_counter()
+                response = app_module.app.test_client().post('/summarize', json={"type": item[0], "data": item[1]})
+                assert response.status_code == 200, response.get_data(as_text=True)
+                return time.perf_counter() - started
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                latencies = list(executor.map(summarize, items))
+            wall = time.perf_counter() - started
+            rows.append((concurrency, len(items), statistics.median(latencies), percentile(latencies, 0.95),
+                         len(items) / wall))
+    finally:
+        for patch in patches:
+            patch.stop()
+        job_queue.executor.shutdown(wait=False)
+        if pre_analyzer is not None:
+            pre_analyzer.executor.shutdown(wait=False, cancel_futures=True)
+    return result_seconds, result_lm, rows
+
+
+def report(title, result_seconds, result_lm, rows):
+    print(f"\n{title}")
+    print(f"  generate_result: {result_seconds:.3f}s, {result_lm['calls']} LM calls, "
+          f"{result_lm['simulated_seconds']:.1f}s simulated LM time, {result_lm['misses']} synthesized")
+    print(f"  {'concurrency':>11} {'items':>6} {'p50 s':>8} {'p95 s':>8} {'items/s':>8}")
+    for concurrency, count, p50, p95, throughput in rows:
+        print(f"  {concurrency:>11} {count:>6} {p50:>8.3f} {p95:>8.3f} {throughput:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of generate_result and /summarize")
+    parser.add_argument("--repo", default="pytorch/pytorch", help="owner/name of a stored snapshot")
+    parser.add_argument("--tape", default=LM_TAPE_PATH, help="Recorded LM tape to replay")
+    parser.add_argument("--latency", type=float, default=0.4, help="Simulated LM request overhead in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=60, help="Simulated LM generation rate")
+    parser.add_argument("--diff-latency", type=float, default=0.15, help="Simulated diff fetch time in seconds")
+    parser.add_argument("--diff-lines", type=int, default=200, help="Lines in each synthesized diff")
+    parser.add_argument("--items", type=int, default=40, help="Items requested from /summarize per level")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated /summarize concurrency levels")
+    args = parser.parse_args()
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+    # The app logs every request at DEBUG, which would dominate the timings
+    logging.getLogger().setLevel(logging.WARNING)
+    app_module.app.logger.setLevel(logging.WARNING)
+
+    data = load_snapshot(args.repo)
+    print(f"Snapshot {args.repo}: {len(data['recent_commits'])} commits, {len(data['recent_issues'])} issues, "
+          f"{len(data.get('recent_pull_requests', []))} pull requests")
+
+    # One LM for every pass: dspy hands worker threads the LM configured when they first ran, and
+    # thread ids are reused, so reconfiguring between passes would leave some threads on the old one
+    lm = ReplayLM(args.tape, missing="synthetic")
+    llm_integration.configure_lm(lm)
+
+    zero = LatencyModel(base_seconds=0, tokens_per_second=0, jitter=0)
+    report("Pipeline overhead (zero LM and diff latency, no pre-analysis)",
+           *run_pass(lm, data, zero, 0, args, preanalysis=False))
+    modelled = LatencyModel(base_seconds=args.latency, tokens_per_second=args.tokens_per_second)
+    report("Modelled latency, no pre-analysis", *run_pass(lm, data, modelled, args.diff_latency, args, preanalysis=False))
+    report("Modelled latency, with pre-analysis", *run_pass(lm, data, modelled, args.diff_latency, args, preanalysis=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_render.py
+#
+# Render time against item count. A cold render misses the render cache and runs the compiled
+# template; a warm render of the same window only hashes the template context. The analytics
+# pass the newsletter is built from is timed on its own. Side-panel blocks are timed against
+# diff size the same way.
+#
+#   python benchmarks/bench_render.py --items 100,1000,10000,100000
+
+import argparse
+import os
+import random
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import renderer
+from analytics import analyze
+from newsletter_generator import generate_newsletter
+from renderer import RenderCache
+
+WORDS = ("fix", "add", "cuda", "kernel", "docs", "<tensor>", "refactor", "graph", "&", "perf", "test", "bump")
+
+
+def make_window(items, seed=0):
+    rng = random.Random(seed)
+    sentence = lambda: " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 16)))
+    return {
+        "repo_info": {"full_name": "bench/bench", "description": sentence(), "stargazers_count": 1,
+                      "forks_count": 1, "open_issues_count": 1, "language": "Python"},
+        "start_date": "2024-09-10", "end_date": "2024-09-17",
+        "recent_commits": [{"commit": {"author": {"name": f"dev{rng.randrange(items // 10 + 1)}"},
+                                       "message": sentence()}} for _ in range(items)],
+        "recent_issues": [{"title": sentence(), "state": "open"} for _ in range(items // 5)],
+        "recent_pull_requests": [{"title": sentence(), "state": "open"} for _ in range(items // 5)],
+    }
+
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def cold(fn):
+    # A fresh cache for every call, so each render misses
+    def run():
+        with mock.patch.object(renderer, "render_cache", RenderCache()):
+            fn()
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Template render time vs item count, cold and cached")
+    parser.add_argument("--items", default="100,1000,10000,100000", help="Comma-separated commit counts")
+    parser.add_argument("--diff-lines", default="100,1000,10000", help="Comma-separated diff sizes for the panel")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the fastest is reported")
+    args = parser.parse_args()
+
+    print("Newsletter")
+    print(f"  {'commits':>8} {'analytics ms':>13} {'cold ms':>9} {'cached ms':>10}")
+    for items in (int(n) for n in args.items.split(",")):
+        data = make_window(items)
+        analytics = analyze(data)
+        render_once = lambda: generate_newsletter(data, analytics=analytics)
+        analytics_ms = timed(lambda: analyze(data), args.repeat)
+        cold_ms = timed(cold(render_once), args.repeat)
+        render_once()
+        warm_ms = timed(render_once, args.repeat)
+        print(f"  {items:>8} {analytics_ms:>13.2f} {cold_ms:>9.2f} {warm_ms:>10.2f}")
+
+    # app pulls in Flask and the LLM plumbing, so it is only imported once the newsletter runs are done
+    import app
+    print("Side panel (commit message, analysis and diff blocks)")
+    print(f"  {'diff lines':>10} {'cold ms':>9} {'cached ms':>10}")
+    analysis = {"impact": "medium", "code_quality": "good", "suggestions": "add tests <now>"}
+    for lines in (int(n) for n in args.diff_lines.split(",")):
+        diff = "\n".join(f"+    value_{n} = compute({n}) < limit" for n in range(lines))
+        panel = lambda: app.panel_html([app.message_html("fix <kernel>"), app.analysis_html("commit", analysis),
+                                        app.changes_html("commit", diff)])
+        cold_ms = timed(cold(panel), args.repeat)
+        panel()
+        warm_ms = timed(panel, args.repeat)
+        print(f"  {lines:>10} {cold_ms:>9.2f} {warm_ms:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
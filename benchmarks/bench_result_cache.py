@@ -0,0 +1,118 @@
+# benchmarks/bench_result_cache.py
+#
+# Repeat visits to one repo and window with the whole-newsletter result cache. The web app is
+# timed on a miss (a generation job), a fresh hit and a stale hit, which serves the old page while
+# one background refresh recomputes it. main.generate_newsletter is then called from several
+# threads at once, with and without the cache, to count how many generations actually run.
+# GitHub data comes from the stored snapshots and the LM replays the tape with modelled latency.
+#
+#   python benchmarks/bench_result_cache.py --repo pytorch/pytorch --concurrency 8
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import app as app_module
+import llm_integration
+import main as main_module
+import result_cache
+from bench_pipeline import SnapshotCollector, load_snapshot
+from config import LM_TAPE_PATH
+from jobs import DONE, FAILED, JobQueue
+from lm_backend import LatencyModel, ReplayLM
+from result_cache import ResultCache
+
+
+class SnapshotBackedCollector(SnapshotCollector):
+    # Result pages are only cached for windows the snapshot store can reload
+    last_snapshot_id = 1
+
+
+def visit(client, job_queue, form):
+    started = time.perf_counter()
+    response = client.post('/', data=form)
+    if response.status_code == 303:
+        job_id = response.location.rsplit('/', 1)[-1]
+        status = job_queue.wait(job_id)
+        while status['state'] not in (DONE, FAILED):
+            status = job_queue.wait(job_id, after_version=status['version'])
+        assert status['state'] == DONE, status['error']
+        response = client.get(response.location)
+    assert response.status_code == 200, response.status_code
+    return time.perf_counter() - started
+
+
+def concurrent_generations(cache, concurrency, args):
+    generations = []
+    collector = lambda repo_url, backend: generations.append(1) or SnapshotBackedCollector(load_snapshot(args.repo))
+    started = time.perf_counter()
+    with mock.patch.object(main_module, "create_collector", collector), \
+            mock.patch.object(main_module, "get_result_cache", lambda: cache), \
+            mock.patch("builtins.print"), ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(lambda _: main_module.generate_newsletter(
+            f"https://github.com/{args.repo}", "2024-09-10", "2024-09-17"), range(concurrency)))
+    return time.perf_counter() - started, len(generations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Repeat newsletter visits with and without the result cache")
+    parser.add_argument("--repo", default="pytorch/pytorch", help="owner/name of a stored snapshot")
+    parser.add_argument("--tape", default=LM_TAPE_PATH, help="Recorded LM tape to replay")
+    parser.add_argument("--latency", type=float, default=0.4, help="Simulated LM request overhead in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=60, help="Simulated LM generation rate")
+    parser.add_argument("--concurrency", type=int, default=8, help="Simultaneous identical main.py generations")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+    app_module.app.logger.setLevel(logging.WARNING)
+
+    data = load_snapshot(args.repo)
+    lm = ReplayLM(args.tape, missing="synthetic",
+                  latency=LatencyModel(base_seconds=args.latency, tokens_per_second=args.tokens_per_second))
+    llm_integration.configure_lm(lm)
+    # The LLM cache would let later passes skip the LM calls the first one made
+    mock.patch.object(llm_integration, "get_llm_cache", lambda: None).start()
+    form = {"repo_url": f"https://github.com/{args.repo}", "start_date": "2024-09-10", "end_date": "2024-09-17"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResultCache(os.path.join(tmp, "web.sqlite3"))
+        job_queue = JobQueue(workers=2)
+        patches = [
+            mock.patch.object(app_module, "create_collector", lambda repo_url: SnapshotBackedCollector(data)),
+            mock.patch.object(app_module, "get_pre_analyzer", lambda: None),
+            mock.patch.object(app_module, "get_job_queue", lambda: job_queue),
+            mock.patch.object(app_module, "get_result_cache", lambda: cache),
+        ]
+        for patch in patches:
+            patch.start()
+        try:
+            client = app_module.app.test_client()
+            print("Web app, POST / to the rendered page")
+            print(f"  {'miss (generation job)':<34} {visit(client, job_queue, form):>8.3f}s")
+            print(f"  {'fresh hit':<34} {visit(client, job_queue, form):>8.3f}s")
+            ttl, clock = result_cache.window_ttl(form["end_date"]), time.time
+            with mock.patch("result_cache.time.time", lambda: clock() + ttl + 1):
+                print(f"  {'stale hit (refresh in background)':<34} {visit(client, job_queue, form):>8.3f}s")
+                cache.executor.shutdown(wait=True)
+            stats = cache.stats()
+            print(f"  {stats['hits']} hits, {stats['stale_hits']} stale hits, {stats['misses']} misses, "
+                  f"{stats['refreshes']} background refreshes")
+        finally:
+            for patch in patches:
+                patch.stop()
+            job_queue.executor.shutdown(wait=False)
+
+        print(f"main.generate_newsletter, {args.concurrency} identical calls at once")
+        for label, cache in (("no result cache", None), ("result cache", ResultCache(os.path.join(tmp, "cli.sqlite3")))):
+            seconds, generations = concurrent_generations(cache, args.concurrency, args)
+            print(f"  {label:<34} {seconds:>8.3f}s, {generations} generations")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/bench_result_page.py
+#
+# Size and server render time of the result page. The embedded baseline is how the page used to
+# be built: every raw commit, issue and PR json.dumps'd into the template, parsed back with a
+# from_json filter and written into one data-item attribute per row. The paged version renders
+# the shell and serves a projected first page of each list from /api/windows.
+#
+#   python benchmarks/bench_result_page.py --repo pytorch/pytorch --scale 1,10,100
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from flask import render_template, render_template_string
+
+import app as app_module
+from bench_pipeline import load_snapshot
+from window_store import WindowStore
+
+EMBEDDED_LISTS = """
+{% for commit in commits_json|from_json %}
+<li class="border p-2 rounded hover-gradient transition duration-300">
+    <a href="#" class="block" data-type="commit" data-item="{{ commit|tojson|forceescape }}">{{ commit.commit.message[:50] }}...</a>
+</li>
+{% endfor %}
+{% for issue in issues_json|from_json %}
+<li class="border p-2 rounded hover-gradient transition duration-300">
+    <a href="#" class="block" data-type="issue" data-item="{{ issue|tojson|forceescape }}">{{ issue.title }}</a>
+</li>
+{% endfor %}
+{% for pr in pull_requests_json|from_json %}
+<li class="border p-2 rounded hover-gradient transition duration-300">
+    <a href="#" class="block" data-type="pull_request" data-item="{{ pr|tojson|forceescape }}">{{ pr.title }}</a>
+</li>
+{% endfor %}
+"""
+
+SUMMARY = {key: "lorem ipsum" for key in ("bug_fixes", "feature_additions", "performance_improvements",
+                                          "refactoring", "other")}
+
+
+def scaled(data, factor):
+    scaled_data = copy.deepcopy(data)
+    for section in ("recent_commits", "recent_issues", "recent_pull_requests"):
+        scaled_data[section] = data[section] * factor
+    return scaled_data
+
+
+def page(window_id, counts, activity, content=""):
+    return render_template('result.html', content=content, window_id=window_id, item_counts=counts,
+                           repo_info={}, summary=SUMMARY, recent_activity_summary=activity)
+
+
+def embedded(data, activity):
+    commits_json = json.dumps(data['recent_commits'], default=str)
+    issues_json = json.dumps(data['recent_issues'], default=str)
+    pull_requests_json = json.dumps(data['recent_pull_requests'], default=str)
+    lists = render_template_string(EMBEDDED_LISTS, commits_json=commits_json, issues_json=issues_json,
+                                   pull_requests_json=pull_requests_json)
+    counts = {'commits': 0, 'issues': 0, 'pull_requests': 0}
+    return page("", counts, activity) + lists
+
+
+def paged(data, activity, client):
+    store = WindowStore()
+    window_id = store.put(data)
+    counts = {name: len(items) for name, items in store.get(window_id).items()}
+    html = page(window_id, counts, activity)
+    app_module.get_window_store = lambda: store
+    first_pages = [client.get(f'/api/windows/{window_id}/{section}').get_data() for section in counts]
+    return html, sum(len(body) for body in first_pages)
+
+
+def best_of(fn, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Result page size and render time, embedded vs paged")
+    parser.add_argument("--repo", default="pytorch/pytorch", help="owner/name of a stored snapshot")
+    parser.add_argument("--scale", default="1,10,100", help="Comma-separated multiples of the snapshot's items")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the fastest is reported")
+    args = parser.parse_args()
+
+    app_module.app.add_template_filter(json.loads, 'from_json')
+    client = app_module.app.test_client()
+    data = load_snapshot(args.repo)
+    activity = {'commits': 0, 'issues': 0, 'pull_requests': 0, 'top_contributors': []}
+
+    print(f"{'items':>7} {'embedded KiB':>13} {'embedded ms':>12} {'paged KiB':>10} {'first pages KiB':>16} "
+          f"{'paged ms':>9}")
+    with app_module.app.test_request_context():
+        for factor in (int(n) for n in args.scale.split(",")):
+            window = scaled(data, factor)
+            items = sum(len(window[s]) for s in ("recent_commits", "recent_issues", "recent_pull_requests"))
+            before_ms, before = best_of(lambda: embedded(window, activity), args.repeat)
+            after_ms, (after, first_pages) = best_of(lambda: paged(window, activity, client), args.repeat)
+            print(f"{items:>7} {len(before.encode()) / 1024:>13.1f} {before_ms:>12.1f} "
+                  f"{len(after.encode()) / 1024:>10.1f} {first_pages / 1024:>16.1f} {after_ms:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/bench_startup.py
+#
+# Cold-start cost of the CLI and web entry points. Each target runs in a fresh interpreter under
+# -X importtime; the report lists wall time, total import time and the most expensive imports.
+# With --baseline the run fails when a target got slower than the allowed regression.
+#
+#   python benchmarks/bench_startup.py --output startup.json
+#   python benchmarks/bench_startup.py --baseline startup.json --max-regression 0.2
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+TARGETS = {
+    "main --help": ["main.py", "--help"],
+    "import app": ["-c", "import app"],
+}
+
+
+def parse_importtime(stderr):
+    # Lines look like "import time:   self [us] | cumulative | imported package", nested by indentation
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({"name": name.strip(), "depth": (len(name) - len(name.lstrip())) // 2,
+                        "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    return modules
+
+
+def measure(args, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=SRC_DIR,
+                                   capture_output=True, text=True)
+        wall = time.perf_counter() - started
+        if completed.returncode != 0:
+            sys.exit(f"{' '.join(args)} failed:\n{completed.stderr[-2000:]}")
+        if best is None or wall < best["wall_seconds"]:
+            modules = parse_importtime(completed.stderr)
+            best = {
+                "wall_seconds": round(wall, 3),
+                "import_seconds": round(sum(m["self_us"] for m in modules) / 1e6, 3),
+                "modules": len(modules),
+                "top": [{"name": m["name"], "cumulative_ms": round(m["cumulative_us"] / 1000, 1)}
+                        for m in sorted((m for m in modules if m["depth"] <= 1),
+                                        key=lambda m: m["cumulative_us"], reverse=True)[:10]],
+            }
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile of the entry points")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per target; the fastest is reported")
+    parser.add_argument("--output", help="Write the report as JSON")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    report = {name: measure(target, args.repeat) for name, target in TARGETS.items()}
+    for name, result in report.items():
+        print(f"\n{name}: {result['wall_seconds']:.3f}s wall, {result['import_seconds']:.3f}s importing "
+              f"{result['modules']} modules")
+        for module in result["top"]:
+            print(f"  {module['cumulative_ms']:>8.1f} ms  {module['name']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressed = []
+        for name, result in report.items():
+            if name in baseline:
+                before = baseline[name]["wall_seconds"]
+                change = (result["wall_seconds"] - before) / before
+                print(f"{name}: {before:.3f}s -> {result['wall_seconds']:.3f}s ({change:+.0%})")
+                if change > args.max_regression:
+                    regressed.append(name)
+        if regressed:
+            sys.exit(f"Startup regressed beyond {args.max_regression:.0%}: {', '.join(regressed)}")
+
+
+if __name__ == '__main__':
+    main()
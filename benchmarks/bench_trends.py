@@ -0,0 +1,115 @@
+# benchmarks/bench_trends.py
+#
+# Week-over-week trends over years of synthetic history. The baseline is what the numbers would
+# cost without the columnar layer: per-item Python loops with datetime parsing over the history.
+# The columnar path is timed three ways: building the arrays from the items, a warm run from the
+# cached .npz, and the metrics alone.
+#
+#   python benchmarks/bench_trends.py --years 3 --commits-per-week 1500
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trends import TrendFrame, weekly_trends
+
+GITHUB_TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def make_history(years, commits_per_week, issues_per_week, authors, seed=0):
+    rng = random.Random(seed)
+    end = datetime(2024, 9, 16)
+    seconds = int(years * 365 * 86400)
+    stamp = lambda offset: (end - timedelta(seconds=offset)).strftime(GITHUB_TIME_FORMAT)
+    weeks = int(years * 52)
+    commits = [{"sha": str(n), "commit": {"author": {"name": f"dev{int(rng.paretovariate(1.2)) % authors}"},
+                                          "committer": {"date": stamp(rng.randrange(seconds))}}}
+               for n in range(weeks * commits_per_week)]
+    issues = []
+    for n in range(weeks * issues_per_week):
+        opened = rng.randrange(seconds)
+        closed = opened - int(rng.expovariate(1 / (10 * 86400)))
+        issues.append({"number": n, "created_at": stamp(opened),
+                       "closed_at": stamp(closed) if closed > 0 and rng.random() < 0.8 else None})
+    pulls = [{"number": n, "created_at": stamp(rng.randrange(seconds)), "merged_at": None}
+             for n in range(weeks * issues_per_week // 2)]
+    return {"recent_commits": commits, "recent_issues": issues, "recent_pull_requests": pulls}
+
+
+def week_key(value):
+    moment = datetime.strptime(value, GITHUB_TIME_FORMAT)
+    return (moment - timedelta(days=moment.weekday())).date()
+
+
+def python_loops(history, weeks):
+    commits, opened, closed, days = defaultdict(int), defaultdict(int), defaultdict(int), defaultdict(list)
+    active = defaultdict(set)
+    first_seen = {}
+    for c in history["recent_commits"]:
+        week = week_key(c["commit"]["committer"]["date"])
+        author = c["commit"]["author"]["name"]
+        commits[week] += 1
+        active[week].add(author)
+        first_seen[author] = min(first_seen.get(author, week), week)
+    for i in history["recent_issues"]:
+        opened[week_key(i["created_at"])] += 1
+        if i["closed_at"]:
+            week = week_key(i["closed_at"])
+            closed[week] += 1
+            days[week].append((datetime.strptime(i["closed_at"], GITHUB_TIME_FORMAT)
+                               - datetime.strptime(i["created_at"], GITHUB_TIME_FORMAT)).total_seconds() / 86400)
+    recent = sorted(commits)[-weeks:]
+    new = defaultdict(int)
+    for week in first_seen.values():
+        new[week] += 1
+    return [(commits[w], opened[w], closed[w], sorted(days[w])[len(days[w]) // 2] if days[w] else None,
+             len(active[w]), new[w]) for w in recent]
+
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Python loops vs columnar trend analytics")
+    parser.add_argument("--years", type=float, default=3, help="Years of synthetic history")
+    parser.add_argument("--commits-per-week", type=int, default=1500)
+    parser.add_argument("--issues-per-week", type=int, default=300)
+    parser.add_argument("--authors", type=int, default=3000)
+    parser.add_argument("--weeks", type=int, default=8, help="Weeks reported")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path; the fastest is reported")
+    args = parser.parse_args()
+
+    history = make_history(args.years, args.commits_per_week, args.issues_per_week, args.authors)
+    print(f"{len(history['recent_commits'])} commits, {len(history['recent_issues'])} issues, "
+          f"{len(history['recent_pull_requests'])} pull requests over {args.years:g} years")
+
+    loops, _ = timed(lambda: python_loops(history, args.weeks), args.repeat)
+    build, frame = timed(lambda: TrendFrame.from_history(history), args.repeat)
+    compute, _ = timed(lambda: weekly_trends(frame, args.weeks), args.repeat)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "frame.npz")
+        frame.save(path, "bench")
+        warm, _ = timed(lambda: weekly_trends(TrendFrame.load(path)[0], args.weeks), args.repeat)
+
+    print(f"  {'python loops':<28} {loops:>8.3f}s")
+    print(f"  {'columnar, build + metrics':<28} {build + compute:>8.3f}s")
+    print(f"  {'columnar, cached .npz':<28} {warm:>8.3f}s")
+    print(f"  {'columnar, metrics only':<28} {compute:>8.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+# src/analytics.py
+
+from collections import Counter
+
+# Categories in priority order: an item lands in the first one with a keyword in its lowercased text
+COMMIT_CATEGORIES = (
+    ("Bug Fixes", ("fix", "bug", "issue")),
+    ("Feature Additions", ("feat", "add", "new")),
+    ("Performance Improvements", ("perf", "optimiz", "improv")),
+    ("Documentation Updates", ("doc", "readme")),
+    ("Refactoring", ("refactor", "clean", "reorganiz")),
+)
+ISSUE_THEMES = (
+    ("Critical Bugs", ("critical", "urgent", "important", "severe")),
+    ("Feature Requests", ("feature", "request", "enhancement")),
+    ("Performance Issues", ("performance", "slow", "optimization")),
+    ("Documentation Needs", ("doc", "readme", "tutorial")),
+)
+OTHER = "Other"
+# Items kept per category for the newsletter text; the rest are only counted
+EXAMPLES = 3
+
+class Classifier:
+    # The keyword table flattened once into (keyword, category) pairs in priority order. Plain
+    # substring tests over it are several times faster than regex alternations for these literals.
+    def __init__(self, categories):
+        self.names = [name for name, _ in categories] + [OTHER]
+        self.keywords = [(keyword, index) for index, (_, keywords) in enumerate(categories) for keyword in keywords]
+        self.other = len(categories)
+
+    def classify(self, text):
+        text = text.lower()
+        for keyword, index in self.keywords:
+            if keyword in text:
+                return index
+        return self.other
+
+commit_classifier = Classifier(COMMIT_CATEGORIES)
+issue_classifier = Classifier(ISSUE_THEMES)
+
+class Groups:
+    def __init__(self, classifier):
+        self.classifier = classifier
+        self.counts = [0] * len(classifier.names)
+        self.examples = [[] for _ in classifier.names]
+
+    def add(self, text):
+        index = self.classifier.classify(text)
+        self.counts[index] += 1
+        if len(self.examples[index]) < EXAMPLES:
+            self.examples[index].append(text)
+
+    def result(self):
+        return {name: {"count": count, "examples": examples}
+                for name, count, examples in zip(self.classifier.names, self.counts, self.examples) if count}
+
+def as_list(items):
+    # Collectors report failures as a message string in place of the list
+    return items if isinstance(items, list) else []
+
+def analyze(data):
+    # One pass over a collected window: counts, states, categories and contributors for
+    # everything the newsletter, DataProcessor and the web app report
+    commits = as_list(data.get("recent_commits"))
+    issues = as_list(data.get("recent_issues"))
+    pull_requests = as_list(data.get("recent_pull_requests"))
+
+    contributors = Counter()
+    commit_groups = Groups(commit_classifier)
+    for commit in commits:
+        if not isinstance(commit, dict) or "commit" not in commit:
+            continue
+        detail = commit["commit"]
+        contributors[(detail.get("author") or {}).get("name", "Unknown")] += 1
+        commit_groups.add(detail.get("message") or "")
+
+    issue_states = Counter()
+    issue_groups = Groups(issue_classifier)
+    for issue in issues:
+        if isinstance(issue, dict):
+            issue_states[issue.get("state")] += 1
+            issue_groups.add(issue.get("title") or "")
+
+    pull_request_states = Counter()
+    pull_request_groups = Groups(commit_classifier)
+    for pull_request in pull_requests:
+        if isinstance(pull_request, dict):
+            pull_request_states[pull_request.get("state")] += 1
+            pull_request_groups.add(pull_request.get("title") or "")
+
+    return {
+        "commit_count": len(commits),
+        "issue_count": len(issues),
+        "pull_request_count": len(pull_requests),
+        "open_issue_count": issue_states["open"],
+        "closed_issue_count": issue_states["closed"],
+        "open_pull_request_count": pull_request_states["open"],
+        "closed_pull_request_count": pull_request_states["closed"],
+        "contributors": contributors,
+        "commit_categories": commit_groups.result(),
+        "issue_themes": issue_groups.result(),
+        "pull_request_categories": pull_request_groups.result(),
+    }
+
+def top_contributors(analytics, limit=5):
+    return analytics["contributors"].most_common(limit)
+
+def summarize_groups(groups, noun):
+    # One line per category: the items themselves when there are few, otherwise a count and two examples
+    summaries = {}
+    for name, group in groups.items():
+        if group["count"] <= len(group["examples"]):
+            summaries[name] = ", ".join(group["examples"])
+        else:
+            summaries[name] = f"{group['count']} {noun}, including: {', '.join(group['examples'][:2])}..."
+    return summaries
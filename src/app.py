@@ -1,17 +1,32 @@
-from flask import Flask, render_template, request, flash, jsonify
+import time
+_import_started = time.perf_counter()
+
+from flask import Flask, Response, render_template, request, flash, jsonify, redirect, stream_with_context, url_for
 from datetime import datetime, timedelta
 import traceback
 import logging
 import json
-from data_collector import GitHubDataCollector
+from analytics import analyze, top_contributors
+from data_collector import GitHubDataCollector, create_collector
 from newsletter_generator import generate_newsletter
-from commit_summarizer import summarize_commit, get_commit_diff
-from config import GITHUB_TOKEN
-from github import Github
-from llm_integration import analyze_code_changes, summarize_issue, analyze_pull_request
-import dspy
+from commit_summarizer import summarize_commit
+from config import INCREMENTAL_COLLECTION, TRENDS_ENABLED, ITEMS_PER_PAGE, ITEMS_MAX_PER_PAGE
+from jobs import DONE, FAILED, get_job_queue
+from item_analysis import DIFF_ITEMS, analyze_item, fetch_diff, get_pre_analyzer, item_repo_name
+import dedup
+import diff_compactor
+import github_client
+from llm_cache import get_llm_cache
+import llm_integration
+from llm_integration import summarize_commits_for_period
+from renderer import render, render_cache
+from result_cache import get_result_cache, is_complete
+from window_store import DEFAULT_FIELDS, get_window_store, page_of
+from llm_telemetry import run_context, telemetry
 
 app = Flask(__name__)
+# dspy and the LM client are not imported here; they load on the first LLM call that misses the cache
+app_import_seconds = time.perf_counter() - _import_started
 app.secret_key = 'your_secret_key_here'  # Replace with a real secret key
 
 # Set up logging
@@ -22,30 +37,6 @@ DEFAULT_REPO_URL = "https://github.com/pytorch/pytorch"
 DEFAULT_END_DATE = datetime.now().date()
 DEFAULT_START_DATE = DEFAULT_END_DATE - timedelta(days=7)
 
-# Define a new DSPy signature for commit summary
-class CommitSummarizer(dspy.Signature):
-    """Summarize commits for a given time period, focusing on major improvements."""
-    commit_messages = dspy.InputField(desc="List of commit messages for the time period")
-    bug_fixes = dspy.OutputField(desc="Summary of major bug fixes, without mentioning specific files or code")
-    feature_additions = dspy.OutputField(desc="Summary of significant feature additions, without mentioning specific files or code")
-    performance_improvements = dspy.OutputField(desc="Summary of notable performance improvements, without mentioning specific files or code")
-    refactoring = dspy.OutputField(desc="Summary of important refactoring efforts, without mentioning specific files or code")
-    other = dspy.OutputField(desc="Summary of other significant changes, without mentioning specific files or code")
-
-def summarize_commits_for_period(commit_messages):
-    # Join the commit messages into a single string
-    commit_messages_text = "\n".join(commit_messages)
-    
-    summarizer = dspy.Predict(CommitSummarizer)
-    result = summarizer(commit_messages=commit_messages_text)
-    return {
-        "bug_fixes": result.bug_fixes,
-        "feature_additions": result.feature_additions,
-        "performance_improvements": result.performance_improvements,
-        "refactoring": result.refactoring,
-        "other": result.other
-    }
-
 @app.route('/', methods=['GET', 'POST'])
 def index():
     app.logger.debug("Index route accessed")
@@ -55,7 +46,7 @@ def index():
         start_date = datetime.strptime(request.form['start_date'], '%Y-%m-%d').date()
         end_date = datetime.strptime(request.form['end_date'], '%Y-%m-%d').date()
         
-        return generate_result(repo_url, start_date, end_date)
+        return submit_result(repo_url, start_date, end_date)
     
     # For GET request, use default values
     return render_template('index.html', 
@@ -69,53 +60,136 @@ def result():
     start_date = datetime.strptime(request.form['start_date'], '%Y-%m-%d').date()
     end_date = datetime.strptime(request.form['end_date'], '%Y-%m-%d').date()
     
-    return generate_result(repo_url, start_date, end_date)
+    return submit_result(repo_url, start_date, end_date)
 
-def generate_result(repo_url, start_date, end_date):
-    try:
+RESULT_STAGES = ['collect', 'summarize', 'render']
+
+def submit_result(repo_url, start_date, end_date):
+    wants_json = request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json'
+    cache = get_result_cache()
+    if cache is not None and not wants_json:
+        # A cached page (even a stale one, which is refreshed in the background) skips the job entirely
+        page = cache.lookup('result_page', repo_url, start_date, end_date,
+                            lambda: build_result(repo_url, start_date, end_date, lambda stage: None))
+        if page is not None:
+            return page
+
+    # Generation runs on the job queue; a second submission of the same window joins the running job
+    job = get_job_queue().submit((repo_url, start_date, end_date),
+                                 lambda progress: result_page(repo_url, start_date, end_date, progress),
+                                 stages=RESULT_STAGES)
+    app.logger.debug(f"Newsletter for {repo_url} from {start_date} to {end_date} is job {job.id}")
+    if wants_json:
+        return jsonify({'job_id': job.id, 'status_url': url_for('job_status', job_id=job.id)}), 202
+    return redirect(url_for('job_page', job_id=job.id), code=303)
+
+def result_page(repo_url, start_date, end_date, progress):
+    compute = lambda: build_result(repo_url, start_date, end_date, progress)
+    cache = get_result_cache()
+    if cache is None:
+        return compute()[0]
+    return cache.get_or_compute('result_page', repo_url, start_date, end_date, compute)
+
+def build_result(repo_url, start_date, end_date, progress):
+    # Runs on a job worker thread, outside any request, so templates render in an app context.
+    # Returns the page and whether it may be cached: only complete, snapshot-backed windows are,
+    # since a cached page's item lists must still load after the in-memory window is gone
+    with app.app_context():
+        progress('collect')
         app.logger.debug(f"Generating newsletter for {repo_url} from {start_date} to {end_date}")
-        collector = GitHubDataCollector(repo_url)
-        data = collector.collect_data(start_date, end_date)
+        collector = create_collector(repo_url)
+        data = collector.collect_data(start_date, end_date, incremental=INCREMENTAL_COLLECTION)
         data['start_date'] = start_date.strftime('%Y-%m-%d')
         data['end_date'] = end_date.strftime('%Y-%m-%d')
+
+        # Start analysing every item now so clicks in the result page find their analysis ready
+        pre_analyzer = get_pre_analyzer()
+        if pre_analyzer is not None:
+            pre_analyzer.schedule(data)
         
         # Generate summary for the period
-        summary = summarize_commits_for_period([commit['commit']['message'] for commit in data['recent_commits']])
+        progress('summarize')
+        with run_context(repo=repo_url, request="generate_result") as usage:
+            summary = summarize_commits_for_period([commit['commit']['message'] for commit in data['recent_commits']])
+        app.logger.info(f"LLM usage for the period summary: {usage.summary()}")
         
         # Create a concise recent activity summary
+        progress('render')
+        analytics = analyze(data)
         recent_activity_summary = {
-            'commits': len(data['recent_commits']),
-            'issues': len(data['recent_issues']),
-            'pull_requests': len(data.get('recent_pull_requests', [])),
-            'top_contributors': get_top_contributors(data['recent_commits'], 3)
+            'commits': analytics['commit_count'],
+            'issues': analytics['issue_count'],
+            'pull_requests': analytics['pull_request_count'],
+            'top_contributors': top_contributors(analytics, 3)
         }
         
-        newsletter_content = generate_newsletter(data)
+        trends = collector.load_trends() if TRENDS_ENABLED else None
+        newsletter_content = generate_newsletter(data, analytics=analytics, trends=trends)
         app.logger.debug("Newsletter generated successfully")
         
-        return render_template('result.html', 
+        # The item lists are fetched page by page from /api/windows, not embedded in the page
+        window_id = get_window_store().put(data, getattr(collector, 'last_snapshot_id', None))
+        
+        page = render_template('result.html', 
                                content=newsletter_content, 
-                               commits_json=json.dumps(data['recent_commits'], default=str),
-                               issues_json=json.dumps(data['recent_issues'], default=str),
-                               pull_requests_json=json.dumps(data.get('recent_pull_requests', []), default=str),
+                               window_id=window_id,
+                               item_counts={'commits': analytics['commit_count'], 'issues': analytics['issue_count'],
+                                            'pull_requests': analytics['pull_request_count']},
                                repo_info=data['repo_info'],
                                summary=summary,
                                recent_activity_summary=recent_activity_summary)
-    except Exception as e:
-        app.logger.error(f"An error occurred: {str(e)}")
-        app.logger.error(traceback.format_exc())
-        flash(f"An error occurred: {str(e)}")
+        return page, is_complete(data) and getattr(collector, 'last_snapshot_id', None) is not None
+
+@app.route('/jobs/<job_id>')
+def job_page(job_id):
+    # The progress page while the job runs, then the newsletter itself (or the form with the error)
+    job = get_job_queue().get(job_id)
+    if job is None:
+        flash("That newsletter job has expired or never existed. Please generate it again.")
+        return redirect(url_for('index'))
+    if job.state == DONE:
+        return job.result
+    repo_url, start_date, end_date = job.key
+    if job.state == FAILED:
+        flash(f"An error occurred: {job.error}")
         return render_template('index.html', 
                                start_date=start_date.strftime('%Y-%m-%d'),
                                end_date=end_date.strftime('%Y-%m-%d'),
                                repo_url=repo_url)
+    return render_template('job.html', job=job.status(), repo_url=repo_url,
+                           start_date=start_date.strftime('%Y-%m-%d'), end_date=end_date.strftime('%Y-%m-%d'))
+
+@app.route('/jobs/<job_id>/status')
+def job_status(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': f"Unknown job: {job_id}"}), 404
+    return jsonify(job.status())
 
-def get_top_contributors(commits, limit=3):
-    contributors = {}
-    for commit in commits:
-        author = commit['commit']['author']['name']
-        contributors[author] = contributors.get(author, 0) + 1
-    return sorted(contributors.items(), key=lambda x: x[1], reverse=True)[:limit]
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    # Server-sent status updates until the job finishes; a comment line keeps idle proxies from closing it
+    queue = get_job_queue()
+    if queue.get(job_id) is None:
+        return jsonify({'error': f"Unknown job: {job_id}"}), 404
+
+    def generate():
+        version = -1
+        while True:
+            status = queue.wait(job_id, after_version=version, timeout=15)
+            if status is None:
+                yield sse('error', {'error': f"Unknown job: {job_id}"})
+                return
+            if status['version'] == version:
+                yield ": keepalive\n\n"
+                continue
+            version = status['version']
+            yield sse('status', status)
+            if status['state'] in (DONE, FAILED):
+                return
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/summarize_commit', methods=['POST'])
 def summarize_commit_route():
@@ -141,14 +215,15 @@ def summarize():
     
     summary = ""
     try:
-        if item_type == 'commit':
-            summary = process_commit(item_data)
-        elif item_type == 'issue':
-            summary = process_issue(item_data)
-        elif item_type == 'pull_request':
-            summary = process_pull_request(item_data)
-        else:
-            raise ValueError(f"Unknown item type: {item_type}")
+        with run_context(repo=repo_of(item_data), request=f"summarize {item_type}"):
+            if item_type == 'commit':
+                summary = process_commit(item_data)
+            elif item_type == 'issue':
+                summary = process_issue(item_data)
+            elif item_type == 'pull_request':
+                summary = process_pull_request(item_data)
+            else:
+                raise ValueError(f"Unknown item type: {item_type}")
     except Exception as e:
         app.logger.error(f"Error processing {item_type}: {str(e)}")
         app.logger.error(traceback.format_exc())
@@ -157,151 +232,207 @@ def summarize():
     app.logger.info(f"Processed {item_type} successfully")
     return jsonify({'summary': summary})
 
+def repo_of(item_data):
+    # owner/name from an API url such as https://api.github.com/repos/owner/name/issues/1
+    parts = (item_data.get('url') or '').split('/repos/', 1)
+    return '/'.join(parts[1].split('/')[:2]) if len(parts) == 2 else None
+
+def item_result(item_type, item_data, diff=None):
+    pre_analyzer = get_pre_analyzer()
+    if pre_analyzer is None:
+        return analyze_item(item_type, item_data, diff=diff)
+    return pre_analyzer.result(item_type, item_data, diff=diff)
+
+# Side panel blocks per item type, top to bottom. The JSON and streaming endpoints render the same blocks.
+PANEL_SECTIONS = {
+    'commit': ['context', 'message', 'analysis', 'changes'],
+    'issue': ['context', 'analysis', 'description'],
+    'pull_request': ['context', 'analysis', 'description', 'changes'],
+}
+
+def context_html(item_type, item_data):
+    if item_type == 'commit':
+        author = item_data['commit']['author']
+        return render('panel/context.html', heading='Commit Context', fields=[
+            ('Repository', item_repo_name(item_type, item_data)),
+            ('SHA', item_data['sha'][:7]),
+            ('Author', author['name']),
+            ('Date', author['date']),
+        ])
+    label = 'Issue' if item_type == 'issue' else 'Pull Request'
+    return render('panel/context.html', heading=f'{label} Context', fields=[
+        ('Title', item_data['title']),
+        ('Number', f"#{item_data['number']}"),
+        ('State', item_data['state']),
+        ('Created by', item_data['user']['login']),
+        ('Created at', item_data['created_at']),
+    ])
+
+def message_html(message):
+    return render('panel/message.html', message=message)
+
+def analysis_html(item_type, analysis):
+    return render('panel/analysis.html', item_type=item_type, analysis=analysis)
+
+def description_html(body):
+    return render('panel/description.html', body=body)
+
+def changes_html(item_type, diff):
+    return render('panel/changes.html', item_type=item_type, diff=diff)
+
+def panel_html(blocks):
+    # The blocks are cached on their own; caching the concatenation too would only duplicate them
+    return render('panel/panel.html', cache=False, blocks=list(blocks))
+
+def process_item(item_type, item_data):
+    result = item_result(item_type, item_data)
+    blocks = {
+        'context': context_html(item_type, item_data),
+        'analysis': analysis_html(item_type, result['analysis']),
+    }
+    if item_type == 'commit':
+        blocks['message'] = message_html(result['message'])
+    else:
+        blocks['description'] = description_html(item_data['body'])
+    if item_type in DIFF_ITEMS:
+        blocks['changes'] = changes_html(item_type, result['diff'])
+    return panel_html(blocks[name] for name in PANEL_SECTIONS[item_type])
+
 def process_commit(commit_data):
-    repo_name = commit_data['url'].split('/repos/')[1].split('/commits')[0]
-    commit_sha = commit_data['sha']
-    
-    app.logger.info(f"Fetching diff for commit {commit_sha} in repo {repo_name}")
-    diff = get_commit_diff(repo_name, commit_sha)
-    
-    try:
-        analysis = analyze_code_changes(commit_data['commit']['message'], diff)
-        # We don't need to summarize individual commits anymore
-        summary = commit_data['commit']['message']
-    except Exception as e:
-        app.logger.error(f"Error in AI analysis: {str(e)}")
-        analysis = {
-            "summary": "AI analysis failed",
-            "impact": "Unknown",
-            "code_quality": "Unable to assess",
-            "suggestions": "No suggestions available due to analysis failure"
-        }
-        summary = "Unable to generate summary"
-    
-    summary_html = f"""
-    <div class="space-y-4 overflow-y-auto max-h-full">
-        <div class="bg-blue-50 p-4 rounded-lg">
-            <h3 class="text-xl font-bold mb-2">Commit Context</h3>
-            <p><strong>Repository:</strong> {repo_name}</p>
-            <p><strong>SHA:</strong> {commit_sha[:7]}</p>
-            <p><strong>Author:</strong> {commit_data['commit']['author']['name']}</p>
-            <p><strong>Date:</strong> {commit_data['commit']['author']['date']}</p>
-        </div>
-        
-        <div class="bg-gray-50 p-4 rounded-lg">
-            <h3 class="text-xl font-bold mb-2">Commit Message</h3>
-            <p>{summary}</p>
-        </div>
-        
-        <div class="bg-green-50 p-4 rounded-lg">
-            <h3 class="text-xl font-bold mb-2">AI Analysis</h3>
-            <p><strong>Impact:</strong> {analysis['impact']}</p>
-            <p><strong>Code Quality:</strong> {analysis['code_quality']}</p>
-            <p><strong>Suggestions:</strong> {analysis['suggestions']}</p>
-        </div>
-        
-        <div class="bg-yellow-50 p-4 rounded-lg">
-            <h3 class="text-xl font-bold mb-2">Changes</h3>
-            <pre class="overflow-x-auto max-h-60 text-sm"><code>{diff}</code></pre>
-        </div>
-    </div>
-    """
-    return summary_html
+    return process_item('commit', commit_data)
 
 def process_issue(issue_data):
-    try:
-        ai_summary = summarize_issue(issue_data['title'], issue_data['body'])
-    except Exception as e:
-        app.logger.error(f"Error in AI summary: {str(e)}")
-        ai_summary = {
-            "summary": "AI summary failed",
-            "priority": "Unknown",
-            "suggested_action": "Unable to suggest action due to summary failure"
-        }
-    
-    summary = f"""
-    <div class="space-y-4 overflow-y-auto max-h-full">
-        <div class="bg-blue-50 p-4 rounded-lg">
-            <h3 class="text-xl font-bold mb-2">Issue Context</h3>
-            <p><strong>Title:</strong> {issue_data['title']}</p>
-            <p><strong>Number:</strong> #{issue_data['number']}</p>
-            <p><strong>State:</strong> {issue_data['state']}</p>
-            <p><strong>Created by:</strong> {issue_data['user']['login']}</p>
-            <p><strong>Created at:</strong> {issue_data['created_at']}</p>
-        </div>
-        
-        <div class="bg-green-50 p-4 rounded-lg">
-            <h3 class="text-xl font-bold mb-2">AI Summary</h3>
-            <p><strong>Summary:</strong> {ai_summary['summary']}</p>
-            <p><strong>Priority:</strong> {ai_summary['priority']}</p>
-            <p><strong>Suggested Action:</strong> {ai_summary['suggested_action']}</p>
-        </div>
-        
-        <div class="bg-yellow-50 p-4 rounded-lg">
-            <h3 class="text-xl font-bold mb-2">Description</h3>
-            <div class="whitespace-pre-wrap">{issue_data['body']}</div>
-        </div>
-    </div>
-    """
-    return summary
+    return process_item('issue', issue_data)
 
 def process_pull_request(pr_data):
-    repo_name = pr_data['url'].split('/repos/')[1].split('/pulls')[0]
-    pr_number = pr_data['number']
-    
-    app.logger.info(f"Fetching diff for PR #{pr_number} in repo {repo_name}")
-    diff = get_pr_diff(repo_name, pr_number)
-    
-    try:
-        analysis = analyze_pull_request(pr_data['title'], pr_data['body'], diff)
-    except Exception as e:
-        app.logger.error(f"Error in AI analysis: {str(e)}")
-        analysis = {
-            "summary": "AI analysis failed",
-            "impact": "Unknown",
-            "code_quality": "Unable to assess",
-            "suggestions": "No suggestions available due to analysis failure",
-            "related_issues": "Unable to identify related issues"
-        }
-    
-    summary = f"""
-    <div class="space-y-4 overflow-y-auto max-h-full">
-        <div class="bg-blue-50 p-4 rounded-lg">
-            <h3 class="text-xl font-bold mb-2">Pull Request Context</h3>
-            <p><strong>Title:</strong> {pr_data['title']}</p>
-            <p><strong>Number:</strong> #{pr_number}</p>
-            <p><strong>State:</strong> {pr_data['state']}</p>
-            <p><strong>Created by:</strong> {pr_data['user']['login']}</p>
-            <p><strong>Created at:</strong> {pr_data['created_at']}</p>
-        </div>
-        
-        <div class="bg-green-50 p-4 rounded-lg">
-            <h3 class="text-xl font-bold mb-2">AI Analysis</h3>
-            <p><strong>Summary:</strong> {analysis['summary']}</p>
-            <p><strong>Impact:</strong> {analysis['impact']}</p>
-            <p><strong>Code Quality:</strong> {analysis['code_quality']}</p>
-            <p><strong>Suggestions:</strong> {analysis['suggestions']}</p>
-            <p><strong>Related Issues:</strong> {analysis['related_issues']}</p>
-        </div>
-        
-        <div class="bg-yellow-50 p-4 rounded-lg">
-            <h3 class="text-xl font-bold mb-2">Description</h3>
-            <div class="whitespace-pre-wrap">{pr_data['body']}</div>
-        </div>
-        
-        <div class="bg-red-50 p-4 rounded-lg">
-            <h3 class="text-xl font-bold mb-2">Changes</h3>
-            <pre class="overflow-x-auto max-h-60 text-sm"><code>{diff}</code></pre>
-        </div>
-    </div>
-    """
-    return summary
-
-def get_pr_diff(repo_name, pr_number):
-    g = Github(GITHUB_TOKEN)
-    repo = g.get_repo(repo_name)
-    pr = repo.get_pull(pr_number)
-    return pr.get_files().get_page(0)[0].patch
+    return process_item('pull_request', pr_data)
+
+def sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+def stream_item(item_type, item_data):
+    # Blocks are sent as soon as their inputs exist: the context straight from the item, the diff
+    # once fetched, the analysis once the LLM (or the pre-analyzer) has it
+    yield sse('start', {'sections': PANEL_SECTIONS[item_type]})
+    yield sse('section', {'name': 'context', 'html': context_html(item_type, item_data)})
+    if item_type == 'commit':
+        yield sse('section', {'name': 'message', 'html': message_html(item_data['commit']['message'])})
+    else:
+        yield sse('section', {'name': 'description', 'html': description_html(item_data['body'])})
+
+    pre_analyzer = get_pre_analyzer()
+    result = pre_analyzer.ready(item_type, item_data) if pre_analyzer is not None else None
+    diff = None
+    if result is None and item_type in DIFF_ITEMS:
+        diff = fetch_diff(item_type, item_data)
+        yield sse('section', {'name': 'changes', 'html': changes_html(item_type, diff)})
+    if result is None:
+        result = item_result(item_type, item_data, diff=diff)
+    elif item_type in DIFF_ITEMS:
+        yield sse('section', {'name': 'changes', 'html': changes_html(item_type, result['diff'])})
+
+    if item_type == 'commit' and result['message'] != item_data['commit']['message']:
+        yield sse('section', {'name': 'message', 'html': message_html(result['message'])})
+    yield sse('section', {'name': 'analysis', 'html': analysis_html(item_type, result['analysis'])})
+    yield sse('done', {})
+
+@app.route('/summarize/stream', methods=['POST'])
+def summarize_stream():
+    data = request.json
+    item_type = data['type']
+    item_data = data['data']
+    if item_type not in PANEL_SECTIONS:
+        return jsonify({'error': f"Unknown item type: {item_type}"}), 400
+
+    app.logger.info(f"Streaming {item_type}: {item_data.get('sha', item_data.get('number', 'Unknown ID'))}")
+
+    def generate():
+        try:
+            with run_context(repo=repo_of(item_data), request=f"summarize/stream {item_type}"):
+                yield from stream_item(item_type, item_data)
+        except Exception as e:
+            app.logger.error(f"Error streaming {item_type}: {str(e)}")
+            app.logger.error(traceback.format_exc())
+            yield sse('error', {'error': str(e)})
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/windows/<window_id>/<section>')
+def window_items(window_id, section):
+    # One page of a window's commits, issues or pull requests, projected to the requested fields
+    if section not in DEFAULT_FIELDS:
+        return jsonify({'error': f"Unknown section: {section}"}), 404
+    items = get_window_store().items(window_id, section)
+    if items is None:
+        return jsonify({'error': f"Unknown window: {window_id}"}), 404
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', ITEMS_PER_PAGE, type=int), ITEMS_MAX_PER_PAGE)
+    if page < 1 or per_page < 1:
+        return jsonify({'error': "page and per_page must be positive"}), 400
+    fields = request.args.get('fields')
+    fields = [field for field in fields.split(',') if field] if fields else DEFAULT_FIELDS[section]
+    return jsonify(page_of(items, page, per_page, fields))
+
+@app.route('/api/windows/<window_id>/<section>/<int:index>')
+def window_item(window_id, section, index):
+    # The full item, fetched when it is opened in the side panel
+    items = get_window_store().items(window_id, section) if section in DEFAULT_FIELDS else None
+    if items is None or index >= len(items):
+        return jsonify({'error': "Unknown item"}), 404
+    return jsonify(items[index])
+
+@app.route('/metrics')
+def metrics():
+    # Prometheus text format: per-signature LLM call counts and latency/token histograms
+    return Response(telemetry.prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/metrics/llm')
+def llm_metrics():
+    return jsonify(telemetry.snapshot())
+
+@app.route('/metrics/github')
+def github_metrics():
+    return jsonify(github_client.stats())
+
+@app.route('/metrics/preanalysis')
+def preanalysis_metrics():
+    pre_analyzer = get_pre_analyzer()
+    return jsonify(pre_analyzer.status() if pre_analyzer is not None else {"enabled": False})
+
+@app.route('/metrics/dedup')
+def dedup_metrics():
+    return jsonify(dedup.stats.snapshot())
+
+@app.route('/metrics/render')
+def render_metrics():
+    return jsonify(render_cache.stats() if render_cache is not None else {"enabled": False})
+
+@app.route('/metrics/diff_compaction')
+def diff_compaction_metrics():
+    return jsonify(diff_compactor.stats.snapshot())
+
+@app.route('/metrics/jobs')
+def job_metrics():
+    return jsonify(get_job_queue().stats())
+
+@app.route('/metrics/result_cache')
+def result_cache_metrics():
+    cache = get_result_cache()
+    return jsonify(cache.stats() if cache is not None else {"enabled": False})
+
+@app.route('/metrics/startup')
+def startup_metrics():
+    return jsonify({
+        "app_import_seconds": round(app_import_seconds, 3),
+        "lm_initialized": llm_integration.lm_init_seconds is not None,
+        "lm_init_seconds": llm_integration.lm_init_seconds,
+    })
+
+@app.route('/metrics/llm_cache')
+def llm_cache_metrics():
+    cache = get_llm_cache()
+    return jsonify(cache.stats() if cache is not None else {"enabled": False})
 
 @app.errorhandler(500)
 def internal_server_error(e):
@@ -309,9 +440,5 @@ def internal_server_error(e):
     app.logger.error(traceback.format_exc())
     return "An internal error occurred: " + str(e), 500
 
-@app.template_filter('from_json')
-def from_json(value):
-    return json.loads(value)
-
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
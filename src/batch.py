@@ -0,0 +1,101 @@
+# src/batch.py
+
+import json
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+FREQUENCY_DAYS = {"daily": 1, "weekly": 7}
+
+def default_window(frequency, end_date=None):
+    # The last day or week up to end_date (today if not given), as YYYY-MM-DD strings
+    end = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else datetime.now().date()
+    start = end - timedelta(days=FREQUENCY_DAYS[frequency])
+    return start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+
+def load_manifest(path):
+    # Either a list of jobs, or {"defaults": {...}, "repos": [...]}; a job may be just a repo URL.
+    # Job fields: repo, start_date, end_date, frequency, recipients, incremental, backend
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+    if isinstance(manifest, list):
+        manifest = {"repos": manifest}
+    defaults = manifest.get("defaults", {})
+
+    jobs = []
+    for entry in manifest["repos"]:
+        job = dict(defaults, **({"repo": entry} if isinstance(entry, str) else entry))
+        job.setdefault("frequency", "weekly")
+        job.setdefault("recipients", [])
+        if isinstance(job["recipients"], str):
+            job["recipients"] = [r.strip() for r in job["recipients"].split(",") if r.strip()]
+        if not job.get("start_date"):
+            job["start_date"], job["end_date"] = default_window(job["frequency"], job.get("end_date"))
+        elif not job.get("end_date"):
+            job["end_date"] = datetime.now().strftime('%Y-%m-%d')
+        jobs.append(job)
+    return jobs
+
+def output_path(output_dir, job):
+    owner, repo = job["repo"].rstrip("/").split("/")[-2:]
+    return os.path.join(output_dir, f"{owner}_{repo}_{job['start_date']}_{job['end_date']}.html")
+
+def run_job(job, generate, send, output_dir=None):
+    # Failures are recorded on the job's result so one bad repo never stops the batch
+    result = {"repo": job["repo"], "start_date": job["start_date"], "end_date": job["end_date"]}
+    started = time.perf_counter()
+    try:
+        options = {key: job[key] for key in ("incremental", "backend") if key in job}
+        content = generate(job["repo"], job["start_date"], job["end_date"], **options)
+        if output_dir:
+            result["output"] = output_path(output_dir, job)
+            with open(result["output"], 'w') as f:
+                f.write(content)
+        if job["recipients"]:
+            send(job["recipients"], f"Repository Newsletter: {job['repo']}", content)
+            result["sent_to"] = job["recipients"]
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+def run_batch(jobs, generate, send, workers, output_dir=None):
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    print_lock = threading.Lock()
+
+    def run_and_report(job):
+        result = run_job(job, generate, send, output_dir)
+        with print_lock:
+            detail = result.get("error", result.get("output", ""))
+            print(f"[{result['status']}] {result['repo']} ({result['seconds']}s) {detail}")
+        return result
+
+    started_at = datetime.now()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(run_and_report, jobs))
+    elapsed = time.perf_counter() - started
+
+    succeeded = sum(1 for r in results if r["status"] == "ok")
+    return {
+        "started_at": started_at.strftime('%Y-%m-%dT%H:%M:%S'),
+        "workers": workers,
+        "repos": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "elapsed_seconds": round(elapsed, 3),
+        "repos_per_minute": round(len(results) / elapsed * 60, 2) if elapsed else None,
+        "results": results,
+    }
+
+def write_report(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Batch report written to {path}")
@@ -6,6 +6,34 @@ from dotenv import load_dotenv
 load_dotenv()
 
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+# Optional comma-separated pool of tokens that requests are spread across
+GITHUB_TOKENS = [t.strip() for t in os.getenv("GITHUB_TOKENS", "").split(",") if t.strip()] or ([GITHUB_TOKEN] if GITHUB_TOKEN else [])
+GITHUB_REQUESTS_PER_SECOND = float(os.getenv("GITHUB_REQUESTS_PER_SECOND", 10))
+GITHUB_BURST = int(os.getenv("GITHUB_BURST", 20))
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", 3))
+GITHUB_MAX_WAIT_SECONDS = float(os.getenv("GITHUB_MAX_WAIT_SECONDS", 120))
+GITHUB_MAX_WORKERS = int(os.getenv("GITHUB_MAX_WORKERS", 8))
+GITHUB_POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", 32))
+# "rest" or "graphql"
+COLLECTOR_BACKEND = os.getenv("COLLECTOR_BACKEND", "rest")
+
+# Local caches live outside github_data so snapshot listings only ever see snapshots
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(__file__), '..', '.cache'))
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Diffs are streamed and cut off at these budgets so memory stays bounded for huge PRs
+DIFF_MAX_FILE_BYTES = int(os.getenv("DIFF_MAX_FILE_BYTES", 16 * 1024))
+DIFF_MAX_TOTAL_BYTES = int(os.getenv("DIFF_MAX_TOTAL_BYTES", 128 * 1024))
+# Diffs are compacted before prompting: unchanged context trimmed to this many lines around each
+# change, reformat-only hunks and pure renames collapsed, and each file capped at a token budget
+DIFF_COMPACTION_ENABLED = os.getenv("DIFF_COMPACTION_ENABLED", "true").lower() == "true"
+DIFF_COMPACT_CONTEXT_LINES = int(os.getenv("DIFF_COMPACT_CONTEXT_LINES", 1))
+DIFF_COMPACT_FILE_TOKENS = int(os.getenv("DIFF_COMPACT_FILE_TOKENS", 1500))
+
+# Incremental collection keeps per-repo history and only fetches what changed since the last run
+HISTORY_DIR = os.getenv("HISTORY_DIR", os.path.join(CACHE_DIR, "history"))
+INCREMENTAL_COLLECTION = os.getenv("INCREMENTAL_COLLECTION", "false").lower() == "true"
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
 EMAIL_HOST = os.getenv("EMAIL_HOST")
@@ -16,6 +44,77 @@ EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
 REPO_URL = ""
 RECIPIENTS = []
 FREQUENCY = "weekly"
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", 4))
 
 # Add the GPT model configuration
-GPT_MODEL = "gpt-3.5-turbo"
\ No newline at end of file
+GPT_MODEL = "gpt-3.5-turbo"
+
+# Persistent cache of LLM results, shared by every worker process
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", 30 * 24 * 3600))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# Eager analysis of every item in a newsletter window, so /summarize rarely waits on the LLM
+PREANALYSIS_ENABLED = os.getenv("PREANALYSIS_ENABLED", "true").lower() == "true"
+PREANALYSIS_WORKERS = int(os.getenv("PREANALYSIS_WORKERS", 8))
+PREANALYSIS_LLM_CONCURRENCY = int(os.getenv("PREANALYSIS_LLM_CONCURRENCY", 4))
+PREANALYSIS_GITHUB_CONCURRENCY = int(os.getenv("PREANALYSIS_GITHUB_CONCURRENCY", 4))
+PREANALYSIS_MAX_ITEMS = int(os.getenv("PREANALYSIS_MAX_ITEMS", 500))
+PREANALYSIS_MAX_RESULTS = int(os.getenv("PREANALYSIS_MAX_RESULTS", 5000))
+# Map-reduce summarization of large commit windows
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", 3000))
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", 8))
+
+# Near-duplicate clustering of commits and issues before any prompt is built
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.7))
+DEDUP_NUM_PERM = 64
+DEDUP_BANDS = 16
+
+# LM backend: "openai" calls the API, "record" also appends every call to a tape,
+# "replay" serves calls from the tape with simulated latency and never touches the network
+LM_BACKEND = os.getenv("LM_BACKEND", "openai")
+LM_TAPE_PATH = os.getenv("LM_TAPE_PATH", os.path.join(CACHE_DIR, "lm_tape.jsonl"))
+LM_REPLAY_MISSING = os.getenv("LM_REPLAY_MISSING", "error")
+LM_REPLAY_BASE_LATENCY_SECONDS = float(os.getenv("LM_REPLAY_BASE_LATENCY_SECONDS", 0.4))
+LM_REPLAY_TOKENS_PER_SECOND = float(os.getenv("LM_REPLAY_TOKENS_PER_SECOND", 60))
+LM_REPLAY_JITTER = float(os.getenv("LM_REPLAY_JITTER", 0.2))
+
+# Per-call LLM telemetry: one JSON line per call, rotated by size. Empty disables the log.
+LLM_TELEMETRY_LOG = os.getenv("LLM_TELEMETRY_LOG", os.path.join(CACHE_DIR, "llm_calls.jsonl"))
+LLM_TELEMETRY_LOG_MAX_BYTES = int(os.getenv("LLM_TELEMETRY_LOG_MAX_BYTES", 10 * 1024 * 1024))
+LLM_TELEMETRY_LOG_BACKUPS = int(os.getenv("LLM_TELEMETRY_LOG_BACKUPS", 5))
+
+# Week-over-week trends computed from every stored snapshot of a repo. The columnar arrays are
+# cached per repo under TRENDS_CACHE_DIR, and each new snapshot is merged into them.
+TRENDS_ENABLED = os.getenv("TRENDS_ENABLED", "true").lower() == "true"
+TRENDS_WEEKS = int(os.getenv("TRENDS_WEEKS", 8))
+TRENDS_ROLLING_WEEKS = int(os.getenv("TRENDS_ROLLING_WEEKS", 4))
+TRENDS_CACHE_DIR = os.getenv("TRENDS_CACHE_DIR", os.path.join(CACHE_DIR, "trends"))
+
+# Rendered newsletters and side-panel blocks, kept in memory by a hash of their template inputs
+RENDER_CACHE_ENABLED = os.getenv("RENDER_CACHE_ENABLED", "true").lower() == "true"
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+
+# Windows shown on the result page are served to it page by page; this many stay decoded in memory,
+# older ones are reloaded from the snapshot store
+WINDOW_CACHE_SIZE = int(os.getenv("WINDOW_CACHE_SIZE", 32))
+ITEMS_PER_PAGE = int(os.getenv("ITEMS_PER_PAGE", 50))
+ITEMS_MAX_PER_PAGE = int(os.getenv("ITEMS_MAX_PER_PAGE", 200))
+
+# Newsletter generation in the web app runs as background jobs on this many worker threads;
+# finished jobs and their pages are kept for JOB_RETENTION_SECONDS, at most JOBS_MAX_FINISHED of them
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", 4))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", 3600))
+JOBS_MAX_FINISHED = int(os.getenv("JOBS_MAX_FINISHED", 200))
+
+# Finished newsletters (the web result page and main.py's output) cached per repo, window and model.
+# Windows that reach today go stale after RESULT_CACHE_LIVE_TTL_SECONDS, closed windows after
+# RESULT_CACHE_CLOSED_TTL_SECONDS; a stale entry is still served for RESULT_CACHE_STALE_SECONDS
+# while one background refresh recomputes it
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_LIVE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_LIVE_TTL_SECONDS", 15 * 60))
+RESULT_CACHE_CLOSED_TTL_SECONDS = int(os.getenv("RESULT_CACHE_CLOSED_TTL_SECONDS", 30 * 24 * 3600))
+RESULT_CACHE_STALE_SECONDS = int(os.getenv("RESULT_CACHE_STALE_SECONDS", 3600))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+RESULT_CACHE_REFRESH_WORKERS = int(os.getenv("RESULT_CACHE_REFRESH_WORKERS", 2))
@@ -1,98 +1,256 @@
 # src/data_collector.py
 
 import os
-import json
-import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from config import GITHUB_TOKEN
-from github import Github
+from urllib.parse import urlparse, parse_qs
+from config import GITHUB_TOKEN, GITHUB_MAX_WORKERS, HISTORY_DIR, COLLECTOR_BACKEND
+from github_client import get_session, get_repo, github_api
+from http_cache import get_http_cache
+from history_store import RepoHistory, to_github_time
+from snapshot_store import SnapshotStore
+
+# GitHub's maximum page size for REST listing endpoints
+PER_PAGE = 100
+
+def last_page_number(response):
+    # GitHub advertises the final page in the Link header; a missing rel="last" means a single page
+    last_url = response.links.get("last", {}).get("url")
+    if not last_url:
+        return 1
+    page = parse_qs(urlparse(last_url).query).get("page", ["1"])[0]
+    return int(page)
 
 class GitHubDataCollector:
-    def __init__(self, repo_url):
+    def __init__(self, repo_url, max_workers=GITHUB_MAX_WORKERS, http_cache=None, history_dir=HISTORY_DIR, session=None):
         self.repo_url = repo_url
         self.api_base_url = "https://api.github.com"
         self.headers = {"Authorization": f"token {GITHUB_TOKEN}"}
         self.data_dir = os.path.join(os.path.dirname(__file__), '..', 'github_data')
         os.makedirs(self.data_dir, exist_ok=True)
+        self.snapshot_store = SnapshotStore(os.path.join(self.data_dir, 'snapshots.sqlite3'))
+        self.last_snapshot_id = None
+        # Bounds the number of in-flight HTTP requests across all endpoints and pages
+        self.max_workers = max_workers
+        self._request_slots = threading.BoundedSemaphore(max_workers)
+        self._page_executor = None
+        self.http_cache = http_cache if http_cache is not None else get_http_cache()
+        self.history_dir = history_dir
+        self.session = session or get_session()
+
+    def _get(self, url, params=None):
+        with self._request_slots:
+            if self.http_cache is None:
+                return self.session.get(url, headers=self.headers, params=params)
+            return self.http_cache.fetch(
+                url, params,
+                lambda conditional: self.session.get(url, headers={**self.headers, **conditional}, params=params),
+                headers=self.headers,
+            )
+
+    def _get_all_pages(self, url, params=None):
+        params = dict(params or {}, per_page=PER_PAGE)
+        response = self._get(url, params)
+        first_page = response.json()
+        # Error payloads (bad credentials, rate limit, unknown repo) are passed through unchanged
+        if not isinstance(first_page, list):
+            return first_page
+
+        last_page = last_page_number(response)
+        if last_page <= 1:
+            return first_page
+
+        page_params = [dict(params, page=page) for page in range(2, last_page + 1)]
+        fetch_page = lambda p: self._get(url, p).json()
+        if self._page_executor is None:
+            pages = map(fetch_page, page_params)
+        else:
+            pages = self._page_executor.map(fetch_page, page_params)
+
+        items = list(first_page)
+        for page_number, page in enumerate(pages, start=2):
+            if not isinstance(page, list):
+                print(f"Warning: page {page_number} of {url} returned an error: {page}")
+                continue
+            items.extend(page)
+        return items
 
     def get_repo_info(self):
         owner, repo = self.repo_url.split("/")[-2:]
         url = f"{self.api_base_url}/repos/{owner}/{repo}"
-        response = requests.get(url, headers=self.headers)
+        response = self._get(url)
         return response.json()
 
     def get_recent_commits(self, start_date, end_date):
         owner, repo = self.repo_url.split("/")[-2:]
         url = f"{self.api_base_url}/repos/{owner}/{repo}/commits"
         params = {"since": start_date.isoformat(), "until": end_date.isoformat()}
-        response = requests.get(url, headers=self.headers, params=params)
-        return response.json()
+        return self._get_all_pages(url, params)
 
     def get_recent_issues(self, start_date, end_date):
         owner, repo = self.repo_url.split("/")[-2:]
         url = f"{self.api_base_url}/repos/{owner}/{repo}/issues"
         params = {"state": "all", "since": start_date.isoformat(), "until": end_date.isoformat()}
-        response = requests.get(url, headers=self.headers, params=params)
-        return response.json()
+        return self._get_all_pages(url, params)
 
     def get_recent_pull_requests(self, start_date, end_date):
         owner, repo = self.repo_url.split("/")[-2:]
         url = f"{self.api_base_url}/repos/{owner}/{repo}/pulls"
         params = {"state": "all", "sort": "updated", "direction": "desc"}
-        response = requests.get(url, headers=self.headers, params=params)
-        all_prs = response.json()
 
+        # GitHub timestamps are fixed-width UTC strings, so the window can be checked with plain
+        # string comparisons instead of parsing every updated_at
+        start = to_github_time(datetime.combine(start_date, datetime.min.time()))
+        end = to_github_time(datetime.combine(end_date, datetime.max.time()))
+
+        # The listing is newest-updated first: once a page ends before the window, every later page does too
+        all_prs = self._get_pages_until(url, params, lambda page: page[-1]['updated_at'] >= start)
+        if not isinstance(all_prs, list):
+            return all_prs
+        return [pr for pr in all_prs if start <= pr['updated_at'] <= end]
+
+    def _get_pages_until(self, url, params, keep_paging):
+        # Like _get_all_pages, but for sorted listings: pages are fetched in waves of up to
+        # max_workers and paging stops after the first page for which keep_paging(page) is False
+        params = dict(params or {}, per_page=PER_PAGE)
+        response = self._get(url, params)
+        items = response.json()
+        if not isinstance(items, list):
+            return items
+        items = list(items)
+        if not items or not keep_paging(items):
+            return items
+
+        last_page = last_page_number(response)
+        wave_size = self.max_workers if self._page_executor is not None else 1
+        fetch_page = lambda p: self._get(url, p).json()
+        next_page = 2
+        while next_page <= last_page:
+            page_numbers = range(next_page, min(next_page + wave_size, last_page + 1))
+            page_params = [dict(params, page=page) for page in page_numbers]
+            if self._page_executor is None:
+                pages = list(map(fetch_page, page_params))
+            else:
+                pages = list(self._page_executor.map(fetch_page, page_params))
+
+            for page_number, page in zip(page_numbers, pages):
+                if not isinstance(page, list):
+                    print(f"Warning: page {page_number} of {url} returned an error: {page}")
+                    return items
+                items.extend(page)
+                if not page or not keep_paging(page):
+                    return items
+            next_page += wave_size
+        return items
+
+    def _run_concurrently(self, tasks):
+        # Endpoints run side by side; their follow-up pages share one bounded page pool.
+        # Keeping the two pools separate means an endpoint waiting on its pages never starves them.
+        with ThreadPoolExecutor(max_workers=len(tasks)) as endpoint_executor, \
+                ThreadPoolExecutor(max_workers=self.max_workers) as page_executor:
+            self._page_executor = page_executor
+            try:
+                futures = {key: endpoint_executor.submit(fn, *args) for key, (fn, *args) in tasks.items()}
+                results = {key: future.result() for key, future in futures.items()}
+            finally:
+                self._page_executor = None
+        if self.http_cache is not None:
+            stats = self.http_cache.stats()
+            print(f"HTTP cache: {stats['hits']} hits, {stats['misses']} misses, {stats['bytes']} bytes stored")
+        return results
+
+    def collect_data(self, start_date, end_date, incremental=False):
+        if incremental:
+            data = self.collect_incremental(start_date, end_date)
+        else:
+            data = self._run_concurrently({
+                "repo_info": (self.get_repo_info,),
+                "recent_commits": (self.get_recent_commits, start_date, end_date),
+                "recent_issues": (self.get_recent_issues, start_date, end_date),
+                "recent_pull_requests": (self.get_recent_pull_requests, start_date, end_date)
+            })
+        self.save_data(data)
+        return data
+
+    def collect_incremental(self, start_date, end_date):
+        owner, repo = self.repo_url.split("/")[-2:]
+        history = RepoHistory.load(owner, repo, self.history_dir)
         start_datetime = datetime.combine(start_date, datetime.min.time())
         end_datetime = datetime.combine(end_date, datetime.max.time())
-        recent_prs = [pr for pr in all_prs if start_datetime <= datetime.strptime(pr['updated_at'], '%Y-%m-%dT%H:%M:%SZ') <= end_datetime]
-        return recent_prs
-
-    def collect_data(self, start_date, end_date):
-        data = {
-            "repo_info": self.get_repo_info(),
-            "recent_commits": self.get_recent_commits(start_date, end_date),
-            "recent_issues": self.get_recent_issues(start_date, end_date),
-            "recent_pull_requests": self.get_recent_pull_requests(start_date, end_date)
-        }
-        self.save_data(data)
+        now = datetime.utcnow().replace(microsecond=0)
+
+        # A window reaching further back than the stored history is backfilled from its start;
+        # otherwise only items newer than each high-water mark are fetched.
+        backfill = history.needs_backfill(start_datetime)
+        delta = self._run_concurrently({
+            "repo_info": (self.get_repo_info,),
+            "commits": (self.get_recent_commits, history.delta_since("commits", start_datetime), now),
+            "issues": (self.get_recent_issues, history.delta_since("issues", start_datetime), now),
+            "pulls": (self.get_recent_pull_requests, history.delta_since("pulls", start_datetime), now),
+        })
+
+        # Error payloads are passed through like the full collection does, and never merged
+        errors = {key: value for key, value in delta.items() if key != "repo_info" and not isinstance(value, list)}
+        history.merge(
+            commits=delta["commits"] if "commits" not in errors else None,
+            issues=delta["issues"] if "issues" not in errors else None,
+            pulls=delta["pulls"] if "pulls" not in errors else None,
+            covered_since=start_datetime if backfill and not errors else None,
+        )
+        history.save()
+        print(f"Incremental fetch for {owner}/{repo}: "
+              f"{sum(len(v) for k, v in delta.items() if k not in errors and k != 'repo_info')} new or updated items")
+
+        data = {"repo_info": delta["repo_info"], **history.window(start_datetime, end_datetime)}
+        for key, section in (("commits", "recent_commits"), ("issues", "recent_issues"), ("pulls", "recent_pull_requests")):
+            if key in errors:
+                data[section] = errors[key]
         return data
 
     def save_data(self, data):
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         owner, repo = self.repo_url.split("/")[-2:]
-        filename = f"{owner}_{repo}_{timestamp}.json"
-        filepath = os.path.join(self.data_dir, filename)
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
-        print(f"Data saved to {filepath}")
+        snapshot_id, new_objects = self.snapshot_store.save(f"{owner}/{repo}", data)
+        # The web app serves the result page's item lists from this snapshot
+        self.last_snapshot_id = snapshot_id
+        print(f"Snapshot {snapshot_id} saved for {owner}/{repo} ({new_objects} new objects)")
 
     def load_latest_data(self):
-        files = os.listdir(self.data_dir)
-        if not files:
-            return None
-        latest_file = max(files, key=lambda f: os.path.getmtime(os.path.join(self.data_dir, f)))
-        filepath = os.path.join(self.data_dir, latest_file)
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        owner, repo = self.repo_url.split("/")[-2:]
+        return self.snapshot_store.load_latest(f"{owner}/{repo}")
+
+    def load_trends(self):
+        # Imported here so numpy is only loaded when a newsletter reports trends
+        from trends import repo_trends
+        owner, repo = self.repo_url.split("/")[-2:]
+        return repo_trends(self.snapshot_store, f"{owner}/{repo}")
 
     def get_commit_data(self, repo_name, commit_sha):
-        g = Github(GITHUB_TOKEN)
-        repo = g.get_repo(repo_name)
-        commit = repo.get_commit(commit_sha)
-        
-        changes = []
-        for file in commit.files:
-            changes.append({
-                'filename': file.filename,
-                'status': file.status,
-                'additions': file.additions,
-                'deletions': file.deletions,
-                'changes': file.changes,
-            })
-        
+        with github_api("pygithub get_commit") as client:
+            commit = get_repo(repo_name, client).get_commit(commit_sha)
+
+            changes = []
+            for file in commit.files:
+                changes.append({
+                    'filename': file.filename,
+                    'status': file.status,
+                    'additions': file.additions,
+                    'deletions': file.deletions,
+                    'changes': file.changes,
+                })
+
         return {
             'message': commit.commit.message,
             'author': commit.commit.author.name,
             'date': commit.commit.author.date,
             'changes': changes,
-        }
\ No newline at end of file
+        }
+
+def create_collector(repo_url, backend=COLLECTOR_BACKEND, **kwargs):
+    if backend == "graphql":
+        # Imported here because graphql_collector builds on this module
+        from graphql_collector import GitHubGraphQLCollector
+        return GitHubGraphQLCollector(repo_url, **kwargs)
+    if backend != "rest":
+        raise ValueError(f"Unknown collector backend: {backend}")
+    return GitHubDataCollector(repo_url, **kwargs)
@@ -1,35 +1,28 @@
 # src/data_processor.py
 
+from analytics import analyze, top_contributors
+
 class DataProcessor:
     def __init__(self, raw_data):
         self.raw_data = raw_data
 
     def process_data(self):
         repo_info = self.raw_data.get("repo_info", {})
-        commits = self.raw_data.get("recent_commits", [])
-        issues = self.raw_data.get("recent_issues", [])
 
-        # Ensure issues is a list
-        if isinstance(issues, str):
+        # A failed issue fetch comes back as a message string; analyze() treats it as no issues
+        if isinstance(self.raw_data.get("recent_issues"), str):
             print("Warning: Issues data is a string. It might be an error message.")
-            issues = []
 
+        analytics = analyze(self.raw_data)
         return {
             "repo_name": repo_info.get("name", "Unknown"),
             "repo_description": repo_info.get("description", "No description available"),
-            "commit_count": len(commits) if isinstance(commits, list) else 0,
-            "issue_count": len(issues) if isinstance(issues, list) else 0,
-            "open_issue_count": len([i for i in issues if isinstance(i, dict) and i.get("state") == "open"]),
-            "closed_issue_count": len([i for i in issues if isinstance(i, dict) and i.get("state") == "closed"]),
-            "top_contributors": self.get_top_contributors(commits),
+            "commit_count": analytics["commit_count"],
+            "issue_count": analytics["issue_count"],
+            "open_issue_count": analytics["open_issue_count"],
+            "closed_issue_count": analytics["closed_issue_count"],
+            "top_contributors": top_contributors(analytics, 5),
         }
 
     def get_top_contributors(self, commits, limit=5):
-        if not isinstance(commits, list):
-            return []
-        contributors = {}
-        for commit in commits:
-            if isinstance(commit, dict) and "commit" in commit:
-                author = commit["commit"].get("author", {}).get("name", "Unknown")
-                contributors[author] = contributors.get(author, 0) + 1
-        return sorted(contributors.items(), key=lambda x: x[1], reverse=True)[:limit]
\ No newline at end of file
+        return top_contributors(analyze({"recent_commits": commits}), limit)
\ No newline at end of file
@@ -0,0 +1,162 @@
+# src/dedup.py
+
+import re
+import threading
+import zlib
+from config import DEDUP_THRESHOLD, DEDUP_NUM_PERM, DEDUP_BANDS
+from token_budget import estimate_tokens
+
+# Lines that carry no meaning for a summary: stack tooling trailers, review links, sign-offs
+TRAILER = re.compile(r"^\s*(ghstack-source-id|pull request resolved|differential revision|approved by|"
+                     r"reviewed by|co-authored-by|signed-off-by|this reverts commit|reverted|cc)\b.*$", re.IGNORECASE | re.MULTILINE)
+# Stack tooling and reland wrappers around the original subject
+WRAPPER = re.compile(r"^\s*(\[ghstack[^\]]*\]\s*|\[reland\]\s*|reland\s*)+", re.IGNORECASE)
+# Revert wrappers are stripped for comparison too, but counted: a revert undoes the change it
+# wraps, so it must never share a cluster (or an analysis) with it
+REVERT = re.compile(r"^(revert|back out)\b\s*", re.IGNORECASE)
+URL = re.compile(r"https?://\S+")
+HEX = re.compile(r"\b[0-9a-f]{7,40}\b")
+NUMBER = re.compile(r"\d+(\.\d+)*")
+WORD = re.compile(r"[a-z_]+|#")
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+def unwrap(text):
+    # The subject without its wrappers, and how many reverts were wrapped around it
+    reverts = 0
+    while True:
+        text = WRAPPER.sub("", text.strip().strip('"'))
+        match = REVERT.match(text)
+        if match is None:
+            return text, reverts
+        reverts += 1
+        text = text[match.end():]
+
+def revert_depth(text):
+    return unwrap(TRAILER.sub("", text or ""))[1]
+
+def normalize_text(text):
+    # Versions, hashes, PR numbers and links are masked so bot bumps and relands compare equal
+    text, _ = unwrap(TRAILER.sub("", text or ""))
+    text = URL.sub(" ", text.lower())
+    text = HEX.sub("#", text)
+    text = NUMBER.sub("#", text)
+    return " ".join(WORD.findall(text))
+
+def shingles(text, size=3):
+    words = text.split()
+    if len(words) < size:
+        return {text}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+class MinHasher:
+    def __init__(self, num_perm=DEDUP_NUM_PERM, seed=1):
+        # numpy is imported here rather than at module load to keep CLI startup fast
+        import numpy as np
+        self.np = np
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text):
+        np = self.np
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles(text)), dtype=np.uint64)
+        # One universal hash per permutation; uint64 overflow simply wraps, which keeps them independent
+        permuted = ((hashes[:, None] * (self.a & _MAX_HASH) + self.b) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=0)
+
+def cluster(texts, threshold=DEDUP_THRESHOLD, num_perm=DEDUP_NUM_PERM, bands=DEDUP_BANDS):
+    # Groups indexes of near-duplicate texts. LSH banding proposes candidate pairs, which are kept
+    # only if their estimated Jaccard similarity reaches the threshold. Each group is ordered by
+    # index, so the first member is the earliest item in the input. Texts that normalize to nothing
+    # stay on their own, and a revert only joins items reverted the same number of times over
+    # (a revert of a revert re-applies the original change).
+    normalized = [normalize_text(text) for text in texts]
+    reverts = [revert_depth(text) % 2 for text in texts]
+    hasher = MinHasher(num_perm)
+    signatures = {index: hasher.signature(text) for index, text in enumerate(normalized) if text}
+    rows = num_perm // bands
+
+    parent = list(range(len(texts)))
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(bands):
+        buckets = {}
+        for index, signature in signatures.items():
+            key = (reverts[index], signature[band * rows:(band + 1) * rows].tobytes())
+            buckets.setdefault(key, []).append(index)
+        for members in buckets.values():
+            first = members[0]
+            for other in members[1:]:
+                if find(first) == find(other):
+                    continue
+                if normalized[first] == normalized[other] or \
+                        (signatures[first] == signatures[other]).mean() >= threshold:
+                    parent[find(other)] = find(first)
+
+    groups = {}
+    for index in range(len(texts)):
+        groups.setdefault(find(index), []).append(index)
+    return sorted(groups.values(), key=lambda group: group[0])
+
+class DedupStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.items = 0
+        self.clusters = 0
+        self.tokens_saved = 0
+
+    def record(self, report):
+        with self._lock:
+            self.items += report["items"]
+            self.clusters += report["clusters"]
+            self.tokens_saved += report["tokens_saved"]
+
+    def snapshot(self):
+        with self._lock:
+            return {"items": self.items, "clusters": self.clusters, "tokens_saved": self.tokens_saved}
+
+stats = DedupStats()
+
+def make_report(texts, groups):
+    tokens_before = sum(estimate_tokens(text) for text in texts)
+    tokens_after = sum(estimate_tokens(texts[group[0]]) for group in groups)
+    return {
+        "items": len(texts),
+        "clusters": len(groups),
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": tokens_before - tokens_after,
+    }
+
+def collapse_messages(messages):
+    # One message per cluster: its representative. Cluster sizes are kept out of the messages, so a
+    # shifted window that adds one more near-duplicate leaves the chunk text (and its LLM cache key) as is.
+    groups = cluster(messages)
+    collapsed = [messages[group[0]] for group in groups]
+    report = make_report(messages, groups)
+    report["repeats"] = sorted(((messages[group[0]].split("\n", 1)[0], len(group) - 1)
+                                for group in groups if len(group) > 1), key=lambda repeat: -repeat[1])
+    stats.record(report)
+    return collapsed, report
+
+def repeats_note(repeats, limit=5):
+    # Added to a finished summary, never to a prompt; the largest clusters come first
+    if not repeats:
+        return ""
+    note = "; ".join(f"{line} (and {count} similar commits)" for line, count in repeats[:limit])
+    if len(repeats) > limit:
+        note += f"; {len(repeats) - limit} more groups of similar commits"
+    return f"Near-duplicates: {note}"
+
+def issue_text(issue):
+    # Templated issues differ mostly past the template, so the start of the body is enough
+    return f"{issue.get('title') or ''}\n{(issue.get('body') or '')[:1000]}"
+
+def commit_text(commit):
+    return commit['commit']['message']
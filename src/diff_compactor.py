@@ -0,0 +1,157 @@
+# src/diff_compactor.py
+
+import re
+import threading
+from config import DIFF_COMPACT_CONTEXT_LINES, DIFF_COMPACT_FILE_TOKENS
+from token_budget import estimate_tokens
+
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@")
+# Header lines that repeat what "diff --git a/x b/x" already says
+REDUNDANT_HEADER = re.compile(r"^(index [0-9a-f]+\.\.[0-9a-f]+|--- |\+\+\+ |similarity index |dissimilarity index )")
+
+def split_files(diff):
+    files = []
+    for line in diff.split("\n"):
+        if line.startswith("diff --git ") or not files:
+            files.append([])
+        files[-1].append(line)
+    return files
+
+def split_hunks(lines):
+    # (file header lines, [hunk lines, ...], trailing notes) where each hunk starts with its @@ line.
+    # Notes are the bracketed markers diff_fetcher adds, e.g. "[... remainder of this file truncated]".
+    header, hunks, notes = [], [], []
+    for line in lines:
+        if HUNK_HEADER.match(line):
+            hunks.append([line])
+        elif line.startswith("["):
+            (notes if hunks else header).append(line)
+        elif hunks:
+            hunks[-1].append(line)
+        elif line:
+            header.append(line)
+    return header, hunks, notes
+
+def is_reformat_only(hunk):
+    # Removed and added lines differ only in whitespace and line breaks
+    removed = "".join(line[1:] for line in hunk[1:] if line.startswith("-"))
+    added = "".join(line[1:] for line in hunk[1:] if line.startswith("+"))
+    return (removed or added) and "".join(removed.split()) == "".join(added.split())
+
+def trim_context(hunk, context_lines):
+    # Keeps context_lines unchanged lines on either side of each change; longer runs become " ..."
+    body = hunk[1:]
+    changed = [i for i, line in enumerate(body) if line[:1] in ("+", "-", "\\")]
+    keep = set()
+    for i in changed:
+        keep.update(range(max(0, i - context_lines), min(len(body), i + context_lines + 1)))
+    trimmed = [hunk[0]]
+    skipped = False
+    for i, line in enumerate(body):
+        if i in keep:
+            trimmed.append(line)
+            skipped = False
+        elif not skipped:
+            trimmed.append(" ...")
+            skipped = True
+    return trimmed
+
+def truncate_hunk(hunk, budget):
+    # As many of the hunk's lines as fit in budget tokens (always the @@ line), and a note for the rest
+    kept, used = [hunk[0]], estimate_tokens(hunk[0])
+    for line in hunk[1:]:
+        tokens = estimate_tokens(line)
+        if used + tokens > budget:
+            break
+        kept.append(line)
+        used += tokens
+    rest = hunk[len(kept):]
+    added = sum(1 for line in rest if line.startswith("+"))
+    removed = sum(1 for line in rest if line.startswith("-"))
+    return kept + [f"[{len(rest)} more lines of this hunk omitted, +{added} -{removed} lines]"]
+
+def omitted_note(hunks):
+    added = sum(1 for h in hunks for line in h[1:] if line.startswith("+"))
+    removed = sum(1 for h in hunks for line in h[1:] if line.startswith("-"))
+    return f"[{len(hunks)} more hunks omitted, +{added} -{removed} lines]"
+
+def compact_file(lines, context_lines, max_tokens):
+    header, hunks, trailer = split_hunks(lines)
+    title = header[0]
+    notes = []
+    for line in header[1:]:
+        if line.startswith("rename from "):
+            notes.append(f"renamed from {line[len('rename from '):]}")
+        elif line.startswith(("new file mode", "deleted file mode")):
+            notes.append(line.rsplit(" ", 1)[0])
+        elif line.startswith("[") or not REDUNDANT_HEADER.match(line) and not line.startswith("rename to "):
+            notes.append(line)
+    if not hunks and any(n.startswith("renamed from ") for n in notes):
+        notes.append("content unchanged")
+
+    out = [title + (f" ({', '.join(notes)})" if notes else "")]
+    used = estimate_tokens(out[0])
+    reformatted = 0
+    emitted = 0
+    for index, hunk in enumerate(hunks):
+        if is_reformat_only(hunk):
+            reformatted += 1
+            continue
+        trimmed = trim_context(hunk, context_lines)
+        text = "\n".join(trimmed)
+        tokens = estimate_tokens(text)
+        if used + tokens > max_tokens:
+            if emitted:
+                out.append(omitted_note(hunks[index:]))
+                break
+            # Not even one hunk fits: the first is cut down to the budget rather than sent whole
+            out.append("\n".join(truncate_hunk(trimmed, max_tokens - used)))
+            if hunks[index + 1:]:
+                out.append(omitted_note(hunks[index + 1:]))
+            break
+        out.append(text)
+        used += tokens
+        emitted += 1
+    if reformatted:
+        out.append(f"[{reformatted} whitespace/reformat-only hunks omitted]")
+    return out + trailer
+
+class CompactionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.diffs = 0
+        self.original_tokens = 0
+        self.compacted_tokens = 0
+
+    def record(self, report):
+        with self._lock:
+            self.diffs += 1
+            self.original_tokens += report["original_tokens"]
+            self.compacted_tokens += report["compacted_tokens"]
+
+    def snapshot(self):
+        with self._lock:
+            return {"diffs": self.diffs, "original_tokens": self.original_tokens,
+                    "compacted_tokens": self.compacted_tokens,
+                    "tokens_saved": self.original_tokens - self.compacted_tokens}
+
+stats = CompactionStats()
+
+def compact_diff(diff, context_lines=DIFF_COMPACT_CONTEXT_LINES, max_file_tokens=DIFF_COMPACT_FILE_TOKENS):
+    # Shrinks a rendered unified diff for prompting: redundant headers dropped, renames and
+    # reformat-only hunks collapsed to notes, unchanged context trimmed and each file capped
+    # at max_file_tokens. Returns the compacted text and a report of token counts.
+    original_tokens = estimate_tokens(diff)
+    if not diff or not diff.startswith("diff --git "):
+        compacted = diff
+    else:
+        parts = []
+        for lines in split_files(diff):
+            if lines[0].startswith("diff --git "):
+                parts.extend(compact_file(lines, context_lines, max_file_tokens))
+            else:
+                parts.extend(lines)
+        compacted = "\n".join(parts)
+    report = {"original_tokens": original_tokens, "compacted_tokens": estimate_tokens(compacted)}
+    stats.record(report)
+    return compacted, report
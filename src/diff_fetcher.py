@@ -0,0 +1,163 @@
+# src/diff_fetcher.py
+
+import re
+from config import DIFF_MAX_FILE_BYTES, DIFF_MAX_TOTAL_BYTES
+from github_client import get_session
+
+API_BASE_URL = "https://api.github.com"
+DIFF_MEDIA_TYPE = "application/vnd.github.diff"
+
+# Lockfiles, minified bundles, vendored trees and codegen output say little about a change
+GENERATED_FILE = re.compile(
+    r'(^|/)(package-lock\.json|yarn\.lock|pnpm-lock\.yaml|poetry\.lock|Pipfile\.lock|Cargo\.lock'
+    r'|Gemfile\.lock|composer\.lock|go\.sum)$'
+    r'|\.min\.(js|css)$|\.map$'
+    r'|(^|/)(vendor|node_modules|dist|generated)/'
+    r'|_pb2(_grpc)?\.pyi?$|\.pb\.(go|cc|h)$'
+)
+
+def is_generated(path):
+    return bool(GENERATED_FILE.search(path))
+
+def header_path(header):
+    # "diff --git a/P b/P": unless the file was renamed both sides are the same path, which may
+    # itself contain " b/", so the split is found by length. Git quotes paths with unusual
+    # characters. A rename's new path is settled by the "+++ b/" line that follows the header.
+    paths = header[len("diff --git "):]
+    if paths.endswith('"') and ' "b/' in paths:
+        return paths.rsplit(' "b/', 1)[1][:-1]
+    length = (len(paths) - len("a/ b/")) // 2
+    path = paths[2:2 + length]
+    if paths == f"a/{path} b/{path}":
+        return path
+    return paths.split(" b/", 1)[-1]
+
+def new_file(header):
+    path = header_path(header)
+    return {
+        "filename": path,
+        "lines": [header],
+        "size": 0,
+        "truncated_bytes": 0,
+        "in_hunks": False,
+        "skipped": "generated" if is_generated(path) else None,
+    }
+
+def finish(current):
+    patch = "\n".join(current.pop("lines")) if not current["skipped"] else ""
+    current.pop("size")
+    current.pop("in_hunks")
+    current["patch"] = patch
+    return current
+
+def iter_diff_files(lines, max_file_bytes=DIFF_MAX_FILE_BYTES, max_total_bytes=DIFF_MAX_TOTAL_BYTES):
+    # Splits a unified diff into per-file dicts as lines arrive. Only the current file is held in
+    # memory and it never grows past max_file_bytes (the rest of it is counted, not kept). Once
+    # max_total_bytes is used up the stream is abandoned and a final
+    # {"filename": None, "skipped": "budget"} marker is yielded.
+    total = 0
+    current = None
+    for line in lines:
+        if line.startswith("diff --git "):
+            if current is not None:
+                yield finish(current)
+            current = new_file(line)
+            continue
+        if current is None:
+            continue
+        if line.startswith("@@"):
+            current["in_hunks"] = True
+        elif line.startswith("+++ b/") and not current["in_hunks"]:
+            current["filename"] = line[len("+++ b/"):].rstrip("\t")
+            if is_generated(current["filename"]):
+                current["skipped"] = current["skipped"] or "generated"
+        if current["skipped"]:
+            continue
+        if line.startswith("Binary files ") or line == "GIT binary patch":
+            current["skipped"] = "binary"
+            continue
+
+        size = len(line) + 1
+        if total + size > max_total_bytes:
+            current["truncated_bytes"] += size
+            yield finish(current)
+            yield {"filename": None, "patch": "", "truncated_bytes": 0, "skipped": "budget"}
+            return
+        if current["size"] + size > max_file_bytes:
+            current["truncated_bytes"] += size
+            continue
+        current["lines"].append(line)
+        current["size"] += size
+        total += size
+    if current is not None:
+        yield finish(current)
+
+def stream_lines(response):
+    try:
+        for raw in response.iter_lines(chunk_size=8192):
+            yield raw.decode("utf-8", errors="replace")
+    finally:
+        # Closing early releases the connection without downloading the rest of the diff
+        response.close()
+
+def listing_lines(session, url):
+    # Fallback for diffs GitHub refuses to render (406): rebuild a unified diff from the file
+    # listing, one page in memory at a time. Pull request files and a commit's "files" are both
+    # paginated, and the Link header's next url is followed until it runs out.
+    params = {"per_page": 100}
+    while url:
+        response = session.get(url, params=params)
+        if response.status_code != 200:
+            raise RuntimeError(f"GitHub returned {response.status_code} for {url}")
+        payload = response.json()
+        files = payload.get("files", []) if isinstance(payload, dict) else payload
+        for f in files:
+            previous = f.get("previous_filename", f["filename"])
+            yield f"diff --git a/{previous} b/{f['filename']}"
+            if previous != f["filename"]:
+                yield f"--- a/{previous}"
+                yield f"+++ b/{f['filename']}"
+            if "patch" not in f:
+                # GitHub omits the patch for binary files and very large ones
+                yield "Binary files differ"
+                continue
+            yield from f["patch"].splitlines()
+        # The next url already carries the page and per_page parameters
+        url = response.links.get("next", {}).get("url")
+        params = None
+
+def iter_diff(repo_name, kind, ident, max_file_bytes=DIFF_MAX_FILE_BYTES, max_total_bytes=DIFF_MAX_TOTAL_BYTES,
+              session=None):
+    # kind is "commit" or "pull"; yields per-file dicts lazily
+    session = session or get_session()
+    if kind == "commit":
+        url = f"{API_BASE_URL}/repos/{repo_name}/commits/{ident}"
+        listing_url = url
+    else:
+        url = f"{API_BASE_URL}/repos/{repo_name}/pulls/{ident}"
+        listing_url = f"{url}/files"
+
+    response = session.get(url, headers={"Accept": DIFF_MEDIA_TYPE}, stream=True)
+    if response.status_code == 200:
+        lines = stream_lines(response)
+    elif response.status_code == 406:
+        response.close()
+        lines = listing_lines(session, listing_url)
+    else:
+        response.close()
+        raise RuntimeError(f"GitHub returned {response.status_code} for the diff of {repo_name} {kind} {ident}")
+    yield from iter_diff_files(lines, max_file_bytes, max_total_bytes)
+
+def render_diff(files):
+    parts = []
+    for f in files:
+        if f["skipped"] == "budget":
+            parts.append("[diff truncated: total size budget reached, remaining files omitted]")
+        elif f["skipped"]:
+            parts.append(f"diff --git a/{f['filename']} b/{f['filename']}\n[{f['skipped']} file skipped]")
+        else:
+            patch = f["patch"]
+            if f["truncated_bytes"]:
+                patch += "\n[... remainder of this file truncated]"
+            parts.append(patch)
+    return "\n".join(parts)
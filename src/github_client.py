@@ -0,0 +1,133 @@
+# src/github_client.py
+
+import re
+import threading
+import time
+from contextlib import contextmanager
+import requests
+from requests.adapters import HTTPAdapter
+from config import GITHUB_POOL_SIZE
+from rate_limiter import scheduler, resource_for
+
+SHA_SEGMENT = re.compile(r'^[0-9a-f]{40}$')
+
+def endpoint_label(url):
+    # Collapses ids so latency is grouped per endpoint, e.g. /repos/{owner}/{repo}/commits/{sha}
+    path = url.split("://", 1)[-1].split("/", 1)[-1].split("?", 1)[0]
+    segments = path.strip("/").split("/")
+    labelled = []
+    for i, segment in enumerate(segments):
+        if i in (1, 2) and segments[0] == "repos":
+            labelled.append("{owner}" if i == 1 else "{repo}")
+        elif SHA_SEGMENT.match(segment):
+            labelled.append("{sha}")
+        elif segment.isdigit():
+            labelled.append("{number}")
+        else:
+            labelled.append(segment)
+    return "/" + "/".join(labelled)
+
+class LatencyStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, seconds):
+        with self._lock:
+            entry = self._endpoints.setdefault(endpoint, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            entry["count"] += 1
+            entry["total_seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                endpoint: dict(entry, avg_seconds=entry["total_seconds"] / entry["count"])
+                for endpoint, entry in self._endpoints.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+latency = LatencyStats()
+
+@contextmanager
+def timed(endpoint):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        latency.record(endpoint, time.perf_counter() - started)
+
+class GitHubSession(requests.Session):
+    # Every request is paced by the scheduler and sent with whichever token it hands out
+    def request(self, method, url, *args, headers=None, **kwargs):
+        headers = dict(headers or {})
+
+        def send(token):
+            if token:
+                headers["Authorization"] = f"token {token}"
+            with timed(f"{method} {endpoint_label(url)}"):
+                return requests.Session.request(self, method, url, *args, headers=headers, **kwargs)
+
+        return scheduler.send(send, resource_for(url))
+
+_lock = threading.Lock()
+_session = None
+_clients = {}
+_repos = {}
+
+def get_session():
+    # One keep-alive connection pool for all raw REST and GraphQL traffic in the process
+    global _session
+    with _lock:
+        if _session is None:
+            session = GitHubSession()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=GITHUB_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.headers.update({"Accept": "application/vnd.github+json"})
+            _session = session
+        return _session
+
+def get_github(token=None):
+    # One long-lived PyGithub client per token in the pool
+    with _lock:
+        client = _clients.get(token)
+        if client is None:
+            # PyGithub is imported on first use; it is a large package most runs never touch.
+            # Pacing is done by the scheduler, so PyGithub's own request spacing stays off.
+            from github import Github
+            client = Github(token, pool_size=GITHUB_POOL_SIZE, seconds_between_requests=None)
+            _clients[token] = client
+        return client
+
+def get_repo(repo_name, client=None):
+    # Lazy handles need no round-trip; attributes load on first access and the handle is reused
+    client = client or get_github()
+    key = (id(client), repo_name)
+    with _lock:
+        repo = _repos.get(key)
+    if repo is None:
+        repo = client.get_repo(repo_name, lazy=True)
+        with _lock:
+            repo = _repos.setdefault(key, repo)
+    return repo
+
+@contextmanager
+def github_api(endpoint):
+    # PyGithub does its own HTTP, so its calls take a scheduler slot up front and report the
+    # budget PyGithub saw afterwards. PyGithub's built-in retry covers secondary limits.
+    token = scheduler.acquire("core")
+    client = get_github(token)
+    try:
+        with timed(endpoint):
+            yield client
+    finally:
+        # Read from the requester: Github.rate_limiting would itself call /rate_limit when unknown
+        requester = client.requester
+        remaining, limit = requester.rate_limiting
+        scheduler.record_budget(token, "core", remaining, limit, requester.rate_limiting_resettime)
+
+def stats():
+    return {"latency": latency.snapshot(), "scheduler": scheduler.stats()}
@@ -0,0 +1,257 @@
+# src/graphql_collector.py
+
+from datetime import datetime, timezone
+from config import GITHUB_TOKEN
+from data_collector import GitHubDataCollector
+from history_store import to_github_time
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+PULLS_PER_PAGE = 50  # each PR also carries up to 100 changed files, which drives the query cost
+
+# One query covers all three listings; connections that are already exhausted are skipped
+# on later pages with @include, so a run costs max(pages per listing) requests.
+WINDOW_QUERY = """
+query($owner: String!, $name: String!, $since: GitTimestamp!, $until: GitTimestamp!, $issuesSince: DateTime!,
+      $withRepo: Boolean!, $withCommits: Boolean!, $withIssues: Boolean!, $withPulls: Boolean!,
+      $commitsCursor: String, $issuesCursor: String, $pullsCursor: String) {
+  rateLimit { cost remaining resetAt }
+  repository(owner: $owner, name: $name) {
+    name
+    nameWithOwner
+    description
+    url
+    stargazerCount
+    forkCount
+    primaryLanguage { name }
+    openIssues: issues(states: OPEN) @include(if: $withRepo) { totalCount }
+    openPulls: pullRequests(states: OPEN) @include(if: $withRepo) { totalCount }
+    defaultBranchRef @include(if: $withCommits) {
+      target {
+        ... on Commit {
+          history(first: 100, after: $commitsCursor, since: $since, until: $until) {
+            pageInfo { hasNextPage endCursor }
+            nodes {
+              oid
+              url
+              message
+              additions
+              deletions
+              changedFilesIfAvailable
+              author { name email date user { login } }
+              committer { name email date }
+            }
+          }
+        }
+      }
+    }
+    issues(first: 100, after: $issuesCursor, filterBy: {since: $issuesSince},
+           orderBy: {field: UPDATED_AT, direction: DESC}) @include(if: $withIssues) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        title
+        body
+        state
+        url
+        createdAt
+        updatedAt
+        closedAt
+        author { login }
+        comments { totalCount }
+      }
+    }
+    pullRequests(first: %d, after: $pullsCursor, orderBy: {field: UPDATED_AT, direction: DESC}) @include(if: $withPulls) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        title
+        body
+        state
+        url
+        createdAt
+        updatedAt
+        closedAt
+        mergedAt
+        additions
+        deletions
+        changedFiles
+        author { login }
+        files(first: 100) { nodes { path additions deletions changeType } }
+      }
+    }
+  }
+}
+""" % PULLS_PER_PAGE
+
+# REST reports file status in lower case and calls deletions "removed"
+FILE_STATUS = {"ADDED": "added", "DELETED": "removed", "MODIFIED": "modified",
+               "RENAMED": "renamed", "COPIED": "copied", "CHANGED": "changed"}
+
+def utc_timestamp(value):
+    # Git timestamps carry the committer's UTC offset; REST always reports UTC with a Z suffix
+    if not value:
+        return value
+    return to_github_time(datetime.fromisoformat(value.replace("Z", "+00:00")).astimezone(timezone.utc))
+
+def login_of(actor):
+    return {"login": actor["login"]} if actor else {"login": "ghost"}
+
+class GitHubGraphQLCollector(GitHubDataCollector):
+    def __init__(self, repo_url, **kwargs):
+        super().__init__(repo_url, **kwargs)
+        self.graphql_headers = {"Authorization": f"bearer {GITHUB_TOKEN}"}
+        self.last_run_stats = None
+
+    def _post(self, query, variables):
+        with self._request_slots:
+            response = self.session.post(GRAPHQL_URL, headers=self.graphql_headers,
+                                         json={"query": query, "variables": variables})
+        payload = response.json()
+        if payload.get("errors") and not payload.get("data"):
+            raise RuntimeError(f"GitHub GraphQL error: {payload['errors'][0].get('message', payload['errors'])}")
+        if "data" not in payload:
+            raise RuntimeError(f"GitHub GraphQL error: {payload.get('message', payload)}")
+        return payload["data"]
+
+    def collect_data(self, start_date, end_date, incremental=False):
+        if incremental:
+            # Incremental deltas are small REST listings already; the history store is shared
+            return super().collect_data(start_date, end_date, incremental=True)
+
+        owner, repo = self.repo_url.split("/")[-2:]
+        start = to_github_time(datetime.combine(start_date, datetime.min.time()))
+        end = to_github_time(datetime.combine(end_date, datetime.max.time()))
+        variables = {
+            "owner": owner, "name": repo, "since": start, "until": end, "issuesSince": start,
+            "withRepo": True, "withCommits": True, "withIssues": True, "withPulls": True,
+            "commitsCursor": None, "issuesCursor": None, "pullsCursor": None,
+        }
+
+        repo_info = None
+        commits, issues, pulls = [], [], []
+        stats = {"requests": 0, "cost": 0, "remaining": None, "reset_at": None}
+        while variables["withCommits"] or variables["withIssues"] or variables["withPulls"]:
+            data = self._post(WINDOW_QUERY, variables)
+            stats["requests"] += 1
+            if data.get("rateLimit"):
+                stats["cost"] += data["rateLimit"]["cost"]
+                stats["remaining"] = data["rateLimit"]["remaining"]
+                stats["reset_at"] = data["rateLimit"]["resetAt"]
+            repository = data["repository"]
+            if repository is None:
+                raise RuntimeError(f"Repository {owner}/{repo} not found")
+
+            if variables["withRepo"]:
+                repo_info = self._repo_info(repository)
+                variables["withRepo"] = False
+
+            if variables["withCommits"]:
+                branch = repository.get("defaultBranchRef")
+                history = branch["target"]["history"] if branch else {"nodes": [], "pageInfo": {"hasNextPage": False}}
+                commits.extend(self._commit(node, owner, repo) for node in history["nodes"])
+                variables["withCommits"] = history["pageInfo"]["hasNextPage"]
+                variables["commitsCursor"] = history["pageInfo"].get("endCursor")
+
+            if variables["withIssues"]:
+                connection = repository["issues"]
+                issues.extend(self._issue(node, owner, repo) for node in connection["nodes"])
+                variables["withIssues"] = connection["pageInfo"]["hasNextPage"]
+                variables["issuesCursor"] = connection["pageInfo"]["endCursor"]
+
+            if variables["withPulls"]:
+                connection = repository["pullRequests"]
+                nodes = connection["nodes"]
+                pulls.extend(self._pull_request(node, owner, repo) for node in nodes if start <= node["updatedAt"] <= end)
+                # Ordered by most recently updated, so stop once a page reaches past the window start
+                reached_start = bool(nodes) and nodes[-1]["updatedAt"] < start
+                variables["withPulls"] = connection["pageInfo"]["hasNextPage"] and not reached_start
+                variables["pullsCursor"] = connection["pageInfo"]["endCursor"]
+
+        self.last_run_stats = stats
+        print(f"GraphQL: {stats['requests']} requests, {stats['cost']} rate-limit points used, "
+              f"{stats['remaining']} remaining (resets {stats['reset_at']})")
+
+        data = {
+            "repo_info": repo_info,
+            "recent_commits": commits,
+            "recent_issues": issues,
+            "recent_pull_requests": pulls,
+        }
+        self.save_data(data)
+        return data
+
+    def _repo_info(self, repository):
+        return {
+            "name": repository["name"],
+            "full_name": repository["nameWithOwner"],
+            "description": repository["description"],
+            "html_url": repository["url"],
+            "stargazers_count": repository["stargazerCount"],
+            "forks_count": repository["forkCount"],
+            # REST counts open pull requests as open issues
+            "open_issues_count": repository["openIssues"]["totalCount"] + repository["openPulls"]["totalCount"],
+            "language": repository["primaryLanguage"]["name"] if repository["primaryLanguage"] else None,
+        }
+
+    def _commit(self, node, owner, repo):
+        author = node["author"] or {}
+        committer = node["committer"] or {}
+        return {
+            "sha": node["oid"],
+            "url": f"{self.api_base_url}/repos/{owner}/{repo}/commits/{node['oid']}",
+            "html_url": node["url"],
+            "commit": {
+                "message": node["message"],
+                "author": {"name": author.get("name"), "email": author.get("email"), "date": utc_timestamp(author.get("date"))},
+                "committer": {"name": committer.get("name"), "email": committer.get("email"), "date": utc_timestamp(committer.get("date"))},
+            },
+            "author": login_of(author.get("user")),
+            "stats": {"additions": node["additions"], "deletions": node["deletions"],
+                      "total": node["additions"] + node["deletions"]},
+            # GraphQL exposes only the number of changed files for commits, not the file list
+            "changed_files": node["changedFilesIfAvailable"],
+        }
+
+    def _issue(self, node, owner, repo):
+        return {
+            "number": node["number"],
+            "title": node["title"],
+            "body": node["body"],
+            "state": node["state"].lower(),
+            "url": f"{self.api_base_url}/repos/{owner}/{repo}/issues/{node['number']}",
+            "html_url": node["url"],
+            "user": login_of(node["author"]),
+            "created_at": node["createdAt"],
+            "updated_at": node["updatedAt"],
+            "closed_at": node["closedAt"],
+            "comments": node["comments"]["totalCount"],
+        }
+
+    def _pull_request(self, node, owner, repo):
+        return {
+            "number": node["number"],
+            "title": node["title"],
+            "body": node["body"],
+            # REST has no MERGED state; merged PRs are closed with merged_at set
+            "state": "open" if node["state"] == "OPEN" else "closed",
+            "url": f"{self.api_base_url}/repos/{owner}/{repo}/pulls/{node['number']}",
+            "html_url": node["url"],
+            "user": login_of(node["author"]),
+            "created_at": node["createdAt"],
+            "updated_at": node["updatedAt"],
+            "closed_at": node["closedAt"],
+            "merged_at": node["mergedAt"],
+            "additions": node["additions"],
+            "deletions": node["deletions"],
+            "changed_files": node["changedFiles"],
+            "files": [
+                {
+                    "filename": f["path"],
+                    "status": FILE_STATUS.get(f["changeType"], f["changeType"].lower()),
+                    "additions": f["additions"],
+                    "deletions": f["deletions"],
+                    "changes": f["additions"] + f["deletions"],
+                }
+                for f in node["files"]["nodes"]
+            ] if node.get("files") else [],
+        }
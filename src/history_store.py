@@ -0,0 +1,109 @@
+# src/history_store.py
+
+import json
+import os
+import tempfile
+from datetime import datetime
+from config import HISTORY_DIR
+
+GITHUB_TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+def to_github_time(value):
+    return value.strftime(GITHUB_TIME_FORMAT)
+
+def commit_date(commit):
+    # The commits endpoint filters since/until on the committer date
+    return commit['commit']['committer']['date']
+
+class RepoHistory:
+    def __init__(self, owner, repo, history_dir=HISTORY_DIR):
+        self.owner = owner
+        self.repo = repo
+        self.path = os.path.join(history_dir, f"{owner}_{repo}.json")
+        self.covered_since = None
+        # Where delta_since resumes each kind of fetch
+        self.marks = {"commit_date": None, "issues_updated_at": None, "pulls_updated_at": None}
+        self.commits = {}
+        self.issues = {}
+        self.pulls = {}
+        # Set by merge when anything changed, so a run that fetched nothing new skips the rewrite
+        self.dirty = False
+
+    @classmethod
+    def load(cls, owner, repo, history_dir=HISTORY_DIR):
+        history = cls(owner, repo, history_dir)
+        if os.path.exists(history.path):
+            with open(history.path, 'r') as f:
+                stored = json.load(f)
+            history.covered_since = stored["covered_since"]
+            # Files written before the SHA mark was dropped still carry it; only known marks are read
+            history.marks.update((name, value) for name, value in stored["marks"].items() if name in history.marks)
+            history.commits = stored["commits"]
+            history.issues = stored["issues"]
+            history.pulls = stored["pulls"]
+        return history
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Each save gets its own temp file, so concurrent runs for one repo never write into the same one
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({
+                    "covered_since": self.covered_since,
+                    "marks": self.marks,
+                    "commits": self.commits,
+                    "issues": self.issues,
+                    "pulls": self.pulls,
+                }, f)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+        self.dirty = False
+
+    def needs_backfill(self, start_datetime):
+        return self.covered_since is None or to_github_time(start_datetime) < self.covered_since
+
+    def delta_since(self, kind, start_datetime):
+        # Where the next fetch for commits/issues/pulls should start
+        if self.needs_backfill(start_datetime):
+            return start_datetime
+        mark = self.marks[{"commits": "commit_date", "issues": "issues_updated_at", "pulls": "pulls_updated_at"}[kind]]
+        return datetime.strptime(mark, GITHUB_TIME_FORMAT) if mark else start_datetime
+
+    def merge(self, commits=None, issues=None, pulls=None, covered_since=None):
+        before = (dict(self.marks), self.covered_since)
+        for store, items, key in ((self.commits, commits, 'sha'), (self.issues, issues, 'number'),
+                                  (self.pulls, pulls, 'number')):
+            for item in items or []:
+                if store.get(str(item[key])) != item:
+                    store[str(item[key])] = item
+                    self.dirty = True
+
+        if self.commits:
+            self.marks["commit_date"] = max(commit_date(commit) for commit in self.commits.values())
+        if self.issues:
+            self.marks["issues_updated_at"] = max(issue['updated_at'] for issue in self.issues.values())
+        if self.pulls:
+            self.marks["pulls_updated_at"] = max(pr['updated_at'] for pr in self.pulls.values())
+        if covered_since is not None:
+            covered_since = to_github_time(covered_since)
+            if self.covered_since is None or covered_since < self.covered_since:
+                self.covered_since = covered_since
+        if (self.marks, self.covered_since) != before:
+            self.dirty = True
+
+    def window(self, start_datetime, end_datetime):
+        # Mirrors what the non-incremental collector returns for the same window
+        start, end = to_github_time(start_datetime), to_github_time(end_datetime)
+        commits = [c for c in self.commits.values() if start <= commit_date(c) <= end]
+        issues = [i for i in self.issues.values() if start <= i['updated_at']]
+        pulls = [p for p in self.pulls.values() if start <= p['updated_at'] <= end]
+        return {
+            "recent_commits": sorted(commits, key=commit_date, reverse=True),
+            "recent_issues": sorted(issues, key=lambda i: i['created_at'], reverse=True),
+            "recent_pull_requests": sorted(pulls, key=lambda p: p['updated_at'], reverse=True),
+        }
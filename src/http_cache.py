@@ -0,0 +1,176 @@
+# src/http_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from urllib.parse import urlencode
+from config import CACHE_DIR, HTTP_CACHE_ENABLED, HTTP_CACHE_MAX_BYTES
+
+# Request headers that change what GitHub sends back for the same url
+REPRESENTATION_HEADERS = ("accept", "x-github-api-version")
+
+class CachedResponse:
+    # Stands in for a requests.Response when a 304 is answered from the cache
+    status_code = 200
+    from_cache = True
+
+    def __init__(self, body, headers, links):
+        self.content = body
+        self.headers = headers
+        self.links = links
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+class HTTPCache:
+    def __init__(self, path=None, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.path = path or os.path.join(CACHE_DIR, "http_cache.sqlite3")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    headers TEXT NOT NULL,
+                    links TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def make_key(url, params=None, headers=None):
+        # The token is left out, but headers that choose the representation are part of the key,
+        # so a .diff and the JSON of the same url are separate entries
+        query = urlencode(sorted((params or {}).items()))
+        lowered = {name.lower(): value for name, value in (headers or {}).items()}
+        vary = [f"{name}: {lowered[name]}" for name in REPRESENTATION_HEADERS if name in lowered]
+        return hashlib.sha256("\n".join([f"{url}?{query}"] + vary).encode("utf-8")).hexdigest()
+
+    def fetch(self, url, params, send, headers=None):
+        # send(extra_headers) performs the real request; validators from the cached
+        # entry are passed along so an unchanged resource comes back as a 304.
+        # GitHub does not charge authenticated 304 responses against the rate limit.
+        # headers are the request's own headers, used only for the cache key.
+        key = self.make_key(url, params, headers)
+        entry = self._load(key)
+        conditional = {}
+        if entry is not None:
+            if entry["etag"]:
+                conditional["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                conditional["If-Modified-Since"] = entry["last_modified"]
+
+        response = send(conditional)
+
+        if response.status_code == 304 and entry is not None:
+            self._touch(key)
+            with self._lock:
+                self.hits += 1
+            return CachedResponse(entry["body"], entry["headers"], entry["links"])
+
+        with self._lock:
+            self.misses += 1
+        if response.status_code == 200:
+            self._store(key, url, response)
+        return response
+
+    def _load(self, key):
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified, headers, links, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "etag": row[0],
+            "last_modified": row[1],
+            "headers": json.loads(row[2]),
+            "links": json.loads(row[3]),
+            "body": row[4],
+        }
+
+    def _touch(self, key):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+
+    def _store(self, key, url, response):
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        # Without a validator the entry could never be revalidated, so there is no point keeping it
+        if not etag and not last_modified:
+            return
+        headers = {name: response.headers[name] for name in ("ETag", "Last-Modified", "Link") if name in response.headers}
+        body = response.content
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, etag, last_modified, json.dumps(headers), json.dumps(response.links),
+                 body, len(body), time.time()),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        with self._lock:
+            self.evictions += evicted
+
+    def stats(self):
+        with closing(self._connect()) as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def clear(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM responses")
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_http_cache():
+    global _default_cache
+    if not HTTP_CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = HTTPCache()
+        return _default_cache
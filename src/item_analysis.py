@@ -0,0 +1,254 @@
+# src/item_analysis.py
+
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from commit_summarizer import get_commit_diff
+from dedup import cluster, commit_text, issue_text, make_report, stats as dedup_stats
+from diff_fetcher import iter_diff, render_diff
+from llm_telemetry import in_context
+from llm_integration import analyze_code_changes, summarize_issue, analyze_pull_request
+from config import (DEDUP_ENABLED, PREANALYSIS_ENABLED, PREANALYSIS_WORKERS, PREANALYSIS_LLM_CONCURRENCY,
+                    PREANALYSIS_GITHUB_CONCURRENCY, PREANALYSIS_MAX_ITEMS, PREANALYSIS_MAX_RESULTS)
+
+logger = logging.getLogger(__name__)
+
+FAILED_CODE_ANALYSIS = {
+    "summary": "AI analysis failed",
+    "impact": "Unknown",
+    "code_quality": "Unable to assess",
+    "suggestions": "No suggestions available due to analysis failure"
+}
+FAILED_ISSUE_SUMMARY = {
+    "summary": "AI summary failed",
+    "priority": "Unknown",
+    "suggested_action": "Unable to suggest action due to summary failure"
+}
+FAILED_PR_ANALYSIS = dict(FAILED_CODE_ANALYSIS, related_issues="Unable to identify related issues")
+
+def get_pr_diff(repo_name, pr_number):
+    return render_diff(iter_diff(repo_name, "pull", pr_number))
+
+def item_repo_name(item_type, item_data):
+    marker = '/commits' if item_type == "commit" else '/pulls'
+    return item_data['url'].split('/repos/')[1].split(marker)[0]
+
+def fetch_diff(item_type, item_data, github_slots=None):
+    repo_name = item_repo_name(item_type, item_data)
+    with github_slots or nullcontext():
+        if item_type == "commit":
+            logger.info(f"Fetching diff for commit {item_data['sha']} in repo {repo_name}")
+            return get_commit_diff(repo_name, item_data['sha'])
+        logger.info(f"Fetching diff for PR #{item_data['number']} in repo {repo_name}")
+        return get_pr_diff(repo_name, item_data['number'])
+
+def analyze_commit(commit_data, github_slots=None, llm_slots=None, diff=None):
+    repo_name = item_repo_name("commit", commit_data)
+    if diff is None:
+        diff = fetch_diff("commit", commit_data, github_slots)
+
+    try:
+        with llm_slots or nullcontext():
+            analysis = analyze_code_changes(commit_data['commit']['message'], diff)
+        # We don't need to summarize individual commits anymore
+        message = commit_data['commit']['message']
+    except Exception as e:
+        logger.error(f"Error in AI analysis: {str(e)}")
+        analysis = dict(FAILED_CODE_ANALYSIS)
+        message = "Unable to generate summary"
+    return {"repo_name": repo_name, "diff": diff, "analysis": analysis, "message": message}
+
+def analyze_issue(issue_data, github_slots=None, llm_slots=None, diff=None):
+    try:
+        with llm_slots or nullcontext():
+            analysis = summarize_issue(issue_data['title'], issue_data['body'])
+    except Exception as e:
+        logger.error(f"Error in AI summary: {str(e)}")
+        analysis = dict(FAILED_ISSUE_SUMMARY)
+    return {"analysis": analysis}
+
+def analyze_pull_request_item(pr_data, github_slots=None, llm_slots=None, diff=None):
+    repo_name = item_repo_name("pull_request", pr_data)
+    if diff is None:
+        diff = fetch_diff("pull_request", pr_data, github_slots)
+
+    try:
+        with llm_slots or nullcontext():
+            analysis = analyze_pull_request(pr_data['title'], pr_data['body'], diff)
+    except Exception as e:
+        logger.error(f"Error in AI analysis: {str(e)}")
+        analysis = dict(FAILED_PR_ANALYSIS)
+    return {"repo_name": repo_name, "diff": diff, "analysis": analysis}
+
+ANALYZERS = {
+    "commit": analyze_commit,
+    "issue": analyze_issue,
+    "pull_request": analyze_pull_request_item,
+}
+
+# Item types whose analysis needs the diff
+DIFF_ITEMS = ("commit", "pull_request")
+
+def analyze_item(item_type, item_data, github_slots=None, llm_slots=None, diff=None):
+    # diff, when the caller already has it, saves fetching it again
+    if item_type not in ANALYZERS:
+        raise ValueError(f"Unknown item type: {item_type}")
+    return ANALYZERS[item_type](item_data, github_slots, llm_slots, diff)
+
+def share_analysis(item_type, item_data, representative, github_slots=None, diff=None):
+    # A near-duplicate reuses its representative's analysis but keeps its own diff and message
+    if item_type == "commit":
+        if diff is None:
+            diff = fetch_diff("commit", item_data, github_slots)
+        result = {"repo_name": item_repo_name("commit", item_data), "diff": diff,
+                  "analysis": representative["analysis"], "message": item_data['commit']['message']}
+    else:
+        result = {"analysis": representative["analysis"]}
+    return result
+
+# Item types whose near-duplicates share one analysis, and the text they are compared by
+DEDUP_TEXT = {
+    "commit": commit_text,
+    "issue": issue_text,
+}
+
+def item_key(item_type, item_data):
+    # API urls are unique per commit, issue and PR across repositories
+    return (item_type, item_data.get('url') or item_data.get('sha') or item_data.get('number'))
+
+ITEM_TYPES = ("commit", "issue", "pull_request")
+
+def cap_items(items, limit):
+    # Splits the limit evenly across item types; whatever a type leaves unused goes to the others
+    typed = {item_type: [item for item in items if item[0] == item_type] for item_type in ITEM_TYPES}
+    quota = dict.fromkeys(ITEM_TYPES, 0)
+    remaining = limit
+    open_types = [t for t in ITEM_TYPES if typed[t]]
+    while remaining and open_types:
+        share = max(remaining // len(open_types), 1)
+        for item_type in list(open_types):
+            take = min(share, len(typed[item_type]) - quota[item_type], remaining)
+            quota[item_type] += take
+            remaining -= take
+            if quota[item_type] == len(typed[item_type]):
+                open_types.remove(item_type)
+    return [item for item_type in ITEM_TYPES for item in typed[item_type][:quota[item_type]]]
+
+class PreAnalyzer:
+    # Runs item analyses ahead of the user's clicks. Diff fetches and LLM calls have separate
+    # concurrency limits; results are kept per process and the least recently scheduled are dropped first.
+    def __init__(self, workers=PREANALYSIS_WORKERS, llm_concurrency=PREANALYSIS_LLM_CONCURRENCY,
+                 github_concurrency=PREANALYSIS_GITHUB_CONCURRENCY, max_items=PREANALYSIS_MAX_ITEMS,
+                 max_results=PREANALYSIS_MAX_RESULTS, analyze=analyze_item, dedup=DEDUP_ENABLED,
+                 share=share_analysis):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="preanalysis")
+        self.llm_slots = threading.BoundedSemaphore(llm_concurrency)
+        self.github_slots = threading.BoundedSemaphore(github_concurrency)
+        self.max_items = max_items
+        self.max_results = max_results
+        self.analyze = analyze
+        self.dedup = dedup
+        self.share = share
+        self._lock = threading.Lock()
+        self._futures = OrderedDict()
+        self._representatives = OrderedDict()
+
+    def schedule(self, data):
+        items = [("commit", c) for c in data.get('recent_commits', []) if isinstance(c, dict)]
+        items += [("issue", i) for i in data.get('recent_issues', []) if isinstance(i, dict)]
+        items += [("pull_request", p) for p in data.get('recent_pull_requests', []) if isinstance(p, dict)]
+        representatives = {}
+        if self.dedup:
+            items, representatives = self._collapse(items)
+        # The cap counts analyses, so it applies to what is left after collapsing near-duplicates
+        if self.max_items:
+            items = cap_items(items, self.max_items)
+
+        scheduled = 0
+        with self._lock:
+            self._representatives.update(representatives)
+            for item_type, item_data in items:
+                key = item_key(item_type, item_data)
+                if key in self._futures:
+                    self._futures.move_to_end(key)
+                    continue
+                self._futures[key] = self.executor.submit(
+                    in_context(self.analyze), item_type, item_data, self.github_slots, self.llm_slots)
+                scheduled += 1
+            while len(self._futures) > self.max_results:
+                _, future = self._futures.popitem(last=False)
+                future.cancel()
+            while len(self._representatives) > self.max_results:
+                self._representatives.popitem(last=False)
+        logger.info(f"Scheduled pre-analysis of {scheduled} items")
+        return scheduled
+
+    def _collapse(self, items):
+        # Only cluster representatives are analysed; every other member is mapped to its representative
+        kept = [(t, d) for t, d in items if t not in DEDUP_TEXT]
+        representatives = OrderedDict()
+        for item_type, text_of in DEDUP_TEXT.items():
+            typed = [d for t, d in items if t == item_type]
+            texts = [text_of(d) for d in typed]
+            groups = cluster(texts)
+            for group in groups:
+                kept.append((item_type, typed[group[0]]))
+                for member in group[1:]:
+                    representatives[item_key(item_type, typed[member])] = (item_type, typed[group[0]])
+            report = make_report(texts, groups)
+            dedup_stats.record(report)
+            logger.info(f"{item_type}: {report['items']} items in {report['clusters']} clusters, "
+                        f"~{report['tokens_saved']} prompt tokens saved")
+        return kept, representatives
+
+    def ready(self, item_type, item_data):
+        # The finished analysis, or None while it is pending, failed or was never scheduled
+        key = item_key(item_type, item_data)
+        with self._lock:
+            representative = self._representatives.get(key)
+            future = self._futures.get(key)
+        if representative is not None:
+            shared = self.ready(*representative)
+            return self.share(item_type, item_data, shared) if shared is not None else None
+        if future is None or not future.done() or future.cancelled() or future.exception() is not None:
+            return None
+        return future.result()
+
+    def result(self, item_type, item_data, diff=None):
+        # Finished analyses return at once and running ones are joined. Anything still queued is
+        # pulled out of the queue and analysed on the caller's thread instead of waiting its turn;
+        # failed ones are retried the same way.
+        key = item_key(item_type, item_data)
+        with self._lock:
+            representative = self._representatives.get(key)
+            future = self._futures.get(key)
+        if representative is not None:
+            return self.share(item_type, item_data, self.result(*representative), diff=diff)
+        if future is not None:
+            if future.cancel() or (future.done() and future.exception() is not None):
+                with self._lock:
+                    self._futures.pop(key, None)
+            else:
+                return future.result()
+        return self.analyze(item_type, item_data, diff=diff)
+
+    def status(self):
+        with self._lock:
+            futures = list(self._futures.values())
+            shared = len(self._representatives)
+        done = sum(1 for f in futures if f.done())
+        return {"tracked": len(futures), "done": done, "pending": len(futures) - done, "shared": shared}
+
+_pre_analyzer = None
+_pre_analyzer_lock = threading.Lock()
+
+def get_pre_analyzer():
+    global _pre_analyzer
+    if not PREANALYSIS_ENABLED:
+        return None
+    with _pre_analyzer_lock:
+        if _pre_analyzer is None:
+            _pre_analyzer = PreAnalyzer()
+        return _pre_analyzer
@@ -0,0 +1,137 @@
+# src/jobs.py
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from config import JOBS_WORKERS, JOB_RETENTION_SECONDS, JOBS_MAX_FINISHED
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+class Job:
+    def __init__(self, key, stages):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.stages = list(stages)
+        self.state = QUEUED
+        self.stage = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        # Bumped on every change, so watchers can wait for the next one
+        self.version = 0
+
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED)
+
+    def status(self):
+        completed = self.stages.index(self.stage) if self.stage in self.stages else 0
+        return {
+            "id": self.id,
+            "state": self.state,
+            "stage": self.stage,
+            "stages": self.stages,
+            "progress": 1.0 if self.state == DONE else round(completed / len(self.stages), 2) if self.stages else 0.0,
+            "error": self.error,
+            "queued_seconds": round((self.started_at or time.time()) - self.created_at, 3),
+            "run_seconds": round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None,
+            "version": self.version,
+        }
+
+class JobQueue:
+    # In-process job queue: a bounded worker pool runs submitted functions and tracks their
+    # progress. A submission whose key matches a queued or running job joins that job instead of
+    # starting another. Finished jobs are kept for JOB_RETENTION_SECONDS so results can be fetched.
+    def __init__(self, workers=JOBS_WORKERS, retention_seconds=JOB_RETENTION_SECONDS, max_finished=JOBS_MAX_FINISHED):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self.retention_seconds = retention_seconds
+        self.max_finished = max_finished
+        self._jobs = {}
+        self._active = {}
+        self._changed = threading.Condition()
+        self.submitted = 0
+        self.coalesced = 0
+
+    def submit(self, key, fn, stages=()):
+        # fn is called with a progress(stage) callback and its return value becomes the job's result
+        with self._changed:
+            self._expire()
+            self.submitted += 1
+            active = self._active.get(key)
+            if active is not None:
+                self.coalesced += 1
+                return active
+            job = Job(key, stages)
+            self._jobs[job.id] = job
+            self._active[key] = job
+        self.executor.submit(self._run, job, fn)
+        return job
+
+    def _update(self, job, **changes):
+        with self._changed:
+            for name, value in changes.items():
+                setattr(job, name, value)
+            job.version += 1
+            if job.finished and self._active.get(job.key) is job:
+                del self._active[job.key]
+            self._changed.notify_all()
+
+    def _progress(self, job, stage):
+        # Work a job started may outlive it (a background refresh, say); late stages are dropped
+        if not job.finished:
+            self._update(job, stage=stage)
+
+    def _run(self, job, fn):
+        self._update(job, state=RUNNING, started_at=time.time())
+        try:
+            result = fn(lambda stage: self._progress(job, stage))
+        except Exception as e:
+            logger.exception(f"Job {job.id} failed")
+            self._update(job, state=FAILED, error=str(e), finished_at=time.time())
+        else:
+            self._update(job, state=DONE, result=result, finished_at=time.time())
+
+    def _expire(self):
+        # Called with the lock held: drops finished jobs past retention, and the oldest beyond max_finished
+        finished = sorted((job for job in self._jobs.values() if job.finished), key=lambda job: job.finished_at)
+        cutoff = time.time() - self.retention_seconds
+        excess = len(finished) - self.max_finished
+        for index, job in enumerate(finished):
+            if job.finished_at < cutoff or index < excess:
+                del self._jobs[job.id]
+
+    def get(self, job_id):
+        with self._changed:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id, after_version=-1, timeout=None):
+        # Blocks until the job changes past after_version, finishes, or the timeout passes
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            self._changed.wait_for(lambda: job.version > after_version or job.finished, timeout)
+            return job.status()
+
+    def stats(self):
+        with self._changed:
+            states = {}
+            for job in self._jobs.values():
+                states[job.state] = states.get(job.state, 0) + 1
+            return {"jobs": states, "submitted": self.submitted, "coalesced": self.coalesced}
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue():
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
@@ -0,0 +1,116 @@
+# src/llm_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from config import CACHE_DIR, LLM_CACHE_ENABLED, LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_BYTES
+
+def normalize(value):
+    # Whitespace-only differences (CRLF, trailing spaces, surrounding blank lines) share an entry
+    if value is None:
+        return ""
+    text = str(value).replace("\r\n", "\n")
+    return "\n".join(line.rstrip() for line in text.split("\n")).strip()
+
+def make_key(signature_name, model, inputs):
+    normalized = {name: normalize(value) for name, value in sorted(inputs.items())}
+    payload = json.dumps([signature_name, model, normalized], separators=(',', ':'))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMCache:
+    def __init__(self, path=None, ttl=LLM_CACHE_TTL_SECONDS, max_bytes=LLM_CACHE_MAX_BYTES):
+        self.path = path or os.path.join(CACHE_DIR, "llm_cache.sqlite3")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self._lock = threading.Lock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    signature TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    outputs TEXT NOT NULL,
+                    tokens INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    def _connect(self):
+        # WAL lets Flask workers in separate processes read while one of them writes
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT outputs, tokens, created FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[2] > self.ttl:
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.tokens_saved += row[1]
+        return json.loads(row[0])
+
+    def set(self, key, signature_name, model, outputs, tokens):
+        body = json.dumps(outputs)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, signature_name, model, body, tokens, len(body), now, now),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        conn.execute("DELETE FROM results WHERE created < ?", (time.time() - self.ttl,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+
+    def stats(self):
+        with closing(self._connect()) as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "tokens_saved": self.tokens_saved,
+            "entries": entries,
+            "bytes": size,
+        }
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_llm_cache():
+    global _default_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+        return _default_cache
@@ -1,43 +1,91 @@
 # src/llm_integration.py
 
-import dspy
-from config import OPENAI_API_KEY, GPT_MODEL
-
-# Configure DSPy with OpenAI
-turbo = dspy.OpenAI(model=GPT_MODEL, api_key=OPENAI_API_KEY)
-dspy.settings.configure(lm=turbo)
-
-class CodeAnalyzer(dspy.Signature):
-    """Analyze code changes and provide insights."""
-    commit_message = dspy.InputField()
-    diff = dspy.InputField()
-    summary = dspy.OutputField()
-    impact = dspy.OutputField()
-    code_quality = dspy.OutputField()
-    suggestions = dspy.OutputField()
-
-class IssueSummarizer(dspy.Signature):
-    """Summarize an issue and provide recommendations."""
-    title = dspy.InputField()
-    body = dspy.InputField()
-    summary = dspy.OutputField()
-    priority = dspy.OutputField()
-    suggested_action = dspy.OutputField()
-
-class PRAnalyzer(dspy.Signature):
-    """Analyze a pull request and provide insights."""
-    title = dspy.InputField()
-    description = dspy.InputField()
-    diff = dspy.InputField()
-    summary = dspy.OutputField()
-    impact = dspy.OutputField()
-    code_quality = dspy.OutputField()
-    suggestions = dspy.OutputField()
-    related_issues = dspy.OutputField()
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from config import GPT_MODEL, SUMMARY_CHUNK_TOKENS, SUMMARY_CONCURRENCY, DEDUP_ENABLED, DIFF_COMPACTION_ENABLED
+from dedup import collapse_messages, repeats_note
+from diff_compactor import compact_diff
+from llm_cache import get_llm_cache, make_key
+from llm_telemetry import in_context, track_call
+from token_budget import estimate_tokens, pack_chunks, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+SIGNATURES = ("CodeAnalyzer", "CommitSummarizer", "CommitSummaryMerger", "IssueSummarizer", "PRAnalyzer")
+
+_lm = None
+_lm_lock = threading.Lock()
+# Seconds spent importing dspy and building the LM client, once it has happened
+lm_init_seconds = None
+
+def get_lm():
+    # dspy and the LM client are set up on the first call that misses the cache, then shared.
+    # The backend is chosen by LM_BACKEND (OpenAI unless recording or replaying).
+    global _lm, lm_init_seconds
+    with _lm_lock:
+        if _lm is None:
+            started = time.perf_counter()
+            import dspy
+            from lm_backend import create_lm
+            _lm = create_lm()
+            dspy.settings.configure(lm=_lm)
+            lm_init_seconds = time.perf_counter() - started
+            logger.info(f"LM initialized in {lm_init_seconds:.2f}s")
+    return _lm
+
+def configure_lm(lm):
+    # Replaces the LM for the whole process, e.g. with a ReplayLM in benchmarks
+    global _lm
+    import dspy
+    with _lm_lock:
+        _lm = lm
+        dspy.settings.configure(lm=lm)
+
+def __getattr__(name):
+    # The signature classes still resolve as llm_integration.<Name>, importing dspy only when asked for
+    if name in SIGNATURES:
+        import signatures
+        return getattr(signatures, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def predict(signature_name, **inputs):
+    # dspy.Predict behind the persistent result cache. Cache hits never import dspy.
+    # Every call is timed and recorded, hit or miss, in llm_telemetry.
+    cache = get_llm_cache()
+    key = make_key(signature_name, GPT_MODEL, inputs)
+    prompt_tokens = estimate_tokens("".join(str(v) for v in inputs.values()))
+    with track_call(signature_name, prompt_tokens) as call:
+        if cache is not None:
+            call["cache"] = "miss"
+            cached = cache.get(key)
+            if cached is not None:
+                call["cache"] = "hit"
+                return SimpleNamespace(**cached)
+
+        get_lm()
+        import dspy
+        import signatures
+        signature = getattr(signatures, signature_name)
+        result = dspy.Predict(signature)(**inputs)
+        outputs = {name: getattr(result, name) for name in signature.output_fields}
+        call["completion_tokens"] = estimate_tokens("".join(str(v) for v in outputs.values()))
+        if cache is not None:
+            cache.set(key, signature_name, GPT_MODEL, outputs, prompt_tokens + call["completion_tokens"])
+        return result
+
+def prompt_diff(diff, compact=DIFF_COMPACTION_ENABLED):
+    if not compact:
+        return diff
+    compacted, report = compact_diff(diff)
+    logger.debug(f"Diff compacted from {report['original_tokens']} to {report['compacted_tokens']} tokens")
+    return compacted
 
 def analyze_code_changes(commit_message, diff):
-    analyzer = dspy.Predict(CodeAnalyzer)
-    result = analyzer(commit_message=commit_message, diff=diff)
+    diff = prompt_diff(diff)
+    result = predict("CodeAnalyzer", commit_message=commit_message, diff=diff)
     return {
         "summary": result.summary,
         "impact": result.impact,
@@ -46,8 +94,7 @@ def analyze_code_changes(commit_message, diff):
     }
 
 def summarize_issue(title, body):
-    summarizer = dspy.Predict(IssueSummarizer)
-    result = summarizer(title=title, body=body)
+    result = predict("IssueSummarizer", title=title, body=body)
     return {
         "summary": result.summary,
         "priority": result.priority,
@@ -55,8 +102,8 @@ def summarize_issue(title, body):
     }
 
 def analyze_pull_request(title, description, diff):
-    analyzer = dspy.Predict(PRAnalyzer)
-    result = analyzer(title=title, description=description, diff=diff)
+    diff = prompt_diff(diff)
+    result = predict("PRAnalyzer", title=title, description=description, diff=diff)
     return {
         "summary": result.summary,
         "impact": result.impact,
@@ -64,3 +111,48 @@ def analyze_pull_request(title, description, diff):
         "suggestions": result.suggestions,
         "related_issues": result.related_issues
     }
+
+SUMMARY_FIELDS = ["bug_fixes", "feature_additions", "performance_improvements", "refactoring", "other"]
+
+def render_summary(summary):
+    return "\n".join(f"{field.replace('_', ' ').capitalize()}: {summary[field]}" for field in SUMMARY_FIELDS)
+
+def summarize_commits_for_period(commit_messages, chunk_tokens=SUMMARY_CHUNK_TOKENS, workers=SUMMARY_CONCURRENCY,
+                                 dedup=DEDUP_ENABLED):
+    # Near-duplicate messages (relands, bot bumps) are collapsed first, and how many each stood
+    # for is noted on the finished summary. Windows that fit the budget are summarized in one call.
+    # Larger ones are packed into chunks, summarized in parallel and merged level by level until one
+    # summary is left. Chunk boundaries are content-defined, so after the window shifts most chunks
+    # hit the LLM cache.
+    repeats = []
+    if dedup:
+        commit_messages, report = collapse_messages(commit_messages)
+        repeats = report["repeats"]
+        logger.info(f"Commit summary: {report['items']} messages in {report['clusters']} clusters, "
+                    f"~{report['tokens_saved']} prompt tokens saved")
+    summary = summarize_messages(commit_messages, chunk_tokens, workers)
+    if repeats:
+        summary["other"] = f"{summary['other']}\n{repeats_note(repeats)}"
+    return summary
+
+def summarize_messages(commit_messages, chunk_tokens, workers):
+    chunks = pack_chunks(commit_messages, chunk_tokens)
+    if len(chunks) <= 1:
+        result = predict("CommitSummarizer", commit_messages="\n".join(commit_messages))
+        return {field: getattr(result, field) for field in SUMMARY_FIELDS}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        summaries = list(executor.map(
+            in_context(lambda chunk: predict("CommitSummarizer", commit_messages="\n".join(chunk))), chunks))
+        while True:
+            # Each partial gets at most a quarter of the budget so every merge level shrinks the list
+            partials = [truncate_to_tokens(render_summary({field: getattr(s, field) for field in SUMMARY_FIELDS}),
+                                           chunk_tokens // 4) for s in summaries]
+            groups = pack_chunks(partials, chunk_tokens)
+            if len(groups) == len(partials):
+                groups = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+            summaries = list(executor.map(
+                in_context(lambda group: predict("CommitSummaryMerger", partial_summaries="\n\n".join(group))), groups))
+            if len(groups) == 1:
+                break
+    return {field: getattr(summaries[0], field) for field in SUMMARY_FIELDS}
@@ -0,0 +1,222 @@
+# src/llm_telemetry.py
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from config import LLM_TELEMETRY_LOG, LLM_TELEMETRY_LOG_MAX_BYTES, LLM_TELEMETRY_LOG_BACKUPS
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (64, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+# Which repo and request the calls in this context belong to, plus that run's running totals
+_context = contextvars.ContextVar("llm_telemetry_context", default=None)
+# Token counts reported by the LM backend for the call in progress on this thread
+_usage = threading.local()
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        # (upper bound, observations at or below it) pairs, ending with +Inf, as Prometheus expects
+        total = 0
+        pairs = []
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def snapshot(self):
+        return {"count": self.count, "sum": round(self.sum, 3),
+                "buckets": {str(bound): count for bound, count in self.cumulative()}}
+
+class SignatureStats:
+    def __init__(self):
+        self.calls = 0
+        self.cache = {"hit": 0, "miss": 0, "disabled": 0}
+        self.errors = {}
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.prompt_tokens = Histogram(TOKEN_BUCKETS)
+        self.completion_tokens = Histogram(TOKEN_BUCKETS)
+
+    def snapshot(self):
+        return {
+            "calls": self.calls,
+            "cache": dict(self.cache),
+            "errors": dict(self.errors),
+            "latency_seconds": self.latency.snapshot(),
+            "prompt_tokens": self.prompt_tokens.snapshot(),
+            "completion_tokens": self.completion_tokens.snapshot(),
+        }
+
+class RunUsage:
+    # Totals for one newsletter or request, for per-run budgets
+    def __init__(self, repo=None, request=None):
+        self.repo = repo
+        self.request = request
+        self.calls = 0
+        self.cache_hits = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def add(self, event):
+        with self._lock:
+            self.calls += 1
+            self.cache_hits += event["cache"] == "hit"
+            self.errors += event["error"] is not None
+            self.seconds += event["latency"]
+            self.prompt_tokens += event["prompt_tokens"]
+            self.completion_tokens += event["completion_tokens"]
+
+    def summary(self):
+        with self._lock:
+            return {"repo": self.repo, "request": self.request, "calls": self.calls, "cache_hits": self.cache_hits,
+                    "errors": self.errors, "seconds": round(self.seconds, 3),
+                    "prompt_tokens": self.prompt_tokens, "completion_tokens": self.completion_tokens}
+
+class LLMTelemetry:
+    def __init__(self, log_path=LLM_TELEMETRY_LOG, max_bytes=LLM_TELEMETRY_LOG_MAX_BYTES,
+                 backups=LLM_TELEMETRY_LOG_BACKUPS):
+        self._lock = threading.Lock()
+        self.signatures = {}
+        self.log_path = log_path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.log = None
+
+    def _logger(self):
+        # Opened on the first recorded call, so importing the module never touches the log file
+        with self._lock:
+            if self.log is None and self.log_path:
+                os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+                # A dedicated logger writing one JSON object per line, kept out of the app's own log output
+                self.log = logging.getLogger(f"llm_telemetry.{id(self)}")
+                self.log.setLevel(logging.INFO)
+                self.log.propagate = False
+                handler = RotatingFileHandler(self.log_path, maxBytes=self.max_bytes, backupCount=self.backups,
+                                              delay=True)
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                self.log.addHandler(handler)
+            return self.log
+
+    def record(self, event):
+        with self._lock:
+            stats = self.signatures.setdefault(event["signature"], SignatureStats())
+            stats.calls += 1
+            stats.cache[event["cache"]] += 1
+            if event["error"] is not None:
+                stats.errors[event["error"]] = stats.errors.get(event["error"], 0) + 1
+            # Cache hits cost neither time nor tokens, so they stay out of the histograms
+            if event["cache"] != "hit":
+                stats.latency.observe(event["latency"])
+                stats.prompt_tokens.observe(event["prompt_tokens"])
+                stats.completion_tokens.observe(event["completion_tokens"])
+        run = _context.get()
+        if run is not None:
+            run.add(event)
+        log = self._logger()
+        if log is not None:
+            log.info(json.dumps(event, separators=(',', ':')))
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.snapshot() for name, stats in sorted(self.signatures.items())}
+
+    def prometheus(self):
+        # Text exposition format, one labelled series per signature
+        lines = []
+        with self._lock:
+            items = sorted(self.signatures.items())
+            for name, help_text in (("llm_calls_total", "LLM calls by signature and cache status"),
+                                    ("llm_errors_total", "Failed LLM calls by signature and error class")):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+                for signature, stats in items:
+                    if name == "llm_calls_total":
+                        lines += [f'{name}{{signature="{signature}",cache="{status}"}} {count}'
+                                  for status, count in stats.cache.items()]
+                    else:
+                        lines += [f'{name}{{signature="{signature}",error="{error}"}} {count}'
+                                  for error, count in stats.errors.items()]
+            for name, attribute, help_text in (
+                    ("llm_latency_seconds", "latency", "Latency of uncached LLM calls"),
+                    ("llm_prompt_tokens", "prompt_tokens", "Prompt tokens of uncached LLM calls"),
+                    ("llm_completion_tokens", "completion_tokens", "Completion tokens of uncached LLM calls")):
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for signature, stats in items:
+                    histogram = getattr(stats, attribute)
+                    lines += [f'{name}_bucket{{signature="{signature}",le="{bound}"}} {count}'
+                              for bound, count in histogram.cumulative()]
+                    lines.append(f'{name}_sum{{signature="{signature}"}} {histogram.sum:.3f}')
+                    lines.append(f'{name}_count{{signature="{signature}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+telemetry = LLMTelemetry()
+
+@contextmanager
+def run_context(repo=None, request=None):
+    # Tags every LLM call made inside the block (including from threads started with
+    # contextvars.copy_context) with repo and request, and totals them up for the run
+    run = RunUsage(repo, request)
+    token = _context.set(run)
+    try:
+        yield run
+    finally:
+        _context.reset(token)
+
+def in_context(fn):
+    # Worker threads don't inherit context variables; each call runs in a copy of the caller's
+    # context so its LLM calls are attributed to the caller's repo and request
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+def add_usage(prompt_tokens, completion_tokens):
+    # Called by the LM backends with the token counts of each completion request
+    _usage.prompt_tokens = getattr(_usage, "prompt_tokens", 0) + (prompt_tokens or 0)
+    _usage.completion_tokens = getattr(_usage, "completion_tokens", 0) + (completion_tokens or 0)
+    _usage.reported = True
+
+@contextmanager
+def track_call(signature, estimate_prompt_tokens=0):
+    # Times one predict() call and records it. The caller sets call["cache"] and an estimated
+    # call["completion_tokens"], used when the LM backend reports no real usage.
+    _usage.prompt_tokens = _usage.completion_tokens = 0
+    _usage.reported = False
+    run = _context.get()
+    call = {"signature": signature, "cache": "disabled", "error": None,
+            "repo": run.repo if run else None, "request": run.request if run else None,
+            "prompt_tokens": estimate_prompt_tokens, "completion_tokens": 0}
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception as e:
+        call["error"] = type(e).__name__
+        raise
+    finally:
+        call["latency"] = round(time.perf_counter() - started, 4)
+        call["timestamp"] = round(time.time(), 3)
+        if call["cache"] == "hit":
+            call["prompt_tokens"] = call["completion_tokens"] = 0
+        elif _usage.reported:
+            call["prompt_tokens"] = _usage.prompt_tokens
+            call["completion_tokens"] = _usage.completion_tokens
+            call["tokens_estimated"] = False
+        else:
+            call["tokens_estimated"] = True
+        telemetry.record(call)
@@ -0,0 +1,170 @@
+# src/lm_backend.py
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import dsp
+import dspy
+from config import (OPENAI_API_KEY, GPT_MODEL, LM_BACKEND, LM_TAPE_PATH, LM_REPLAY_MISSING,
+                    LM_REPLAY_BASE_LATENCY_SECONDS, LM_REPLAY_TOKENS_PER_SECOND, LM_REPLAY_JITTER)
+from llm_telemetry import add_usage
+from token_budget import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Generation settings that change the completion; anything else dspy passes along is ignored for matching
+KEY_KWARGS = ("model", "temperature", "max_tokens", "n", "top_p")
+
+class ReplayMiss(KeyError):
+    pass
+
+def tape_key(prompt, kwargs):
+    settings = {name: kwargs[name] for name in KEY_KWARGS if name in kwargs}
+    payload = json.dumps([prompt, settings], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LatencyModel:
+    # Simulated LLM latency: a fixed request overhead plus generation at a steady token rate.
+    # Jitter is derived from the prompt, so a replayed run is reproducible even under concurrency.
+    def __init__(self, base_seconds=LM_REPLAY_BASE_LATENCY_SECONDS, tokens_per_second=LM_REPLAY_TOKENS_PER_SECOND,
+                 jitter=LM_REPLAY_JITTER):
+        self.base_seconds = base_seconds
+        self.tokens_per_second = tokens_per_second
+        self.jitter = jitter
+
+    def delay(self, key, completion_tokens):
+        seconds = self.base_seconds
+        if self.tokens_per_second:
+            seconds += completion_tokens / self.tokens_per_second
+        if self.jitter:
+            spread = int(key[:8], 16) / 0xFFFFFFFF * 2 - 1
+            seconds *= 1 + self.jitter * spread
+        return max(seconds, 0.0)
+
+def output_prefixes(prompt):
+    # The output field labels dspy still expects, read from the prompt's "Follow the following format." block
+    if "Follow the following format." not in prompt:
+        return []
+    format_block = prompt.split("Follow the following format.", 1)[1].split("---", 1)[0]
+    prefixes = re.findall(r"^([A-Z][\w ]*):", format_block, re.MULTILINE)
+    pending = prompt.rstrip().rsplit("\n", 1)[-1].rstrip(":").strip()
+    if pending not in prefixes:
+        return []
+    return prefixes[prefixes.index(pending):]
+
+def synthetic_completion(prompt, tokens_per_field=40):
+    # Fills every remaining output field in one completion, which is what dspy parses from a real model
+    prefixes = output_prefixes(prompt)
+    if not prefixes:
+        return " ".join(["lorem"] * tokens_per_field)
+    filler = lambda prefix: " ".join([prefix.lower().replace(" ", "_")] + ["lorem"] * (tokens_per_field - 1))
+    parts = [f" {filler(prefixes[0])}"] + [f"{prefix}: {filler(prefix)}" for prefix in prefixes[1:]]
+    return "\n\n".join(parts)
+
+class MeteredOpenAI(dspy.OpenAI):
+    # Reports the token counts OpenAI returns with each completion to llm_telemetry
+    def log_usage(self, response):
+        super().log_usage(response)
+        usage = response.get("usage") or {}
+        add_usage(usage.get("prompt_tokens"), usage.get("completion_tokens"))
+
+class RecordingLM(dsp.LM):
+    # Passes every request to a real LM and appends prompt, settings and completions to a JSONL tape
+    def __init__(self, lm, tape_path=LM_TAPE_PATH):
+        super().__init__(lm.kwargs["model"])
+        self.lm = lm
+        self.kwargs = lm.kwargs
+        self.provider = lm.provider
+        self.tape_path = tape_path
+        os.makedirs(os.path.dirname(os.path.abspath(tape_path)), exist_ok=True)
+        self._lock = threading.Lock()
+
+    def basic_request(self, prompt, **kwargs):
+        return self.lm.basic_request(prompt, **kwargs)
+
+    def __call__(self, prompt, only_completed=True, return_sorted=False, **kwargs):
+        started = time.perf_counter()
+        completions = self.lm(prompt, only_completed=only_completed, return_sorted=return_sorted, **kwargs)
+        latency = time.perf_counter() - started
+        settings = {**self.kwargs, **kwargs}
+        entry = {
+            "key": tape_key(prompt, settings),
+            "prompt": prompt,
+            "kwargs": {name: settings[name] for name in KEY_KWARGS if name in settings},
+            "completions": completions,
+            "latency": round(latency, 4),
+            "prompt_tokens": estimate_tokens(prompt),
+            "completion_tokens": sum(estimate_tokens(str(c)) for c in completions),
+        }
+        with self._lock, open(self.tape_path, "a", encoding="utf-8") as tape:
+            tape.write(json.dumps(entry) + "\n")
+        return completions
+
+class ReplayLM(dsp.LM):
+    # Serves completions from a tape recorded by RecordingLM, sleeping as the latency model says.
+    # Prompts missing from the tape raise ReplayMiss, or get a synthetic completion with missing="synthetic".
+    def __init__(self, tape_path=LM_TAPE_PATH, latency=None, missing=LM_REPLAY_MISSING, model=GPT_MODEL,
+                 sleep=time.sleep):
+        super().__init__(model)
+        self.provider = "replay"
+        self.tape_path = tape_path
+        self.latency = latency if latency is not None else LatencyModel()
+        self.missing = missing
+        self.sleep = sleep
+        self.tape = {}
+        if os.path.exists(tape_path):
+            with open(tape_path, encoding="utf-8") as tape:
+                for line in tape:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.tape[entry["key"]] = entry
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.misses = 0
+        self.simulated_seconds = 0.0
+
+    def basic_request(self, prompt, **kwargs):
+        # Looks the prompt up on the tape and returns its completions after the simulated latency
+        key = tape_key(prompt, {**self.kwargs, **kwargs})
+        entry = self.tape.get(key)
+        if entry is not None:
+            completions = entry["completions"]
+        elif self.missing == "synthetic":
+            completions = [synthetic_completion(prompt)]
+        else:
+            with self._lock:
+                self.misses += 1
+            raise ReplayMiss(f"Prompt {key[:12]} is not on the tape {self.tape_path}")
+
+        completion_tokens = sum(estimate_tokens(str(c)) for c in completions)
+        add_usage(estimate_tokens(prompt), completion_tokens)
+        delay = self.latency.delay(key, completion_tokens)
+        with self._lock:
+            self.calls += 1
+            self.misses += entry is None
+            self.simulated_seconds += delay
+        self.sleep(delay)
+        return completions
+
+    def __call__(self, prompt, only_completed=True, return_sorted=False, **kwargs):
+        return self.basic_request(prompt, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "misses": self.misses, "tape_entries": len(self.tape),
+                    "simulated_seconds": round(self.simulated_seconds, 3)}
+
+def create_lm(backend=LM_BACKEND):
+    if backend == "replay":
+        return ReplayLM()
+    if backend not in ("openai", "record"):
+        raise ValueError(f"Unknown LM backend: {backend}")
+    lm = MeteredOpenAI(model=GPT_MODEL, api_key=OPENAI_API_KEY)
+    if backend == "record":
+        logger.info(f"Recording LM calls to {LM_TAPE_PATH}")
+        return RecordingLM(lm)
+    return lm
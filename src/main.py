@@ -1,48 +1,82 @@
 # src/main.py
 
 import argparse
-from config import REPO_URL, RECIPIENTS, FREQUENCY
-from data_collector import GitHubDataCollector
-from data_processor import DataProcessor
-from llm_integration import generate_newsletter_content
-from newsletter_generator import NewsletterGenerator
+from config import REPO_URL, RECIPIENTS, FREQUENCY, COLLECTOR_BACKEND, BATCH_WORKERS, TRENDS_ENABLED
+from data_collector import create_collector
+from llm_integration import summarize_commits_for_period
+from llm_telemetry import run_context
+from newsletter_generator import generate_newsletter as render_newsletter
 from email_sender import send_newsletter
+from batch import default_window, load_manifest, run_batch, write_report
+from result_cache import get_result_cache, is_complete
 from datetime import datetime
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Repository Newsletter Generator")
-    parser.add_argument("--repo", required=True, help="GitHub repository URL")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--repo", help="GitHub repository URL")
+    target.add_argument("--batch", help="JSON manifest of repos, windows and recipients to generate in one process")
     parser.add_argument("--recipients", help="Comma-separated list of email recipients")
     parser.add_argument("--frequency", choices=['daily', 'weekly'], default='weekly', help="Newsletter frequency")
     parser.add_argument("--view", action="store_true", help="View the newsletter content without sending")
     parser.add_argument("--start_date", help="Start date for data collection (YYYY-MM-DD)")
     parser.add_argument("--end_date", help="End date for data collection (YYYY-MM-DD)")
+    parser.add_argument("--incremental", action="store_true", help="Only fetch activity newer than the stored history for this repo")
+    parser.add_argument("--backend", choices=['rest', 'graphql'], default=COLLECTOR_BACKEND, help="GitHub API used for data collection")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS, help="Parallel repos in --batch mode")
+    parser.add_argument("--output_dir", help="Write each --batch newsletter to this directory")
+    parser.add_argument("--report", default="batch_report.json", help="Where --batch writes its summary report")
     return parser.parse_args()
 
-def generate_newsletter(repo_url, start_date, end_date):
+def generate_newsletter(repo_url, start_date, end_date, incremental=False, backend=COLLECTOR_BACKEND):
+    # Served from the result cache when this repo, window and model were generated recently
+    compute = lambda: build_newsletter(repo_url, start_date, end_date, incremental, backend)
+    cache = get_result_cache()
+    if cache is None:
+        return compute()[0]
+    return cache.get_or_compute("newsletter", repo_url, start_date, end_date, compute)
+
+def build_newsletter(repo_url, start_date, end_date, incremental=False, backend=COLLECTOR_BACKEND):
+    # Returns the newsletter and whether it may be cached, i.e. every section was collected
+
     # Convert string dates to datetime objects
     start_date = datetime.strptime(start_date, '%Y-%m-%d')
     end_date = datetime.strptime(end_date, '%Y-%m-%d')
 
     # Collect data
-    collector = GitHubDataCollector(repo_url)
-    raw_data = collector.collect_data(start_date, end_date)
+    collector = create_collector(repo_url, backend)
+    raw_data = collector.collect_data(start_date, end_date, incremental=incremental)
+    raw_data['start_date'] = start_date.strftime('%Y-%m-%d')
+    raw_data['end_date'] = end_date.strftime('%Y-%m-%d')
 
-    # Process data
-    processor = DataProcessor(raw_data)
-    processed_data = processor.process_data()
+    # Generate the period summary using the LLM
+    with run_context(repo=repo_url, request="main") as usage:
+        summary = summarize_commits_for_period([commit['commit']['message'] for commit in raw_data['recent_commits']])
+    usage = usage.summary()
+    print(f"LLM usage for {repo_url}: {usage['calls']} calls ({usage['cache_hits']} cached), "
+          f"{usage['prompt_tokens']} prompt + {usage['completion_tokens']} completion tokens, {usage['seconds']}s")
 
-    # Generate content using LLM
-    newsletter_content = generate_newsletter_content(str(processed_data), str(raw_data))
+    # Week-over-week trends over every stored snapshot, including the one just collected
+    trends = collector.load_trends() if TRENDS_ENABLED else None
 
     # Generate newsletter
-    newsletter_gen = NewsletterGenerator(processed_data, newsletter_content)
-    final_newsletter_content = newsletter_gen.generate_newsletter()
+    return render_newsletter(raw_data, summary, trends=trends), is_complete(raw_data)
 
-    return final_newsletter_content
+def main_batch(args):
+    # One warm process: imports, LM configuration, HTTP pools and the rate-limit budget are shared
+    jobs = load_manifest(args.batch)
+    print(f"Generating {len(jobs)} newsletters with {args.workers} workers")
+    report = run_batch(jobs, generate_newsletter, send_newsletter, args.workers, args.output_dir)
+    write_report(report, args.report)
+    print(f"{report['succeeded']} succeeded, {report['failed']} failed, "
+          f"{report['repos_per_minute']} repos/minute")
 
 def main():
     args = parse_args()
+    if args.batch:
+        main_batch(args)
+        return
+
     global REPO_URL, RECIPIENTS, FREQUENCY
     REPO_URL = args.repo
     RECIPIENTS = args.recipients.split(',') if args.recipients else []
@@ -53,8 +87,13 @@ def main():
         print(f"Recipients: {RECIPIENTS}")
     print(f"Frequency: {FREQUENCY}")
 
+    if not args.start_date:
+        args.start_date, args.end_date = default_window(FREQUENCY, args.end_date)
+    elif not args.end_date:
+        args.end_date = datetime.now().strftime('%Y-%m-%d')
+
     try:
-        newsletter_content = generate_newsletter(REPO_URL, args.start_date, args.end_date)
+        newsletter_content = generate_newsletter(REPO_URL, args.start_date, args.end_date, args.incremental, args.backend)
 
         if args.view:
             print("\nNewsletter Content:")
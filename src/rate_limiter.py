@@ -0,0 +1,177 @@
+# src/rate_limiter.py
+
+import threading
+import time
+from config import (GITHUB_TOKENS, GITHUB_REQUESTS_PER_SECOND, GITHUB_BURST,
+                    GITHUB_MAX_RETRIES, GITHUB_MAX_WAIT_SECONDS)
+
+# GitHub asks clients to wait at least a minute after a secondary limit without Retry-After
+SECONDARY_LIMIT_BACKOFF_SECONDS = 60
+
+class RateLimitExceeded(RuntimeError):
+    pass
+
+def resource_for(url):
+    # Primary limits are tracked separately for REST, search and GraphQL
+    if url.rstrip("/").endswith("/graphql"):
+        return "graphql"
+    if "/search/" in url:
+        return "search"
+    return "core"
+
+def mask(token):
+    return f"...{token[-4:]}" if token else "anonymous"
+
+class TokenBucket:
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def take(self):
+        while True:
+            with self._lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+class GitHubScheduler:
+    def __init__(self, tokens=None, rate=GITHUB_REQUESTS_PER_SECOND, burst=GITHUB_BURST,
+                 max_retries=GITHUB_MAX_RETRIES, max_wait=GITHUB_MAX_WAIT_SECONDS,
+                 clock=time.time, sleep=time.sleep):
+        self.tokens = list(tokens if tokens is not None else GITHUB_TOKENS) or [None]
+        self.bucket = TokenBucket(rate, burst, sleep=sleep)
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        # (token, resource) -> {"remaining", "limit", "reset_at"}; token -> blocked-until timestamp
+        self._budgets = {}
+        self._blocked_until = {}
+        self.queue_depth = 0
+        self.requests_sent = 0
+        self.rate_limited = 0
+
+    def acquire(self, resource="core"):
+        with self._lock:
+            self.queue_depth += 1
+        try:
+            self.bucket.take()
+            waited = 0.0
+            while True:
+                token, wait = self._pick_token(resource)
+                if token is not None or wait is None:
+                    return token
+                if waited + wait > self.max_wait:
+                    raise RateLimitExceeded(
+                        f"GitHub {resource} rate limit exhausted on all {len(self.tokens)} token(s); "
+                        f"next budget in {wait:.0f}s")
+                self.sleep(wait)
+                waited += wait
+        finally:
+            with self._lock:
+                self.queue_depth -= 1
+
+    def _pick_token(self, resource):
+        # Returns (token, None) for the usable token with the most budget left, or
+        # (None, seconds) until the earliest token becomes usable again
+        now = self.clock()
+        best, best_remaining, next_free = None, None, None
+        with self._lock:
+            for token in self.tokens:
+                free_at = self._blocked_until.get(token, 0)
+                budget = self._budgets.get((token, resource))
+                if budget and budget["remaining"] <= 0 and budget["reset_at"] > now:
+                    free_at = max(free_at, budget["reset_at"])
+                if free_at > now:
+                    next_free = free_at if next_free is None else min(next_free, free_at)
+                    continue
+                # Tokens we have not heard about yet are assumed to have a full budget
+                remaining = budget["remaining"] if budget and budget["reset_at"] > now else float("inf")
+                if best_remaining is None or remaining > best_remaining:
+                    best, best_remaining = token, remaining
+        if best_remaining is not None:
+            return best, None
+        return None, max(next_free - now, 0.01)
+
+    def observe(self, token, resource, response, attempt=0):
+        # Records the budget GitHub reports and returns True when the request was rate-limited
+        headers = response.headers
+        now = self.clock()
+        with self._lock:
+            self.requests_sent += 1
+            if "X-RateLimit-Remaining" in headers:
+                resource = headers.get("X-RateLimit-Resource", resource)
+                self._budgets[(token, resource)] = {
+                    "remaining": int(headers["X-RateLimit-Remaining"]),
+                    "limit": int(headers.get("X-RateLimit-Limit", 0)),
+                    "reset_at": float(headers.get("X-RateLimit-Reset", now + 3600)),
+                }
+            if response.status_code not in (403, 429):
+                return False
+
+            retry_after = headers.get("Retry-After")
+            if retry_after is not None:
+                self._blocked_until[token] = now + float(retry_after)
+            elif headers.get("X-RateLimit-Remaining") == "0":
+                self._blocked_until[token] = float(headers.get("X-RateLimit-Reset", now + 60))
+            elif "secondary rate limit" in getattr(response, "text", "").lower():
+                self._blocked_until[token] = now + SECONDARY_LIMIT_BACKOFF_SECONDS * (2 ** attempt)
+            else:
+                # An ordinary 403 (permissions, unknown repo) is not retried
+                return False
+            self.rate_limited += 1
+            return True
+
+    def send(self, send, resource="core"):
+        # send(token) performs the request; rate-limited attempts are retried on the next usable token
+        for attempt in range(self.max_retries + 1):
+            token = self.acquire(resource)
+            response = send(token)
+            if not self.observe(token, resource, response, attempt):
+                return response
+        with self._lock:
+            blocked_until = self._blocked_until.get(token, self.clock())
+        raise RateLimitExceeded(
+            f"GitHub {resource} request rate-limited on all {self.max_retries + 1} attempts; last token "
+            f"{mask(token)} got HTTP {response.status_code} and resets in {max(blocked_until - self.clock(), 0):.0f}s")
+
+    def record_budget(self, token, resource, remaining, limit, reset_at):
+        # For clients that report their budget themselves instead of exposing response headers
+        if remaining is None or remaining < 0:
+            return
+        with self._lock:
+            self.requests_sent += 1
+            self._budgets[(token, resource)] = {"remaining": remaining, "limit": limit, "reset_at": reset_at}
+
+    def stats(self):
+        now = self.clock()
+        with self._lock:
+            return {
+                "queue_depth": self.queue_depth,
+                "requests_sent": self.requests_sent,
+                "rate_limited": self.rate_limited,
+                "bucket_tokens": round(self.bucket.tokens, 2),
+                "tokens": [
+                    {
+                        "token": mask(token),
+                        "blocked_for_seconds": max(self._blocked_until.get(token, 0) - now, 0),
+                        "budgets": {
+                            resource: dict(budget) for (t, resource), budget in self._budgets.items() if t == token
+                        },
+                    }
+                    for token in self.tokens
+                ],
+            }
+
+scheduler = GitHubScheduler()
@@ -0,0 +1,77 @@
+# src/renderer.py
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+from config import RENDER_CACHE_ENABLED, RENDER_CACHE_MAX_BYTES
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'templates')
+
+# Separate from Flask's environment so the CLI renders newsletters without an app context.
+# Templates are compiled on first use and kept compiled by the environment.
+env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+
+def content_key(name, context):
+    payload = json.dumps([name, context], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class RenderCache:
+    # In-memory LRU of rendered output, bounded by the total size of the stored strings
+    def __init__(self, max_bytes=RENDER_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, key, html):
+        size = len(html)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = html
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.bytes, "hits": self.hits, "misses": self.misses}
+
+render_cache = RenderCache() if RENDER_CACHE_ENABLED else None
+
+def render(name, cache=True, **context):
+    # Renders a template with autoescaping. Output is cached by a hash of the template name and
+    # context, so identical inputs are never rendered twice. The result is Markup, so it can be
+    # nested in another template without being escaped again.
+    if render_cache is None or not cache:
+        return Markup(env.get_template(name).render(**context))
+    key = content_key(name, context)
+    html = render_cache.get(key)
+    if html is None:
+        html = env.get_template(name).render(**context)
+        render_cache.put(key, html)
+    return Markup(html)
@@ -0,0 +1,214 @@
+# src/result_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import date, datetime, timezone
+from config import (CACHE_DIR, GPT_MODEL, RESULT_CACHE_ENABLED, RESULT_CACHE_LIVE_TTL_SECONDS,
+                    RESULT_CACHE_CLOSED_TTL_SECONDS, RESULT_CACHE_STALE_SECONDS, RESULT_CACHE_MAX_BYTES,
+                    RESULT_CACHE_REFRESH_WORKERS)
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SECTIONS = ("recent_commits", "recent_issues", "recent_pull_requests")
+
+def day(value):
+    # main.py passes 'YYYY-MM-DD' strings or datetimes, the web app passes dates
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def make_key(kind, repo_url, start_date, end_date, model=GPT_MODEL):
+    payload = json.dumps([kind, repo_url.rstrip("/"), day(start_date).isoformat(), day(end_date).isoformat(), model])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def window_ttl(end_date, today=None):
+    # A window that reaches today (in UTC, like GitHub's timestamps) still gains activity; one that
+    # ended earlier is effectively immutable
+    today = today or datetime.now(timezone.utc).date()
+    return RESULT_CACHE_LIVE_TTL_SECONDS if day(end_date) >= today else RESULT_CACHE_CLOSED_TTL_SECONDS
+
+def is_complete(data):
+    # A section that failed to collect is an error string; such a window is shown but never cached
+    return all(isinstance(data.get(section), list) for section in WINDOW_SECTIONS)
+
+class Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+class ResultCache:
+    # Finished newsletters in SQLite, shared by every worker process. compute() returns a
+    # (text, cacheable) pair. Within a process, concurrent lookups of one key share a single
+    # computation, and an entry past its TTL is served stale while one background refresh replaces it.
+    def __init__(self, path=None, stale_seconds=RESULT_CACHE_STALE_SECONDS, max_bytes=RESULT_CACHE_MAX_BYTES,
+                 refresh_workers=RESULT_CACHE_REFRESH_WORKERS):
+        self.path = path or os.path.join(CACHE_DIR, "result_cache.sqlite3")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.stale_seconds = stale_seconds
+        self.max_bytes = max_bytes
+        self.executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="result-refresh")
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    fresh_until REAL NOT NULL,
+                    stale_until REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _load(self, key, now):
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT body, fresh_until, stale_until FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None and now >= row[2]:
+                conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                return None
+            if row is not None:
+                conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+        return row
+
+    def _store(self, key, kind, body, ttl):
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (key, kind, body, len(body), now, now + ttl, now + ttl + self.stale_seconds, now))
+            self._evict(conn, now)
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM results WHERE stale_until <= ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+
+    def _join(self, key):
+        # Returns the key's flight and whether the caller has to run it
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Flight()
+            return flight, True
+
+    def _fly(self, key, kind, flight, compute, ttl):
+        try:
+            flight.value, cacheable = compute()
+            if cacheable:
+                self._store(key, kind, str(flight.value), ttl)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _refresh(self, key, kind, flight, compute, ttl):
+        try:
+            self._fly(key, kind, flight, compute, ttl)
+        except Exception:
+            # The stale entry stays in place until it expires or a later refresh succeeds
+            logger.exception(f"Background refresh of a {kind} result failed")
+            with self._lock:
+                self.refresh_failures += 1
+
+    def lookup(self, kind, repo_url, start_date, end_date, compute):
+        # The cached text, fresh or stale, or None; a stale hit starts a refresh unless one is running
+        key = make_key(kind, repo_url, start_date, end_date)
+        now = time.time()
+        row = self._load(key, now)
+        if row is None:
+            return None
+        body, fresh_until, _ = row
+        if now < fresh_until:
+            with self._lock:
+                self.hits += 1
+            return body
+        flight, leader = self._join(key)
+        with self._lock:
+            self.stale_hits += 1
+            if leader:
+                self.refreshes += 1
+        if leader:
+            self.executor.submit(self._refresh, key, kind, flight, compute, window_ttl(end_date))
+        return body
+
+    def get_or_compute(self, kind, repo_url, start_date, end_date, compute):
+        body = self.lookup(kind, repo_url, start_date, end_date, compute)
+        if body is not None:
+            return body
+        key = make_key(kind, repo_url, start_date, end_date)
+        flight, leader = self._join(key)
+        with self._lock:
+            self.misses += 1
+            if not leader:
+                self.coalesced += 1
+        if leader:
+            return self._fly(key, kind, flight, compute, window_ttl(end_date))
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def stats(self):
+        with closing(self._connect()) as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+                "coalesced": self.coalesced,
+                "refreshes": self.refreshes,
+                "refresh_failures": self.refresh_failures,
+                "in_flight": len(self._flights),
+                "entries": entries,
+                "bytes": size,
+            }
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_result_cache():
+    global _default_cache
+    if not RESULT_CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
@@ -0,0 +1,80 @@
+# src/signatures.py
+#
+# dspy signatures and modules. Importing dspy takes seconds, so this module is only imported
+# once an LLM call actually has to be made (see llm_integration.get_lm).
+
+import dspy
+from llm_integration import get_lm
+
+class CodeAnalyzer(dspy.Signature):
+    """Analyze code changes and provide insights."""
+    commit_message = dspy.InputField()
+    diff = dspy.InputField()
+    summary = dspy.OutputField()
+    impact = dspy.OutputField()
+    code_quality = dspy.OutputField()
+    suggestions = dspy.OutputField()
+
+class CommitSummarizer(dspy.Signature):
+    """Summarize commits for a given time period, focusing on major improvements."""
+    commit_messages = dspy.InputField(desc="List of commit messages for the time period")
+    bug_fixes = dspy.OutputField(desc="Summary of major bug fixes, without mentioning specific files or code")
+    feature_additions = dspy.OutputField(desc="Summary of significant feature additions, without mentioning specific files or code")
+    performance_improvements = dspy.OutputField(desc="Summary of notable performance improvements, without mentioning specific files or code")
+    refactoring = dspy.OutputField(desc="Summary of important refactoring efforts, without mentioning specific files or code")
+    other = dspy.OutputField(desc="Summary of other significant changes, without mentioning specific files or code")
+
+class CommitSummaryMerger(dspy.Signature):
+    """Merge partial summaries of one time period's commits into a single summary, focusing on major improvements."""
+    partial_summaries = dspy.InputField(desc="Summaries of consecutive batches of the period's commits")
+    bug_fixes = dspy.OutputField(desc="Summary of major bug fixes, without mentioning specific files or code")
+    feature_additions = dspy.OutputField(desc="Summary of significant feature additions, without mentioning specific files or code")
+    performance_improvements = dspy.OutputField(desc="Summary of notable performance improvements, without mentioning specific files or code")
+    refactoring = dspy.OutputField(desc="Summary of important refactoring efforts, without mentioning specific files or code")
+    other = dspy.OutputField(desc="Summary of other significant changes, without mentioning specific files or code")
+
+class IssueSummarizer(dspy.Signature):
+    """Summarize an issue and provide recommendations."""
+    title = dspy.InputField()
+    body = dspy.InputField()
+    summary = dspy.OutputField()
+    priority = dspy.OutputField()
+    suggested_action = dspy.OutputField()
+
+class PRAnalyzer(dspy.Signature):
+    """Analyze a pull request and provide insights."""
+    title = dspy.InputField()
+    description = dspy.InputField()
+    diff = dspy.InputField()
+    summary = dspy.OutputField()
+    impact = dspy.OutputField()
+    code_quality = dspy.OutputField()
+    suggestions = dspy.OutputField()
+    related_issues = dspy.OutputField()
+
+class CommitAnalyzer(dspy.Module):
+    def __init__(self):
+        super().__init__()
+        # Shares the pipeline's LM client instead of building its own
+        self.lm = get_lm()
+
+    def forward(self, commit_message, diff):
+        prompt = f"""
+        Analyze the following commit:
+
+        Commit message: {commit_message}
+
+        Git diff:
+        {diff}
+
+        Provide a structured analysis of this commit, including:
+        1. A brief summary of the main changes
+        2. The purpose or motivation behind the changes
+        3. Any potential impact on the codebase or functionality
+        4. Suggestions for code review or testing focus
+
+        Format your response in markdown.
+        """
+
+        response = self.lm(prompt)
+        return response
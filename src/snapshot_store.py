@@ -0,0 +1,265 @@
+# src/snapshot_store.py
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import zlib
+from contextlib import closing
+from datetime import datetime
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'github_data')
+LEGACY_FILENAME = re.compile(r'^(?P<name>.+)_(?P<timestamp>\d{8}_\d{6})\.json$')
+
+def encode(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+
+def item_key(item):
+    # Commits are identified by SHA, issues and PRs by number
+    if isinstance(item, dict):
+        for field in ('sha', 'number', 'full_name'):
+            if field in item:
+                return str(item[field])
+    return None
+
+class SnapshotStore:
+    # Every commit/issue/PR is stored once as a zlib-compressed object named by the hash of its
+    # content; a snapshot is just a compressed manifest of object hashes. The `latest` table is the
+    # per-repo index, so finding a repo's newest snapshot is a single primary-key lookup.
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DEFAULT_DATA_DIR, 'snapshots.sqlite3')
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS objects (
+                    hash TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    item_key TEXT,
+                    body BLOB NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    repo TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    manifest BLOB NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS snapshots_repo ON snapshots (repo, created_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS latest (
+                    repo TEXT PRIMARY KEY,
+                    snapshot_id INTEGER NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _put_object(self, conn, kind, value):
+        body = encode(value)
+        digest = hashlib.sha256(body).hexdigest()
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO objects VALUES (?, ?, ?, ?)",
+            (digest, kind, item_key(value), zlib.compress(body, 9)),
+        )
+        return digest, cursor.rowcount
+
+    def _get_objects(self, conn, hashes):
+        objects = {}
+        unique = list(set(hashes))
+        # Stay below SQLite's bound-parameter limit
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            rows = conn.execute(
+                f"SELECT hash, body FROM objects WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            objects.update((digest, json.loads(zlib.decompress(body))) for digest, body in rows)
+        return objects
+
+    def save(self, repo, data, created_at=None):
+        created_at = (created_at or datetime.now()).strftime('%Y-%m-%dT%H:%M:%S')
+        manifest = {}
+        new_objects = 0
+        with closing(self._connect()) as conn, conn:
+            for section, value in data.items():
+                if isinstance(value, list) and all(isinstance(item, dict) for item in value):
+                    hashes = []
+                    for item in value:
+                        digest, inserted = self._put_object(conn, section, item)
+                        hashes.append(digest)
+                        new_objects += inserted
+                    manifest[section] = {"objects": hashes}
+                elif isinstance(value, dict):
+                    digest, inserted = self._put_object(conn, section, value)
+                    new_objects += inserted
+                    manifest[section] = {"object": digest}
+                else:
+                    # Error strings and scalars are kept inline
+                    manifest[section] = {"value": value}
+
+            cursor = conn.execute(
+                "INSERT INTO snapshots (repo, created_at, manifest) VALUES (?, ?, ?)",
+                (repo, created_at, zlib.compress(json.dumps(manifest, separators=(',', ':')).encode('utf-8'), 9)),
+            )
+            snapshot_id = cursor.lastrowid
+            conn.execute(
+                "INSERT INTO latest VALUES (?, ?, ?) "
+                "ON CONFLICT(repo) DO UPDATE SET snapshot_id = excluded.snapshot_id, created_at = excluded.created_at "
+                "WHERE excluded.created_at >= latest.created_at",
+                (repo, snapshot_id, created_at),
+            )
+        return snapshot_id, new_objects
+
+    def load(self, snapshot_id):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT manifest FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+            if row is None:
+                return None
+            manifest = json.loads(zlib.decompress(row[0]))
+            hashes = []
+            for entry in manifest.values():
+                hashes.extend(entry.get("objects", []))
+                if "object" in entry:
+                    hashes.append(entry["object"])
+            objects = self._get_objects(conn, hashes)
+
+        data = {}
+        for section, entry in manifest.items():
+            if "objects" in entry:
+                data[section] = [objects[digest] for digest in entry["objects"]]
+            elif "object" in entry:
+                data[section] = objects[entry["object"]]
+            else:
+                data[section] = entry["value"]
+        return data
+
+    def latest_snapshot_id(self, repo):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT snapshot_id FROM latest WHERE repo = ?", (repo,)).fetchone()
+        return row[0] if row else None
+
+    def load_latest(self, repo):
+        snapshot_id = self.latest_snapshot_id(repo)
+        return self.load(snapshot_id) if snapshot_id is not None else None
+
+    def load_history(self, repo, sections=("recent_commits", "recent_issues", "recent_pull_requests"), after_id=None):
+        # Every item seen in any of the repo's snapshots (only those with an id above after_id, if
+        # given), once each. The version from the newest snapshot wins, and objects shared between
+        # snapshots are only decompressed once.
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT manifest FROM snapshots WHERE repo = ? AND id > ? ORDER BY created_at, id",
+                (repo, after_id if after_id is not None else -1)
+            ).fetchall()
+            ordered = {section: {} for section in sections}
+            for (manifest,) in rows:
+                manifest = json.loads(zlib.decompress(manifest))
+                for section in sections:
+                    for digest in manifest.get(section, {}).get("objects", []):
+                        # Re-inserting moves a digest seen again to its newest position
+                        ordered[section].pop(digest, None)
+                        ordered[section][digest] = True
+            unique = list({digest for section in sections for digest in ordered[section]})
+            item_keys = {}
+            for i in range(0, len(unique), 500):
+                chunk = unique[i:i + 500]
+                item_keys.update(conn.execute(
+                    f"SELECT hash, item_key FROM objects WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+            latest = {section: {} for section in sections}
+            for section in sections:
+                for digest in ordered[section]:
+                    latest[section][item_keys.get(digest) or digest] = digest
+            objects = self._get_objects(conn, [d for section in sections for d in latest[section].values()])
+        return {section: [objects[digest] for digest in latest[section].values()] for section in sections}
+
+    def list_snapshots(self, repo):
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT id, created_at FROM snapshots WHERE repo = ? ORDER BY created_at", (repo,)
+            ).fetchall()
+        return [{"id": row[0], "created_at": row[1]} for row in rows]
+
+    def has_snapshot(self, repo, created_at):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT 1 FROM snapshots WHERE repo = ? AND created_at = ?",
+                               (repo, created_at.strftime('%Y-%m-%dT%H:%M:%S'))).fetchone()
+        return row is not None
+
+    def size_bytes(self):
+        # Include the WAL so the figure reflects what is actually on disk
+        return sum(os.path.getsize(p) for p in (self.path, f"{self.path}-wal") if os.path.exists(p))
+
+    def compact(self):
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("VACUUM")
+
+def migrate_json_snapshots(store, data_dir=DEFAULT_DATA_DIR, delete=False):
+    # Imports legacy owner_repo_timestamp.json dumps, oldest first so `latest` ends up correct.
+    # Files already in the store are skipped, so an interrupted migration can simply be rerun.
+    legacy_files = []
+    for filename in os.listdir(data_dir):
+        match = LEGACY_FILENAME.match(filename)
+        if match:
+            created_at = datetime.strptime(match.group('timestamp'), '%Y%m%d_%H%M%S')
+            legacy_files.append((created_at, filename))
+
+    # Compact first, so the size difference counts only what this import adds
+    store.compact()
+    size_before = store.size_bytes()
+    json_bytes = 0
+    imported = 0
+    skipped = 0
+    for created_at, filename in sorted(legacy_files):
+        filepath = os.path.join(data_dir, filename)
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+        repo_info = data.get("repo_info")
+        repo = repo_info.get("full_name") if isinstance(repo_info, dict) else None
+        if not repo:
+            print(f"Skipping {filename}: no repo_info.full_name")
+            continue
+        if store.has_snapshot(repo, created_at):
+            skipped += 1
+        else:
+            store.save(repo, data, created_at=created_at)
+            json_bytes += os.path.getsize(filepath)
+            imported += 1
+        if delete:
+            os.remove(filepath)
+
+    store.compact()
+    store_bytes = store.size_bytes() - size_before
+    return {
+        "files": imported,
+        "skipped": skipped,
+        "json_bytes": json_bytes,
+        "store_bytes": store_bytes,
+        "saved_bytes": json_bytes - store_bytes,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Import legacy github_data JSON snapshots into the snapshot store")
+    parser.add_argument("--data_dir", default=DEFAULT_DATA_DIR, help="Directory holding owner_repo_timestamp.json files")
+    parser.add_argument("--delete", action="store_true", help="Remove the JSON files after importing them")
+    args = parser.parse_args()
+
+    store = SnapshotStore(os.path.join(args.data_dir, 'snapshots.sqlite3'))
+    report = migrate_json_snapshots(store, args.data_dir, delete=args.delete)
+    print(f"Imported {report['files']} snapshots, skipped {report['skipped']} already imported")
+    print(f"JSON files:     {report['json_bytes'] / 1024:.1f} KiB")
+    print(f"Snapshot store: {report['store_bytes'] / 1024:.1f} KiB")
+    if report['json_bytes']:
+        print(f"Saved:          {report['saved_bytes'] / 1024:.1f} KiB "
+              f"({100 * report['saved_bytes'] / report['json_bytes']:.1f}%)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# src/token_budget.py
+
+import hashlib
+
+# OpenAI tokenizers average roughly four characters of English or code per token.
+# Good enough for budgeting and reporting without pulling in a tokenizer.
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text):
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text, max_tokens):
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars]
+
+def is_chunk_boundary(text, tokens, target_tokens):
+    # A chunk ends after a message with probability tokens / target_tokens, decided by the message's
+    # own hash. Boundaries therefore depend only on content, not on where the list starts, so a window
+    # shifted by a day re-creates the same chunks everywhere except at its two ends.
+    digest = int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+    return digest % max(target_tokens, 1) < tokens
+
+def pack_chunks(texts, max_tokens, target_tokens=None):
+    # Groups texts, in order, into chunks averaging target_tokens and never exceeding max_tokens.
+    # A single text larger than max_tokens is truncated to fit on its own.
+    target_tokens = target_tokens or max_tokens // 2
+    chunks = []
+    current, current_tokens = [], 0
+    for text in texts:
+        text = truncate_to_tokens(text, max_tokens - 1)
+        tokens = estimate_tokens(text) + 1
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+        if is_chunk_boundary(text, tokens, target_tokens):
+            chunks.append(current)
+            current, current_tokens = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,211 @@
+# src/trends.py
+
+import logging
+import os
+import tempfile
+import zipfile
+import numpy as np
+from config import TRENDS_WEEKS, TRENDS_ROLLING_WEEKS, TRENDS_CACHE_DIR
+from snapshot_store import item_key
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400
+WEEK = 7 * DAY
+# The Unix epoch fell on a Thursday; shifting by three days makes every week start on a Monday
+WEEK_OFFSET = 3 * DAY
+# Stands in for a missing timestamp (open issues, unmerged pull requests) in the int64 columns
+MISSING = -1
+
+def to_seconds(values):
+    # GitHub timestamps ("2024-09-18T11:01:23Z") to epoch seconds, parsed by numpy in one call
+    parsed = np.array([value[:19] if value else "NaT" for value in values], dtype="datetime64[s]")
+    seconds = parsed.astype(np.int64)
+    seconds[np.isnat(parsed)] = MISSING
+    return seconds
+
+def week_of(seconds):
+    return (seconds + WEEK_OFFSET) // WEEK
+
+def week_start(week):
+    return str(np.datetime64(int(week * WEEK - WEEK_OFFSET), "s").astype("datetime64[D]"))
+
+def keys_of(items):
+    return np.array([item_key(item) or "" for item in items], dtype=str)
+
+class TrendFrame:
+    # A repo's snapshot history as typed columns: one int64 array per timestamp field, commit
+    # authors as int32 codes into `authors`, and each row's SHA or number so newer snapshots can
+    # replace the rows they update
+    COLUMNS = ("commit_key", "commit_time", "commit_author", "issue_key", "issue_created", "issue_closed",
+               "pull_key", "pull_created", "pull_merged")
+    SECTIONS = {"commit": ("commit_key", "commit_time", "commit_author"),
+                "issue": ("issue_key", "issue_created", "issue_closed"),
+                "pull": ("pull_key", "pull_created", "pull_merged")}
+
+    def __init__(self, authors, **columns):
+        self.authors = authors
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+
+    @classmethod
+    def from_history(cls, history):
+        commits = [c for c in history.get("recent_commits", []) if isinstance(c, dict) and "commit" in c]
+        # The issues endpoint lists pull requests too; they are counted from recent_pull_requests
+        issues = [i for i in history.get("recent_issues", []) if isinstance(i, dict) and "pull_request" not in i]
+        pulls = [p for p in history.get("recent_pull_requests", []) if isinstance(p, dict)]
+
+        codes = {}
+        names = ((c["commit"].get("author") or {}).get("name", "Unknown") for c in commits)
+        commit_author = np.fromiter((codes.setdefault(name, len(codes)) for name in names),
+                                    dtype=np.int32, count=len(commits))
+        return cls(
+            np.array(list(codes), dtype=str),
+            commit_key=keys_of(commits),
+            issue_key=keys_of(issues),
+            pull_key=keys_of(pulls),
+            commit_time=to_seconds([(c["commit"].get("committer") or {}).get("date") for c in commits]),
+            commit_author=commit_author,
+            issue_created=to_seconds([i.get("created_at") for i in issues]),
+            issue_closed=to_seconds([i.get("closed_at") for i in issues]),
+            pull_created=to_seconds([p.get("created_at") for p in pulls]),
+            pull_merged=to_seconds([p.get("merged_at") for p in pulls]),
+        )
+
+    def merge(self, newer):
+        # This frame with `newer`'s rows appended; a row whose key reappears in `newer` is replaced
+        codes = {name: code for code, name in enumerate(self.authors.tolist())}
+        remap = np.array([codes.setdefault(name, len(codes)) for name in newer.authors.tolist()], dtype=np.int32)
+        columns = {}
+        for key, *values in self.SECTIONS.values():
+            new_keys = getattr(newer, key)
+            keep = ~np.isin(getattr(self, key), new_keys[new_keys != ""])
+            for name in (key, *values):
+                added = getattr(newer, name)
+                if name == "commit_author":
+                    added = remap[added]
+                columns[name] = np.concatenate((getattr(self, name)[keep], added))
+        return TrendFrame(np.array(list(codes), dtype=str), **columns)
+
+    def save(self, path, stamp):
+        # A temp file of its own per writer, so concurrent requests for one repo never share one
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, stamp=np.array(stamp), authors=self.authors,
+                         **{name: getattr(self, name) for name in self.COLUMNS})
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as stored:
+            return cls(stored["authors"], **{name: stored[name] for name in cls.COLUMNS}), str(stored["stamp"])
+
+def load_frame(store, repo, cache_dir=TRENDS_CACHE_DIR):
+    # The cached columns are stamped with the newest snapshot id they include. Every collection adds
+    # a snapshot, so the usual case is merging in just the snapshots saved since.
+    snapshots = store.list_snapshots(repo)
+    if not snapshots:
+        return None
+    stamp = max(snapshot["id"] for snapshot in snapshots)
+    path = os.path.join(cache_dir, f"{repo.replace('/', '_')}.npz")
+    frame = None
+    if os.path.exists(path):
+        try:
+            frame, cached_stamp = TrendFrame.load(path)
+            cached_stamp = int(cached_stamp)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            logger.warning(f"Rebuilding unreadable trend cache {path}: {e}")
+            frame = None
+    if frame is not None and cached_stamp == stamp:
+        return frame
+    if frame is not None:
+        # A newer snapshot only supersedes cached rows if it was also taken later; an imported
+        # older snapshot changes which versions win, so that needs a full rebuild
+        cached_at = max((s["created_at"] for s in snapshots if s["id"] <= cached_stamp), default=None)
+        if cached_at is not None and all(s["created_at"] >= cached_at for s in snapshots if s["id"] > cached_stamp):
+            frame = frame.merge(TrendFrame.from_history(store.load_history(repo, after_id=cached_stamp)))
+        else:
+            frame = None
+    if frame is None:
+        frame = TrendFrame.from_history(store.load_history(repo))
+    os.makedirs(cache_dir, exist_ok=True)
+    frame.save(path, str(stamp))
+    return frame
+
+def per_week(seconds, origin, span):
+    weeks = week_of(seconds[seconds != MISSING]) - origin
+    return np.bincount(weeks[(weeks >= 0) & (weeks < span)], minlength=span)
+
+def grouped_median(groups, values, size):
+    # Median of values per group id in [0, size), NaN for empty groups, from one sort
+    order = np.lexsort((values, groups))
+    values = values[order]
+    counts = np.bincount(groups, minlength=size)
+    starts = np.cumsum(counts) - counts
+    medians = np.full(size, np.nan)
+    present = counts > 0
+    low = starts[present] + (counts[present] - 1) // 2
+    high = starts[present] + counts[present] // 2
+    medians[present] = (values[low] + values[high]) / 2
+    return medians
+
+def weekly_trends(frame, weeks=TRENDS_WEEKS, window=TRENDS_ROLLING_WEEKS):
+    # Per-week metrics for the last `weeks` weeks that have any recorded activity. The span
+    # computed reaches back window - 1 weeks further for the rolling average, and one more for churn.
+    times = [column[column != MISSING] for column in
+             (frame.commit_time, frame.issue_created, frame.issue_closed, frame.pull_created, frame.pull_merged)]
+    times = [column for column in times if column.size]
+    if not times:
+        return None
+    last_week = int(week_of(max(column.max() for column in times)))
+    first_week = int(week_of(min(column.min() for column in times)))
+    weeks = min(weeks, last_week - first_week + 1)
+    span = weeks + window
+    origin = last_week - span + 1
+
+    commits = per_week(frame.commit_time, origin, span)
+    totals = np.concatenate(([0], np.cumsum(commits)))
+    rolling = (totals[window:] - totals[:-window]) / window
+
+    closed = frame.issue_closed != MISSING
+    close_weeks = week_of(frame.issue_closed[closed]) - origin
+    close_days = (frame.issue_closed[closed] - frame.issue_created[closed]) / DAY
+    recent = (close_weeks >= 0) & (close_weeks < span)
+    days_to_close = grouped_median(close_weeks[recent], close_days[recent], span)
+
+    # Contributor churn: who committed in each week, first commits ever, and who stopped after last week
+    dated = frame.commit_time != MISSING
+    commit_weeks = week_of(frame.commit_time) - origin
+    first_weeks = np.full(len(frame.authors), np.iinfo(np.int64).max)
+    np.minimum.at(first_weeks, frame.commit_author[dated], commit_weeks[dated])
+    in_span = dated & (commit_weeks >= 0) & (commit_weeks < span)
+    active = np.zeros((len(frame.authors), span), dtype=bool)
+    active[frame.commit_author[in_span], commit_weeks[in_span]] = True
+    new = np.bincount(first_weeks[(first_weeks >= 0) & (first_weeks < span)], minlength=span)
+    if dated.any():
+        # Everyone is "new" in the first recorded week, which says nothing about the project
+        new[:max(int(week_of(frame.commit_time[dated].min())) - origin + 1, 0)] = 0
+    churned = np.concatenate(([0], (active[:, :-1] & ~active[:, 1:]).sum(axis=0)))
+
+    shown = slice(span - weeks, span)
+    return {
+        "weeks": [week_start(origin + week) for week in range(span - weeks, span)],
+        "commits": commits[shown].tolist(),
+        "commits_rolling": np.round(rolling[-weeks:], 1).tolist(),
+        "issues_opened": per_week(frame.issue_created, origin, span)[shown].tolist(),
+        "issues_closed": per_week(frame.issue_closed, origin, span)[shown].tolist(),
+        "median_days_to_close": [None if np.isnan(d) else round(float(d), 1) for d in days_to_close[shown]],
+        "pull_requests_merged": per_week(frame.pull_merged, origin, span)[shown].tolist(),
+        "active_contributors": active.sum(axis=0)[shown].tolist(),
+        "new_contributors": new[shown].tolist(),
+        "churned_contributors": churned[shown].tolist(),
+        "rolling_weeks": window,
+    }
+
+def repo_trends(store, repo, weeks=TRENDS_WEEKS, window=TRENDS_ROLLING_WEEKS, cache_dir=TRENDS_CACHE_DIR):
+    frame = load_frame(store, repo, cache_dir)
+    return weekly_trends(frame, weeks, window) if frame is not None else None
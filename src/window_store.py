@@ -0,0 +1,107 @@
+# src/window_store.py
+
+import threading
+import uuid
+from collections import OrderedDict
+from config import WINDOW_CACHE_SIZE
+
+SECTIONS = {
+    "commits": "recent_commits",
+    "issues": "recent_issues",
+    "pull_requests": "recent_pull_requests",
+}
+
+# What a list row needs; anything else is fetched per item when it is opened
+DEFAULT_FIELDS = {
+    "commits": ("sha", "commit.message", "commit.author.name", "commit.author.date"),
+    "issues": ("number", "title", "state", "user.login"),
+    "pull_requests": ("number", "title", "state", "user.login"),
+}
+
+def lookup(item, path):
+    value = item
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+def project(item, fields):
+    # Copies only the dotted-path fields, keeping their nesting: "commit.author.name" stays item["commit"]["author"]["name"]
+    projected = {}
+    for path in fields:
+        value = lookup(item, path)
+        if value is None:
+            continue
+        *parents, leaf = path.split(".")
+        target = projected
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = value
+    return projected
+
+def page_of(items, page, per_page, fields):
+    start = (page - 1) * per_page
+    rows = [dict(project(item, fields), index=start + offset)
+            for offset, item in enumerate(items[start:start + per_page])]
+    return {
+        "items": rows,
+        "page": page,
+        "per_page": per_page,
+        "total": len(items),
+        "next_page": page + 1 if start + per_page < len(items) else None,
+    }
+
+class WindowStore:
+    # Collected windows by id. Snapshot-backed windows use the snapshot id, so any worker process
+    # can reload them from the shared store; the rest get a random id and live only in memory.
+    def __init__(self, snapshot_store=None, max_windows=WINDOW_CACHE_SIZE):
+        self.snapshot_store = snapshot_store
+        self.max_windows = max_windows
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _keep(self, window_id, data):
+        # A section that failed to collect is stored as an error string; it pages as empty
+        sections = {name: data.get(key) if isinstance(data.get(key), list) else []
+                    for name, key in SECTIONS.items()}
+        with self._lock:
+            self._windows[window_id] = sections
+            self._windows.move_to_end(window_id)
+            while len(self._windows) > self.max_windows:
+                self._windows.popitem(last=False)
+        return sections
+
+    def put(self, data, snapshot_id=None):
+        window_id = str(snapshot_id) if snapshot_id is not None else uuid.uuid4().hex
+        self._keep(window_id, data)
+        return window_id
+
+    def get(self, window_id):
+        with self._lock:
+            sections = self._windows.get(window_id)
+            if sections is not None:
+                self._windows.move_to_end(window_id)
+                return sections
+        if self.snapshot_store is None or not window_id.isdigit():
+            return None
+        data = self.snapshot_store.load(int(window_id))
+        if data is None:
+            return None
+        return self._keep(window_id, data)
+
+    def items(self, window_id, section):
+        sections = self.get(window_id)
+        return sections[section] if sections is not None else None
+
+_window_store = None
+_window_store_lock = threading.Lock()
+
+def get_window_store():
+    global _window_store
+    with _window_store_lock:
+        if _window_store is None:
+            # Imported here so the store's database is only opened once a window is kept or requested
+            from snapshot_store import SnapshotStore
+            _window_store = WindowStore(SnapshotStore())
+        return _window_store
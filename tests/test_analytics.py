@@ -0,0 +1,43 @@
+# tests/test_analytics.py
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from analytics import analyze, summarize_groups, top_contributors
+
+
+def commit(author, message):
+    return {"commit": {"author": {"name": author}, "message": message}}
+
+
+class TestAnalytics(unittest.TestCase):
+    def test_categories_follow_priority_order(self):
+        data = {"recent_commits": [commit("a", "Fix the new allocator"), commit("b", "Add docs"),
+                                   commit("a", "Update README"), commit("c", "Bump version")],
+                "recent_issues": [{"title": "Critical: slow startup", "state": "open"},
+                                  {"title": "Tutorial is outdated", "state": "closed"}]}
+        analytics = analyze(data)
+        self.assertEqual({name: group["count"] for name, group in analytics["commit_categories"].items()},
+                         {"Bug Fixes": 1, "Feature Additions": 1, "Documentation Updates": 1, "Other": 1})
+        self.assertEqual(list(analytics["issue_themes"]), ["Critical Bugs", "Documentation Needs"])
+        self.assertEqual((analytics["open_issue_count"], analytics["closed_issue_count"]), (1, 1))
+        self.assertEqual(top_contributors(analytics, 2), [("a", 2), ("b", 1)])
+
+    def test_summaries_keep_two_examples_past_three_items(self):
+        data = {"recent_commits": [commit("a", f"fix bug {n}") for n in range(5)]}
+        summaries = summarize_groups(analyze(data)["commit_categories"], "commits")
+        self.assertEqual(summaries, {"Bug Fixes": "5 commits, including: fix bug 0, fix bug 1..."})
+
+    def test_tolerates_malformed_items(self):
+        analytics = analyze({"recent_commits": [commit("a", "x"), "oops", {"sha": "1"}],
+                             "recent_issues": "API rate limit exceeded"})
+        self.assertEqual(analytics["commit_count"], 3)
+        self.assertEqual(analytics["issue_count"], 0)
+        self.assertEqual(top_contributors(analytics), [("a", 1)])
+
+
+if __name__ == '__main__':
+    unittest.main()
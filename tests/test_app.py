@@ -0,0 +1,184 @@
+# tests/test_app.py
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import app as app_module
+from jobs import JobQueue
+from result_cache import ResultCache
+from window_store import WindowStore
+
+COMMIT = {
+    "url": "https://api.github.com/repos/owner/repo/commits/abc1234def",
+    "sha": "abc1234def",
+    "commit": {"message": "Fix the scheduler", "author": {"name": "Ada", "date": "2024-05-01T00:00:00Z"}},
+}
+ANALYSIS = {"summary": "s", "impact": "high", "code_quality": "good", "suggestions": "none"}
+
+
+def parse_events(body):
+    events = []
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestSummarizeStream(unittest.TestCase):
+    def setUp(self):
+        self.client = app_module.app.test_client()
+        self.analyze = mock.Mock(return_value={"repo_name": "owner/repo", "diff": "+new line",
+                                               "analysis": ANALYSIS, "message": COMMIT["commit"]["message"]})
+        self.patches = [
+            mock.patch.object(app_module, "get_pre_analyzer", return_value=None),
+            mock.patch.object(app_module, "analyze_item", self.analyze),
+            mock.patch.object(app_module, "fetch_diff", return_value="+new line"),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+
+    def test_context_streams_before_diff_and_analysis(self):
+        response = self.client.post('/summarize/stream', json={"type": "commit", "data": COMMIT})
+        self.assertEqual(response.mimetype, "text/event-stream")
+        events = parse_events(response.get_data(as_text=True))
+
+        self.assertEqual(events[0], ("start", {"sections": ["context", "message", "analysis", "changes"]}))
+        names = [payload["name"] for event, payload in events if event == "section"]
+        self.assertEqual(names, ["context", "message", "changes", "analysis"])
+        self.assertEqual(events[-1][0], "done")
+        # The diff fetched for streaming is handed to the analysis instead of being fetched twice
+        self.assertEqual(self.analyze.call_args.kwargs["diff"], "+new line")
+
+    def test_json_endpoint_renders_the_same_blocks(self):
+        response = self.client.post('/summarize', json={"type": "commit", "data": COMMIT})
+        summary = response.get_json()["summary"]
+        for text in ("Commit Context", "Fix the scheduler", "good", "+new line"):
+            self.assertIn(text, summary)
+        self.assertLess(summary.index("AI Analysis"), summary.index("Changes"))
+
+    def test_errors_are_sent_as_events(self):
+        self.analyze.side_effect = RuntimeError("boom")
+        response = self.client.post('/summarize/stream', json={"type": "commit", "data": COMMIT})
+        events = parse_events(response.get_data(as_text=True))
+        self.assertEqual(events[-1], ("error", {"error": "boom"}))
+
+
+class TestWindowItems(unittest.TestCase):
+    def setUp(self):
+        self.client = app_module.app.test_client()
+        self.store = WindowStore()
+        patch = mock.patch.object(app_module, "get_window_store", return_value=self.store)
+        patch.start()
+        self.addCleanup(patch.stop)
+        commits = [dict(COMMIT, sha=f"{n:040x}", files=["large"] * 10) for n in range(120)]
+        self.window_id = self.store.put({"recent_commits": commits, "recent_issues": "API rate limit exceeded"})
+
+    def test_pages_are_projected(self):
+        page = self.client.get(f'/api/windows/{self.window_id}/commits?page=3&per_page=50').get_json()
+        self.assertEqual((page["total"], page["next_page"], len(page["items"])), (120, None, 20))
+        self.assertEqual(page["items"][0], {"sha": f"{100:040x}", "index": 100, "commit": {
+            "message": "Fix the scheduler", "author": {"name": "Ada", "date": "2024-05-01T00:00:00Z"}}})
+
+        page = self.client.get(f'/api/windows/{self.window_id}/commits?fields=sha&per_page=2').get_json()
+        self.assertEqual(page["items"], [{"sha": f"{0:040x}", "index": 0}, {"sha": f"{1:040x}", "index": 1}])
+        self.assertEqual(page["next_page"], 2)
+
+    def test_full_item_and_missing_windows(self):
+        item = self.client.get(f'/api/windows/{self.window_id}/commits/7').get_json()
+        self.assertEqual(item["files"], ["large"] * 10)
+        self.assertEqual(self.client.get(f'/api/windows/{self.window_id}/issues').get_json()["total"], 0)
+        self.assertEqual(self.client.get(f'/api/windows/{self.window_id}/commits/120').status_code, 404)
+        self.assertEqual(self.client.get('/api/windows/nope/commits').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/windows/{self.window_id}/branches').status_code, 404)
+
+    def test_evicted_snapshot_windows_reload_from_the_store(self):
+        snapshots = mock.Mock()
+        snapshots.load.return_value = {"recent_commits": [COMMIT]}
+        store = WindowStore(snapshots, max_windows=1)
+        store.put({"recent_commits": []}, snapshot_id=5)
+        store.put({"recent_commits": []})
+        self.assertEqual(store.items("5", "commits"), [COMMIT])
+        snapshots.load.assert_called_once_with(5)
+
+
+class TestResultJobs(unittest.TestCase):
+    def setUp(self):
+        self.client = app_module.app.test_client()
+        self.queue = JobQueue(workers=1)
+        self.addCleanup(self.queue.executor.shutdown, wait=True)
+        for patch in (mock.patch.object(app_module, "get_job_queue", return_value=self.queue),
+                      mock.patch.object(app_module, "get_result_cache", return_value=None)):
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.form = {"repo_url": "https://github.com/owner/repo", "start_date": "2024-09-10", "end_date": "2024-09-17"}
+
+    def submit(self, build):
+        with mock.patch.object(app_module, "build_result", build):
+            response = self.client.post('/result', data=self.form, headers={"Accept": "application/json"})
+            self.assertEqual(response.status_code, 202)
+            job_id = response.get_json()["job_id"]
+            status = self.queue.wait(job_id, timeout=5)
+            while status["state"] not in ("done", "failed"):
+                status = self.queue.wait(job_id, after_version=status["version"], timeout=5)
+        return job_id
+
+    def test_result_is_served_once_the_job_is_done(self):
+        def build(repo_url, start_date, end_date, progress):
+            progress("collect")
+            return f"<p>{repo_url} {start_date}</p>", True
+
+        job_id = self.submit(build)
+        self.assertEqual(self.client.get(f'/jobs/{job_id}').get_data(as_text=True),
+                         "<p>https://github.com/owner/repo 2024-09-10</p>")
+        events = parse_events(self.client.get(f'/jobs/{job_id}/events').get_data(as_text=True))
+        self.assertEqual([(event, payload["state"]) for event, payload in events], [("status", "done")])
+        self.assertEqual(self.client.get(f'/jobs/{job_id}/status').get_json()["progress"], 1.0)
+
+    def test_failed_job_shows_the_form_with_the_error(self):
+        def build(repo_url, start_date, end_date, progress):
+            raise ValueError("Repository not found")
+
+        job_id = self.submit(build)
+        page = self.client.get(f'/jobs/{job_id}').get_data(as_text=True)
+        self.assertIn("An error occurred: Repository not found", page)
+        self.assertIn('value="2024-09-17"', page)
+
+    def test_browser_submissions_redirect_to_the_progress_page(self):
+        release = threading.Event()
+        with mock.patch.object(app_module, "build_result", lambda *args: (release.wait(5) and "page", True)):
+            response = self.client.post('/', data=self.form)
+            again = self.client.post('/result', data=self.form)
+            self.assertEqual(response.status_code, 303)
+            self.assertEqual(response.location, again.location)
+            page = self.client.get(response.location).get_data(as_text=True)
+            release.set()
+        self.assertIn("Generating Newsletter", page)
+        self.assertEqual(self.client.get('/jobs/missing/status').status_code, 404)
+
+    def test_cached_pages_skip_the_job(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(os.path.join(tmp, "results.sqlite3"))
+            self.addCleanup(cache.executor.shutdown, wait=True)
+            build = mock.Mock(return_value=("<p>page</p>", True))
+            with mock.patch.object(app_module, "get_result_cache", return_value=cache):
+                job_id = self.submit(build)
+                self.assertEqual(self.client.get(f'/jobs/{job_id}').get_data(as_text=True), "<p>page</p>")
+                response = self.client.post('/', data=self.form)
+            self.assertEqual((response.status_code, response.get_data(as_text=True)), (200, "<p>page</p>"))
+            self.assertEqual(build.call_count, 1)
+            self.assertEqual(self.queue.stats()["submitted"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# tests/test_batch.py
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from batch import default_window, load_manifest, run_batch
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_default_window(self):
+        self.assertEqual(default_window("weekly", "2024-09-17"), ("2024-09-10", "2024-09-17"))
+        self.assertEqual(default_window("daily", "2024-09-17"), ("2024-09-16", "2024-09-17"))
+
+    def test_load_manifest_applies_defaults(self):
+        path = os.path.join(self.tmp.name, "manifest.json")
+        with open(path, "w") as f:
+            json.dump({
+                "defaults": {"recipients": "a@x.com, b@x.com", "end_date": "2024-09-17"},
+                "repos": [
+                    "https://github.com/owner/one",
+                    {"repo": "https://github.com/owner/two", "frequency": "daily", "recipients": []},
+                ],
+            }, f)
+
+        jobs = load_manifest(path)
+
+        self.assertEqual(jobs[0]["recipients"], ["a@x.com", "b@x.com"])
+        self.assertEqual((jobs[0]["start_date"], jobs[0]["end_date"]), ("2024-09-10", "2024-09-17"))
+        self.assertEqual((jobs[1]["start_date"], jobs[1]["recipients"]), ("2024-09-16", []))
+
+    def test_run_batch_isolates_failures_and_runs_in_parallel(self):
+        active, peak = [0], [0]
+        lock = threading.Lock()
+        sent = []
+        begun = []
+
+        def generate(repo, start_date, end_date):
+            begun.append(datetime.now())
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            if repo.endswith("broken"):
+                raise RuntimeError("Not Found")
+            return f"<h1>{repo}</h1>"
+
+        jobs = [{"repo": f"https://github.com/owner/r{i}", "start_date": "2024-09-10", "end_date": "2024-09-17",
+                 "recipients": ["a@x.com"]} for i in range(3)]
+        jobs.append(dict(jobs[0], repo="https://github.com/owner/broken"))
+
+        report = run_batch(jobs, generate, lambda *args: sent.append(args), workers=4, output_dir=self.tmp.name)
+
+        self.assertEqual((report["succeeded"], report["failed"]), (3, 1))
+        self.assertIn("Not Found", report["results"][3]["error"])
+        self.assertEqual(len(sent), 3)
+        self.assertGreater(peak[0], 1)
+        self.assertLessEqual(datetime.fromisoformat(report["started_at"]), min(begun))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "owner_r0_2024-09-10_2024-09-17.html")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,119 @@
 # tests/test_data_collector.py
 
+import os
+import sys
+import tempfile
 import unittest
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_collector import GitHubDataCollector, last_page_number
+from github_client import get_session
+from http_cache import HTTPCache
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload, links=None):
+        self._payload = payload
+        self.links = links or {}
+        self.headers = {}
+
+    def json(self):
+        return self._payload
+
 
 class TestDataCollector(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        cache = HTTPCache(os.path.join(self.tmp.name, "http_cache.sqlite3"))
+        self.collector = GitHubDataCollector("https://github.com/owner/repo", max_workers=2, http_cache=cache)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
     def test_placeholder(self):
         self.assertTrue(True)  # Placeholder test
 
+    def test_last_page_number(self):
+        response = FakeResponse([], {"last": {"url": "https://api.github.com/x?per_page=100&page=7"}})
+        self.assertEqual(last_page_number(response), 7)
+        self.assertEqual(last_page_number(FakeResponse([])), 1)
+
+    def test_get_all_pages_follows_every_page(self):
+        calls = []
+
+        def fake_get(url, headers=None, params=None):
+            calls.append(params)
+            page = params.get("page", 1)
+            return FakeResponse([{"page": page}], {"last": {"url": f"{url}?page=3"}})
+
+        with mock.patch.object(get_session(), "get", fake_get):
+            items = self.collector._get_all_pages("https://api.github.com/repos/owner/repo/commits")
+
+        self.assertEqual([item["page"] for item in items], [1, 2, 3])
+        self.assertTrue(all(params["per_page"] == 100 for params in calls))
+
+    def test_get_all_pages_passes_through_error_payload(self):
+        error = {"message": "API rate limit exceeded"}
+        with mock.patch.object(get_session(), "get", return_value=FakeResponse(error)):
+            self.assertEqual(self.collector._get_all_pages("https://api.github.com/x"), error)
+
+    def test_collect_data_returns_all_sections(self):
+        def fake_get(url, headers=None, params=None):
+            if url.endswith("/repos/owner/repo"):
+                return FakeResponse({"name": "repo"})
+            return FakeResponse([{"updated_at": "2024-09-15T10:00:00Z"}])
+
+        with mock.patch.object(get_session(), "get", fake_get), \
+                mock.patch.object(GitHubDataCollector, "save_data"):
+            data = self.collector.collect_data(datetime(2024, 9, 10), datetime(2024, 9, 17))
+
+        self.assertEqual(data["repo_info"], {"name": "repo"})
+        self.assertEqual(len(data["recent_commits"]), 1)
+        self.assertEqual(len(data["recent_issues"]), 1)
+        self.assertEqual(len(data["recent_pull_requests"]), 1)
+
+    def test_pull_requests_stop_paging_once_before_window(self):
+        requested_pages = []
+
+        def fake_get(url, headers=None, params=None):
+            page = params.get("page", 1)
+            requested_pages.append(page)
+            # Page n holds PRs last updated on 2024-09-(20 - n); the repo has 1000 pages of history
+            updated_at = f"2024-09-{20 - page:02d}T12:00:00Z"
+            return FakeResponse([{"number": page, "updated_at": updated_at}],
+                                {"last": {"url": f"{url}?page=1000"}})
+
+        with mock.patch.object(get_session(), "get", fake_get):
+            prs = self.collector.get_recent_pull_requests(datetime(2024, 9, 16), datetime(2024, 9, 17))
+
+        self.assertEqual([pr["number"] for pr in prs], [3, 4])
+        self.assertEqual(requested_pages, [1, 2, 3, 4, 5])
+
+    def test_incremental_collection_fetches_delta_after_first_run(self):
+        commits_since = []
+
+        def fake_get(url, headers=None, params=None):
+            if url.endswith("/repos/owner/repo"):
+                return FakeResponse({"name": "repo"})
+            if url.endswith("/commits"):
+                commits_since.append(params["since"])
+                return FakeResponse([{"sha": "abc", "commit": {"committer": {"date": "2024-09-15T10:00:00Z"}}}])
+            return FakeResponse([])
+
+        collector = GitHubDataCollector("https://github.com/owner/repo", max_workers=2,
+                                        http_cache=self.collector.http_cache, history_dir=self.tmp.name)
+        with mock.patch.object(get_session(), "get", fake_get), \
+                mock.patch.object(GitHubDataCollector, "save_data"):
+            collector.collect_data(datetime(2024, 9, 10), datetime(2024, 9, 17), incremental=True)
+            data = collector.collect_data(datetime(2024, 9, 11), datetime(2024, 9, 17), incremental=True)
+
+        self.assertEqual(commits_since, ["2024-09-10T00:00:00", "2024-09-15T10:00:00"])
+        self.assertEqual([c["sha"] for c in data["recent_commits"]], ["abc"])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,58 @@
+# tests/test_dedup.py
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from dedup import cluster, collapse_messages, normalize_text, repeats_note, revert_depth
+
+
+class TestDedup(unittest.TestCase):
+    def test_normalize_masks_versions_and_wrappers(self):
+        self.assertEqual(normalize_text("Bump numpy from 1.26.3 to 1.26.4"),
+                         normalize_text("Bump numpy from 1.25.0 to 1.26.0"))
+        revert = ('Revert "Add fused adam kernel (#123)"\n\nThis reverts commit abcdef1234567.\n\n'
+                  'Reverted https://github.com/pytorch/pytorch/pull/123 on behalf of https://github.com/x due to CI')
+        self.assertEqual(normalize_text(revert), normalize_text("Add fused adam kernel (#123)"))
+        self.assertEqual((revert_depth(revert), revert_depth('Revert "Revert "Add kernel""')), (1, 2))
+
+    def test_cluster_groups_near_duplicates_only(self):
+        texts = [
+            "Add fused adam kernel (#123)",
+            "Fix segfault in the dataloader when num_workers is zero",
+            'Reland "Add fused adam kernel" (#130)',
+            "Fix segfault in the dataloader when num_workers is zero and pin_memory is set",
+            "Improve the documentation of torch.compile",
+        ]
+        groups = cluster(texts)
+        self.assertIn([0, 2], groups)
+        self.assertIn([4], groups)
+        self.assertEqual(sorted(i for group in groups for i in group), list(range(5)))
+
+    def test_reverts_and_empty_texts_stay_apart(self):
+        texts = [
+            "Add fused adam kernel (#123)",
+            'Revert "Add fused adam kernel (#123)"',
+            'Back out "Add fused adam kernel (#123)"',
+            'Revert "Revert "Add fused adam kernel (#123)""',
+            "[ghstack-poisoned]",
+            "Revert",
+            "Reland",
+        ]
+        groups = cluster(texts)
+        self.assertEqual(groups, [[0, 3], [1, 2], [4], [5], [6]])
+
+    def test_collapse_reports_tokens_saved(self):
+        bumps = [f"Bump urllib3 from 1.26.{n} to 1.26.{n + 1}" for n in range(20)]
+        collapsed, report = collapse_messages(bumps + ["Add a CUDA graph pool allocator"])
+        self.assertEqual(collapsed, [bumps[0], "Add a CUDA graph pool allocator"])
+        self.assertEqual(report["repeats"], [(bumps[0], 19)])
+        self.assertEqual(repeats_note(report["repeats"]), f"Near-duplicates: {bumps[0]} (and 19 similar commits)")
+        self.assertEqual((report["items"], report["clusters"]), (21, 2))
+        self.assertGreater(report["tokens_saved"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+# tests/test_diff_compactor.py
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from diff_compactor import compact_diff
+
+
+def hunk(start, lines):
+    return [f"@@ -{start},{len(lines)} +{start},{len(lines)} @@"] + lines
+
+
+class TestDiffCompactor(unittest.TestCase):
+    def test_trims_context_and_headers(self):
+        context = [f" line_{n} = {n}" for n in range(10)]
+        diff = "\n".join(["diff --git a/src/a.py b/src/a.py", "index 1234abc..5678def 100644",
+                          "--- a/src/a.py", "+++ b/src/a.py"]
+                         + hunk(1, context + ["-x = 1", "+x = 2"] + context))
+        compacted, report = compact_diff(diff, context_lines=1)
+        self.assertEqual(compacted.split("\n"), ["diff --git a/src/a.py b/src/a.py", "@@ -1,22 +1,22 @@",
+                                                 " ...", " line_9 = 9", "-x = 1", "+x = 2", " line_0 = 0", " ..."])
+        self.assertLess(report["compacted_tokens"], report["original_tokens"])
+
+    def test_collapses_renames_and_reformat_only_hunks(self):
+        diff = "\n".join(["diff --git a/old.py b/new.py", "similarity index 100%",
+                          "rename from old.py", "rename to new.py",
+                          "diff --git a/b.py b/b.py"]
+                         + hunk(1, ["-def f(a,b):", "+def f(a, b):"])
+                         + hunk(9, ["-    return a", "+    return b"]))
+        compacted, _ = compact_diff(diff)
+        lines = compacted.split("\n")
+        self.assertEqual(lines[0], "diff --git a/old.py b/new.py (renamed from old.py, content unchanged)")
+        self.assertNotIn("-def f(a,b):", lines)
+        self.assertIn("+    return b", lines)
+        self.assertEqual(lines[-1], "[1 whitespace/reformat-only hunks omitted]")
+
+    def test_caps_hunks_per_file(self):
+        hunks = [line for n in range(20) for line in hunk(n * 10 + 1, [f"-old_{n} = {n}", f"+new_{n} = {n}"])]
+        diff = "\n".join(["diff --git a/c.py b/c.py"] + hunks + ["[... remainder of this file truncated]"])
+        compacted, report = compact_diff(diff, max_file_tokens=40)
+        self.assertIn("+new_0 = 0", compacted)
+        self.assertNotIn("+new_19 = 19", compacted)
+        self.assertRegex(compacted, r"\[\d+ more hunks omitted, \+\d+ -\d+ lines\]")
+        self.assertTrue(compacted.endswith("[... remainder of this file truncated]"))
+        self.assertLess(report["compacted_tokens"], report["original_tokens"])
+
+    def test_oversized_first_hunk_is_truncated_to_the_budget(self):
+        big = hunk(1, [f"+value_{n} = compute({n})" for n in range(500)])
+        for hunks in (big + hunk(900, ["-a", "+b"]), hunk(1, ["-f(a,b)", "+f(a, b)"]) + big):
+            compacted, report = compact_diff("\n".join(["diff --git a/d.py b/d.py"] + hunks), max_file_tokens=100)
+            self.assertIn("+value_0 = compute(0)", compacted)
+            self.assertNotIn("+value_499 = compute(499)", compacted)
+            self.assertRegex(compacted, r"\[\d+ more lines of this hunk omitted, \+\d+ -0 lines\]")
+            self.assertLessEqual(report["compacted_tokens"], 130)
+        self.assertIn("[1 more hunks omitted, +1 -1 lines]", compact_diff(
+            "\n".join(["diff --git a/d.py b/d.py"] + big + hunk(900, ["-a", "+b"])), max_file_tokens=100)[0])
+
+    def test_leaves_non_diff_text_alone(self):
+        self.assertEqual(compact_diff("No diff available")[0], "No diff available")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+# tests/test_diff_fetcher.py
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from diff_fetcher import is_generated, iter_diff, iter_diff_files, render_diff
+
+DIFF = """diff --git a/src/app.py b/src/app.py
+index 1..2 100644
+--- a/src/app.py
++++ b/src/app.py
+@@ -1,2 +1,2 @@
+-old
++new
+diff --git a/logo.png b/logo.png
+Binary files a/logo.png and b/logo.png differ
+diff --git a/package-lock.json b/package-lock.json
++{"lockfileVersion": 3}
+diff --git a/src/big.py b/src/big.py
+""" + "\n".join(f"+line {i}" for i in range(200))
+
+
+class FakeStreamResponse:
+    status_code = 200
+
+    def __init__(self, text):
+        self.lines = text.encode("utf-8").split(b"\n")
+        self.read = 0
+        self.closed = False
+
+    def iter_lines(self, chunk_size=None):
+        for line in self.lines:
+            self.read += 1
+            yield line
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return self.response
+
+
+class FakeJSONResponse:
+    status_code = 200
+
+    def __init__(self, payload, next_url=None):
+        self.payload = payload
+        self.links = {"next": {"url": next_url}} if next_url else {}
+
+    def json(self):
+        return self.payload
+
+    def close(self):
+        pass
+
+
+class TestDiffFetcher(unittest.TestCase):
+    def test_is_generated(self):
+        self.assertTrue(is_generated("web/package-lock.json"))
+        self.assertTrue(is_generated("static/app.min.js"))
+        self.assertFalse(is_generated("src/app.py"))
+
+    def test_splits_files_and_skips_binary_and_generated(self):
+        files = list(iter_diff_files(DIFF.splitlines(), max_file_bytes=200, max_total_bytes=10000))
+
+        self.assertEqual([f["filename"] for f in files], ["src/app.py", "logo.png", "package-lock.json", "src/big.py"])
+        self.assertIn("+new", files[0]["patch"])
+        self.assertEqual(files[1]["skipped"], "binary")
+        self.assertEqual(files[2]["skipped"], "generated")
+        self.assertLessEqual(len(files[3]["patch"]), 200 + len("diff --git a/src/big.py b/src/big.py"))
+        self.assertGreater(files[3]["truncated_bytes"], 0)
+
+    def test_total_budget_stops_stream_early(self):
+        response = FakeStreamResponse(DIFF + "\ndiff --git a/after.py b/after.py\n+x")
+        files = iter_diff("owner/repo", "pull", 1, max_file_bytes=1000, max_total_bytes=100,
+                          session=FakeSession(response))
+
+        first = next(files)
+        self.assertEqual(first["filename"], "src/app.py")
+        rest = list(files)
+        self.assertEqual(rest[-1]["skipped"], "budget")
+        self.assertTrue(response.closed)
+        self.assertLess(response.read, len(response.lines))
+        self.assertIn("total size budget reached", render_diff([first] + rest))
+
+    def test_requests_diff_media_type(self):
+        session = FakeSession(FakeStreamResponse(DIFF))
+        list(iter_diff("owner/repo", "commit", "abc", session=session))
+        url, kwargs = session.calls[0]
+        self.assertEqual(url, "https://api.github.com/repos/owner/repo/commits/abc")
+        self.assertEqual(kwargs["headers"]["Accept"], "application/vnd.github.diff")
+        self.assertTrue(kwargs["stream"])
+    def test_paths_containing_b_slash(self):
+        diff = ["diff --git a/docs/a b/c.md b/docs/a b/c.md", "+x",
+                "diff --git a/old b/name.py b/new b/name.py", "--- a/old b/name.py", "+++ b/new b/name.py", "+y",
+                'diff --git "a/caf\\303\\251 b/x.py" "b/caf\\303\\251 b/x.py"', "+z"]
+        files = list(iter_diff_files(diff))
+        self.assertEqual([f["filename"] for f in files],
+                         ["docs/a b/c.md", "new b/name.py", "caf\\303\\251 b/x.py"])
+
+    def test_too_large_commit_diff_follows_every_files_page(self):
+        first_page = {"sha": "abc", "files": [{"filename": f"src/f{n}.py", "patch": "+a"} for n in range(100)]}
+        second_page = {"sha": "abc", "files": [{"filename": "src/last.py", "previous_filename": "src/old.py",
+                                                 "patch": "+b"}]}
+        next_url = "https://api.github.com/repos/owner/repo/commits/abc?per_page=100&page=2"
+        responses = [FakeStreamResponse(""), FakeJSONResponse(first_page, next_url), FakeJSONResponse(second_page)]
+        responses[0].status_code = 406
+        session = FakeSession(None)
+        session.get = lambda url, **kwargs: session.calls.append((url, kwargs)) or responses.pop(0)
+
+        files = list(iter_diff("owner/repo", "commit", "abc", session=session))
+        self.assertEqual(len(files), 101)
+        self.assertEqual(files[-1]["filename"], "src/last.py")
+        self.assertEqual([call[0] for call in session.calls[1:]],
+                         ["https://api.github.com/repos/owner/repo/commits/abc", next_url])
+
+
+if __name__ == '__main__':
+    unittest.main()
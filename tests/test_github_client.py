@@ -0,0 +1,46 @@
+# tests/test_github_client.py
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import github_client
+from github_client import LatencyStats, endpoint_label
+
+
+class TestGitHubClient(unittest.TestCase):
+    def test_endpoint_label_collapses_ids(self):
+        sha = "a" * 40
+        self.assertEqual(endpoint_label(f"https://api.github.com/repos/pytorch/pytorch/commits/{sha}?per_page=100"),
+                         "/repos/{owner}/{repo}/commits/{sha}")
+        self.assertEqual(endpoint_label("https://api.github.com/repos/pytorch/pytorch/pulls/123"),
+                         "/repos/{owner}/{repo}/pulls/{number}")
+        self.assertEqual(endpoint_label("https://api.github.com/graphql"), "/graphql")
+
+    def test_latency_stats(self):
+        stats = LatencyStats()
+        stats.record("GET /x", 0.1)
+        stats.record("GET /x", 0.3)
+        snapshot = stats.snapshot()["GET /x"]
+        self.assertEqual(snapshot["count"], 2)
+        self.assertAlmostEqual(snapshot["avg_seconds"], 0.2)
+        self.assertAlmostEqual(snapshot["max_seconds"], 0.3)
+
+    def test_get_repo_is_memoized(self):
+        fake_github = mock.Mock()
+        with mock.patch.object(github_client, "get_github", return_value=fake_github), \
+                mock.patch.dict(github_client._repos, clear=True):
+            first = github_client.get_repo("owner/repo")
+            second = github_client.get_repo("owner/repo")
+
+        self.assertIs(first, second)
+        fake_github.get_repo.assert_called_once_with("owner/repo", lazy=True)
+
+    def test_session_is_shared(self):
+        self.assertIs(github_client.get_session(), github_client.get_session())
+
+if __name__ == '__main__':
+    unittest.main()
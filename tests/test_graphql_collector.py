@@ -0,0 +1,104 @@
+# tests/test_graphql_collector.py
+
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from graphql_collector import GitHubGraphQLCollector
+from github_client import get_session
+from http_cache import HTTPCache
+
+
+def page_info(has_next, cursor):
+    return {"hasNextPage": has_next, "endCursor": cursor}
+
+
+def commit_node(oid, date):
+    return {"oid": oid, "url": f"https://github.com/owner/repo/commit/{oid}", "message": f"Fix {oid}",
+            "additions": 3, "deletions": 1, "changedFilesIfAvailable": 2,
+            "author": {"name": "Ada", "email": "a@x", "date": date, "user": {"login": "ada"}},
+            "committer": {"name": "Ada", "email": "a@x", "date": date}}
+
+
+def pull_node(number, updated_at):
+    return {"number": number, "title": f"PR {number}", "body": "", "state": "MERGED",
+            "url": f"https://github.com/owner/repo/pull/{number}", "createdAt": updated_at,
+            "updatedAt": updated_at, "closedAt": updated_at, "mergedAt": updated_at,
+            "additions": 5, "deletions": 2, "changedFiles": 1, "author": None,
+            "files": {"nodes": [{"path": "a.py", "additions": 5, "deletions": 2, "changeType": "MODIFIED"}]}}
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class TestGraphQLCollector(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.collector = GitHubGraphQLCollector("https://github.com/owner/repo",
+                                                http_cache=HTTPCache(os.path.join(self.tmp.name, "c.sqlite3")))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_collect_data_pages_and_maps_to_rest_shape(self):
+        sent_variables = []
+
+        def fake_post(url, headers=None, json=None):
+            variables = json["variables"]
+            sent_variables.append(dict(variables))
+            repository = {"name": "repo", "nameWithOwner": "owner/repo", "description": "d",
+                          "url": "https://github.com/owner/repo", "stargazerCount": 1, "forkCount": 2,
+                          "primaryLanguage": {"name": "Python"}}
+            if variables["withRepo"]:
+                repository["openIssues"] = {"totalCount": 3}
+                repository["openPulls"] = {"totalCount": 4}
+            if variables["withCommits"]:
+                if variables["commitsCursor"] is None:
+                    history = {"nodes": [commit_node("a", "2024-09-15T10:00:00-07:00")], "pageInfo": page_info(True, "c1")}
+                else:
+                    history = {"nodes": [commit_node("b", "2024-09-14T10:00:00Z")], "pageInfo": page_info(False, "c2")}
+                repository["defaultBranchRef"] = {"target": {"history": history}}
+            if variables["withIssues"]:
+                repository["issues"] = {"nodes": [], "pageInfo": page_info(False, None)}
+            if variables["withPulls"]:
+                # The second PR is older than the window, so no further PR pages are requested
+                repository["pullRequests"] = {"nodes": [pull_node(1, "2024-09-16T00:00:00Z"), pull_node(2, "2024-08-01T00:00:00Z")],
+                                               "pageInfo": page_info(True, "p1")}
+            return FakeResponse({"data": {"rateLimit": {"cost": 1, "remaining": 4999, "resetAt": "x"},
+                                          "repository": repository}})
+
+        with mock.patch.object(get_session(), "post", fake_post), \
+                mock.patch.object(GitHubGraphQLCollector, "save_data"):
+            data = self.collector.collect_data(datetime(2024, 9, 10), datetime(2024, 9, 17))
+
+        self.assertEqual(len(sent_variables), 2)
+        self.assertFalse(sent_variables[1]["withPulls"])
+        self.assertEqual(self.collector.last_run_stats["requests"], 2)
+        self.assertEqual(self.collector.last_run_stats["cost"], 2)
+
+        self.assertEqual(data["repo_info"]["open_issues_count"], 7)
+        self.assertEqual([c["sha"] for c in data["recent_commits"]], ["a", "b"])
+        self.assertEqual(data["recent_commits"][0]["commit"]["committer"]["date"], "2024-09-15T17:00:00Z")
+        self.assertEqual(data["recent_commits"][0]["url"], "https://api.github.com/repos/owner/repo/commits/a")
+        self.assertEqual([p["number"] for p in data["recent_pull_requests"]], [1])
+        self.assertEqual(data["recent_pull_requests"][0]["state"], "closed")
+        self.assertEqual(data["recent_pull_requests"][0]["files"][0]["filename"], "a.py")
+
+    def test_graphql_errors_raise(self):
+        with mock.patch.object(get_session(), "post",
+                        return_value=FakeResponse({"errors": [{"message": "Bad credentials"}]})):
+            with self.assertRaises(RuntimeError):
+                self.collector.collect_data(datetime(2024, 9, 10), datetime(2024, 9, 17))
+
+if __name__ == '__main__':
+    unittest.main()
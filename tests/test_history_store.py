@@ -0,0 +1,78 @@
+# tests/test_history_store.py
+
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from history_store import RepoHistory
+
+
+def make_commit(sha, date):
+    return {"sha": sha, "commit": {"committer": {"date": date}, "author": {"name": "a", "date": date}}}
+
+
+def make_issue(number, updated_at, created_at="2024-09-01T00:00:00Z"):
+    return {"number": number, "updated_at": updated_at, "created_at": created_at}
+
+
+class TestRepoHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_merge_advances_marks_and_replaces_updated_items(self):
+        history = RepoHistory("owner", "repo", self.tmp.name)
+        history.merge(commits=[make_commit("a", "2024-09-10T00:00:00Z"), make_commit("b", "2024-09-12T00:00:00Z")],
+                      issues=[make_issue(1, "2024-09-11T00:00:00Z")],
+                      covered_since=datetime(2024, 9, 10))
+        history.merge(issues=[make_issue(1, "2024-09-13T00:00:00Z")])
+
+        self.assertEqual(history.marks["commit_date"], "2024-09-12T00:00:00Z")
+        self.assertEqual(history.marks["issues_updated_at"], "2024-09-13T00:00:00Z")
+        self.assertEqual(len(history.issues), 1)
+        self.assertEqual(history.covered_since, "2024-09-10T00:00:00Z")
+
+    def test_delta_since_uses_marks_inside_covered_range(self):
+        history = RepoHistory("owner", "repo", self.tmp.name)
+        self.assertEqual(history.delta_since("commits", datetime(2024, 9, 10)), datetime(2024, 9, 10))
+
+        history.merge(commits=[make_commit("a", "2024-09-12T08:00:00Z")], covered_since=datetime(2024, 9, 10))
+        self.assertEqual(history.delta_since("commits", datetime(2024, 9, 11)), datetime(2024, 9, 12, 8))
+        self.assertTrue(history.needs_backfill(datetime(2024, 9, 1)))
+
+    def test_round_trip_and_window(self):
+        history = RepoHistory("owner", "repo", self.tmp.name)
+        history.merge(commits=[make_commit("a", "2024-09-05T00:00:00Z"), make_commit("b", "2024-09-12T00:00:00Z")],
+                      pulls=[make_issue(7, "2024-09-12T00:00:00Z")],
+                      covered_since=datetime(2024, 9, 1))
+        history.save()
+        self.assertEqual(os.listdir(self.tmp.name), ["owner_repo.json"])
+
+        window = RepoHistory.load("owner", "repo", self.tmp.name).window(datetime(2024, 9, 10), datetime(2024, 9, 13))
+        self.assertEqual([c["sha"] for c in window["recent_commits"]], ["b"])
+        self.assertEqual([p["number"] for p in window["recent_pull_requests"]], [7])
+
+    def test_unchanged_history_is_not_rewritten(self):
+        history = RepoHistory("owner", "repo", self.tmp.name)
+        commits = [make_commit("a", "2024-09-05T00:00:00Z")]
+        history.merge(commits=commits, covered_since=datetime(2024, 9, 1))
+        history.save()
+        modified = os.stat(history.path).st_mtime_ns
+        os.utime(history.path, ns=(modified - 10 ** 9, modified - 10 ** 9))
+
+        reloaded = RepoHistory.load("owner", "repo", self.tmp.name)
+        reloaded.merge(commits=commits, covered_since=datetime(2024, 9, 1))
+        reloaded.save()
+        self.assertEqual(os.stat(history.path).st_mtime_ns, modified - 10 ** 9)
+        reloaded.merge(issues=[make_issue(1, "2024-09-06T00:00:00Z")])
+        reloaded.save()
+        self.assertNotEqual(os.stat(history.path).st_mtime_ns, modified - 10 ** 9)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# tests/test_http_cache.py
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from http_cache import HTTPCache
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, etag=None):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.headers = {"ETag": etag} if etag else {}
+        self.links = {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class TestHTTPCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = HTTPCache(os.path.join(self.tmp.name, "cache.sqlite3"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_not_modified_is_served_from_cache(self):
+        sent = []
+
+        def send(conditional):
+            sent.append(conditional)
+            if conditional.get("If-None-Match") == '"abc"':
+                return FakeResponse(304)
+            return FakeResponse(200, [{"sha": "1"}], etag='"abc"')
+
+        first = self.cache.fetch("https://api.github.com/x", {"page": 1}, send)
+        second = self.cache.fetch("https://api.github.com/x", {"page": 1}, send)
+
+        self.assertEqual(first.json(), [{"sha": "1"}])
+        self.assertEqual(second.json(), [{"sha": "1"}])
+        self.assertTrue(second.from_cache)
+        self.assertEqual(sent, [{}, {"If-None-Match": '"abc"'}])
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_representations_of_one_url_are_cached_apart(self):
+        url, params = "https://api.github.com/repos/o/r/commits/abc", {"page": 1}
+        json_key = self.cache.make_key(url, params, {"Authorization": "token a", "Accept": "application/json"})
+        self.assertEqual(json_key, self.cache.make_key(url, params, {"authorization": "token b",
+                                                                     "accept": "application/json"}))
+        self.assertNotEqual(json_key, self.cache.make_key(url, params, {"Accept": "application/vnd.github.diff"}))
+        self.assertEqual(self.cache.make_key(url, params), self.cache.make_key(url, params, {"Authorization": "x"}))
+
+        bodies = {"application/json": {"sha": "abc"}, "application/vnd.github.diff": "diff --git a/x b/x"}
+        for accept, body in bodies.items():
+            self.cache.fetch(url, params, lambda conditional: FakeResponse(200, body, etag='"same"'),
+                             headers={"Accept": accept})
+        for accept, body in bodies.items():
+            cached = self.cache.fetch(url, params, lambda conditional: FakeResponse(304),
+                                      headers={"Accept": accept})
+            self.assertEqual(cached.json(), body)
+
+    def test_eviction_keeps_cache_under_max_bytes(self):
+        self.cache.max_bytes = 100
+        for i in range(5):
+            self.cache.fetch(f"https://api.github.com/{i}", None,
+                             lambda conditional: FakeResponse(200, "x" * 40, etag=f'"{i}"'))
+
+        stats = self.cache.stats()
+        self.assertLessEqual(stats["bytes"], 100)
+        self.assertGreater(stats["evictions"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
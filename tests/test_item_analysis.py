@@ -0,0 +1,142 @@
+# tests/test_item_analysis.py
+
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from item_analysis import PreAnalyzer, item_key
+
+
+def window(commits=0, issues=0, pulls=0):
+    return {
+        "recent_commits": [{"url": f"https://api.github.com/repos/o/r/commits/{n}", "sha": str(n)} for n in range(commits)],
+        "recent_issues": [{"url": f"https://api.github.com/repos/o/r/issues/{n}", "number": n} for n in range(issues)],
+        "recent_pull_requests": [{"url": f"https://api.github.com/repos/o/r/pulls/{n}", "number": n} for n in range(pulls)],
+    }
+
+
+class FakeAnalyze:
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, item_type, item_data, github_slots=None, llm_slots=None, diff=None):
+        if self.gate is not None and github_slots is not None:
+            self.gate.wait(5)
+        with self.lock:
+            self.calls.append((item_type, item_data["url"], threading.current_thread().name))
+        return {"analysis": f"{item_type} {item_data['url']}"}
+
+
+class TestPreAnalyzer(unittest.TestCase):
+    def test_schedules_every_item_once(self):
+        analyze = FakeAnalyze()
+        pre = PreAnalyzer(workers=4, analyze=analyze, dedup=False)
+        data = window(commits=3, issues=2, pulls=2)
+        self.assertEqual(pre.schedule(data), 7)
+        self.assertEqual(pre.schedule(data), 0)
+
+        item = data["recent_issues"][1]
+        self.assertEqual(pre.result("issue", item), {"analysis": f"issue {item['url']}"})
+        pre.executor.shutdown(wait=True)
+        self.assertEqual(len(analyze.calls), 7)
+        self.assertEqual(pre.status(), {"tracked": 7, "done": 7, "pending": 0, "shared": 0})
+
+    def test_queued_item_runs_on_caller_thread(self):
+        gate = threading.Event()
+        analyze = FakeAnalyze(gate)
+        pre = PreAnalyzer(workers=1, analyze=analyze, dedup=False)
+        data = window(commits=3)
+        pre.schedule(data)
+
+        # The single worker is blocked on the first commit, so the last one is still queued
+        last = data["recent_commits"][-1]
+        pre.result("commit", last)
+        self.assertEqual(analyze.calls[0][2], threading.current_thread().name)
+        gate.set()
+        pre.executor.shutdown(wait=True)
+        self.assertEqual(sum(1 for call in analyze.calls if call[1] == last["url"]), 1)
+
+    def test_failed_analysis_is_retried(self):
+        attempts = []
+
+        def analyze(item_type, item_data, github_slots=None, llm_slots=None, diff=None):
+            attempts.append(github_slots)
+            if github_slots is not None:
+                raise RuntimeError("diff fetch failed")
+            return {"analysis": "ok"}
+
+        pre = PreAnalyzer(workers=1, analyze=analyze, dedup=False)
+        data = window(pulls=1)
+        pre.schedule(data)
+        pre.executor.shutdown(wait=True)
+        self.assertEqual(pre.result("pull_request", data["recent_pull_requests"][0]), {"analysis": "ok"})
+        self.assertEqual(len(attempts), 2)
+
+    def test_caps_items_and_results(self):
+        pre = PreAnalyzer(workers=2, max_items=4, max_results=3, analyze=FakeAnalyze(), dedup=False)
+        data = window(commits=5)
+        self.assertEqual(pre.schedule(data), 4)
+        pre.executor.shutdown(wait=True)
+        self.assertEqual(pre.status()["tracked"], 3)
+        self.assertEqual(item_key("commit", data["recent_commits"][0]),
+                         ("commit", data["recent_commits"][0]["url"]))
+
+    def test_cap_is_split_across_item_types(self):
+        analyze = FakeAnalyze()
+        pre = PreAnalyzer(workers=2, max_items=6, analyze=analyze, dedup=False)
+        self.assertEqual(pre.schedule(window(commits=10, issues=2, pulls=1)), 6)
+        pre.executor.shutdown(wait=True)
+        self.assertEqual(sorted(call[0] for call in analyze.calls), ["commit"] * 3 + ["issue"] * 2 + ["pull_request"])
+
+    def test_cap_applies_after_collapsing_duplicates(self):
+        pre = PreAnalyzer(workers=2, max_items=3, analyze=FakeAnalyze())
+        data = window(issues=5, pulls=2)
+        for issue in data["recent_issues"][:4]:
+            issue.update(title="[CI] Flaky test test_conv2d", body="Platforms: linux\n\nThis test was disabled")
+        data["recent_issues"][4].update(title="Crash in DataLoader with pin_memory", body="Traceback ...")
+
+        # Two distinct issues and two pull requests are left, so the cap of three drops one pull request
+        self.assertEqual(pre.schedule(data), 3)
+        pre.executor.shutdown(wait=True)
+        self.assertIsNotNone(pre.ready("issue", data["recent_issues"][4]))
+        self.assertIsNotNone(pre.ready("pull_request", data["recent_pull_requests"][0]))
+
+    def test_near_duplicates_share_the_representative_analysis(self):
+        analyze = FakeAnalyze()
+        share = lambda item_type, item_data, representative, diff=None: dict(representative, url=item_data["url"])
+        pre = PreAnalyzer(workers=2, analyze=analyze, share=share)
+        data = window(issues=4)
+        for issue in data["recent_issues"]:
+            issue.update(title="[CI] Flaky test test_conv2d", body="Platforms: linux\n\nThis test was disabled")
+        data["recent_issues"][3].update(title="Crash in DataLoader with pin_memory", body="Traceback ...")
+
+        self.assertEqual(pre.schedule(data), 2)
+        member = data["recent_issues"][2]
+        result = pre.result("issue", member)
+        self.assertEqual(result["analysis"], f"issue {data['recent_issues'][0]['url']}")
+        self.assertEqual(result["url"], member["url"])
+        pre.executor.shutdown(wait=True)
+        self.assertEqual(len(analyze.calls), 2)
+        self.assertEqual(pre.status()["shared"], 2)
+
+    def test_reverts_get_their_own_analysis(self):
+        analyze = FakeAnalyze()
+        pre = PreAnalyzer(workers=2, analyze=analyze)
+        data = window(commits=2)
+        data["recent_commits"][0]["commit"] = {"message": "Add fused adam kernel (#123)"}
+        data["recent_commits"][1]["commit"] = {"message": 'Revert "Add fused adam kernel (#123)"'}
+
+        self.assertEqual(pre.schedule(data), 2)
+        revert = data["recent_commits"][1]
+        self.assertEqual(pre.result("commit", revert)["analysis"], f"commit {revert['url']}")
+        pre.executor.shutdown(wait=True)
+        self.assertEqual(pre.status()["shared"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+# tests/test_jobs.py
+
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from jobs import DONE, FAILED, JobQueue
+
+
+def wait_finished(queue, job):
+    status = queue.wait(job.id, timeout=5)
+    while status['state'] not in (DONE, FAILED):
+        status = queue.wait(job.id, after_version=status['version'], timeout=5)
+    return status
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = JobQueue(workers=2)
+        self.addCleanup(self.queue.executor.shutdown, wait=True)
+
+    def test_duplicate_submissions_join_the_running_job(self):
+        release = threading.Event()
+        calls = []
+
+        def work(progress):
+            calls.append(1)
+            release.wait(5)
+            return "page"
+
+        first = self.queue.submit(("repo", 1), work)
+        second = self.queue.submit(("repo", 1), work)
+        other = self.queue.submit(("repo", 2), work)
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+        release.set()
+        self.assertEqual(wait_finished(self.queue, first)['state'], DONE)
+        wait_finished(self.queue, other)
+        self.assertEqual((first.result, len(calls)), ("page", 2))
+        self.assertEqual(self.queue.stats(), {"jobs": {DONE: 2}, "submitted": 3, "coalesced": 1})
+
+        # A finished job is not joined: the same key starts a new run
+        self.assertIsNot(self.queue.submit(("repo", 1), work), first)
+
+    def test_progress_and_failure(self):
+        seen = []
+        stage_reached = threading.Event()
+        release = threading.Event()
+
+        def work(progress):
+            progress("collect")
+            progress("summarize")
+            stage_reached.set()
+            release.wait(5)
+            raise RuntimeError("rate limited")
+
+        job = self.queue.submit("key", work, stages=["collect", "summarize", "render"])
+        stage_reached.wait(5)
+        status = self.queue.wait(job.id, timeout=5)
+        seen.append((status['state'], status['stage'], status['progress']))
+        release.set()
+        status = wait_finished(self.queue, job)
+        self.assertEqual(seen, [("running", "summarize", 0.33)])
+        self.assertEqual((status['state'], status['error']), (FAILED, "rate limited"))
+        self.assertIsNone(self.queue.wait("missing", timeout=0))
+
+    def test_finished_jobs_expire(self):
+        queue = JobQueue(workers=1, retention_seconds=60, max_finished=1)
+        self.addCleanup(queue.executor.shutdown, wait=True)
+        jobs = [queue.submit(n, lambda progress: n) for n in range(3)]
+        for job in jobs:
+            wait_finished(queue, job)
+        with mock.patch("jobs.time.time", return_value=jobs[-1].finished_at + 1):
+            queue.submit("new", lambda progress: None)
+        self.assertEqual([queue.get(job.id) for job in jobs[:2]], [None, None])
+        self.assertIs(queue.get(jobs[2].id), jobs[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# tests/test_llm_cache.py
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import dspy
+import llm_integration
+import llm_telemetry
+from llm_cache import LLMCache, make_key
+
+
+class FakePredict:
+    calls = 0
+
+    def __init__(self, signature):
+        self.signature = signature
+
+    def __call__(self, **inputs):
+        FakePredict.calls += 1
+        return dspy.Prediction(summary="s", priority="high", suggested_action="fix it")
+
+
+class TestLLMCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = LLMCache(os.path.join(self.tmp.name, "llm.sqlite3"))
+        # Keep the calls made here out of the real telemetry log
+        self.telemetry = mock.patch.object(llm_telemetry, "telemetry", llm_telemetry.LLMTelemetry(log_path=""))
+        self.telemetry.start()
+
+    def tearDown(self):
+        self.telemetry.stop()
+        self.tmp.cleanup()
+
+    def test_key_ignores_whitespace_noise_but_not_model(self):
+        base = make_key("IssueSummarizer", "gpt-3.5-turbo", {"title": "Crash", "body": "line\r\n"})
+        self.assertEqual(base, make_key("IssueSummarizer", "gpt-3.5-turbo", {"body": "line  \n\n", "title": " Crash"}))
+        self.assertNotEqual(base, make_key("IssueSummarizer", "gpt-4", {"title": "Crash", "body": "line"}))
+
+    def test_hit_miss_and_tokens_saved(self):
+        self.assertIsNone(self.cache.get("k"))
+        self.cache.set("k", "IssueSummarizer", "m", {"summary": "s"}, tokens=120)
+        self.assertEqual(self.cache.get("k"), {"summary": "s"})
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["tokens_saved"]), (1, 1, 120))
+
+    def test_expired_entries_are_misses(self):
+        self.cache.ttl = -1
+        self.cache.set("k", "IssueSummarizer", "m", {"summary": "s"}, tokens=1)
+        self.assertIsNone(self.cache.get("k"))
+
+    def test_size_eviction_drops_least_recently_used(self):
+        self.cache.max_bytes = 60
+        self.cache.set("a", "S", "m", {"o": "x" * 20}, tokens=1)
+        self.cache.set("b", "S", "m", {"o": "y" * 20}, tokens=1)
+        self.cache.get("a")
+        self.cache.set("c", "S", "m", {"o": "z" * 20}, tokens=1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+
+    def test_entry_points_reuse_cached_result(self):
+        FakePredict.calls = 0
+        with mock.patch.object(llm_integration, "get_llm_cache", return_value=self.cache), \
+                mock.patch.object(dspy, "Predict", FakePredict):
+            first = llm_integration.summarize_issue("Crash on start", "Traceback ...")
+            second = llm_integration.summarize_issue("Crash on start", "Traceback ...")
+
+        self.assertEqual(first, second)
+        self.assertEqual(first, {"summary": "s", "priority": "high", "suggested_action": "fix it"})
+        self.assertEqual(FakePredict.calls, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# tests/test_llm_telemetry.py
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import dspy
+import llm_integration
+import llm_telemetry
+from llm_cache import LLMCache
+from llm_telemetry import Histogram, LLMTelemetry, add_usage, in_context, run_context
+
+
+class FakePredict:
+    def __init__(self, signature):
+        self.signature = signature
+
+    def __call__(self, **inputs):
+        if inputs.get("title") == "boom":
+            raise TimeoutError("LLM timed out")
+        add_usage(120, 30)
+        return dspy.Prediction(summary="s", priority="high", suggested_action="fix it")
+
+
+class TestLLMTelemetry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.tmp.name, "llm_calls.jsonl")
+        self.telemetry = LLMTelemetry(self.log_path)
+        self.cache = LLMCache(os.path.join(self.tmp.name, "llm.sqlite3"))
+        self.patches = [
+            mock.patch.object(llm_telemetry, "telemetry", self.telemetry),
+            mock.patch.object(llm_integration, "get_llm_cache", return_value=self.cache),
+            mock.patch.object(dspy, "Predict", FakePredict),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        if self.telemetry.log is not None:
+            for handler in self.telemetry.log.handlers:
+                handler.close()
+        self.tmp.cleanup()
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram((1, 5))
+        for value in (0.5, 2, 3, 10):
+            histogram.observe(value)
+        self.assertEqual(histogram.cumulative(), [(1, 1), (5, 3), ("+Inf", 4)])
+
+    def test_calls_are_recorded_per_signature_and_run(self):
+        # The log file is only opened by the first recorded call
+        self.assertFalse(os.path.exists(self.log_path))
+        with run_context(repo="owner/repo", request="test") as usage:
+            llm_integration.summarize_issue("Crash", "Traceback ...")
+            llm_integration.summarize_issue("Crash", "Traceback ...")
+            with self.assertRaises(TimeoutError):
+                llm_integration.summarize_issue("boom", "")
+
+        stats = self.telemetry.snapshot()["IssueSummarizer"]
+        self.assertEqual(stats["calls"], 3)
+        self.assertEqual(stats["cache"], {"hit": 1, "miss": 2, "disabled": 0})
+        self.assertEqual(stats["errors"], {"TimeoutError": 1})
+        # The failed call falls back to the estimate from its inputs
+        self.assertEqual(stats["prompt_tokens"]["sum"], 120 + 1)
+        self.assertEqual(usage.summary()["completion_tokens"], 30)
+        self.assertEqual(usage.summary()["cache_hits"], 1)
+
+        events = [json.loads(line) for line in open(self.log_path)]
+        self.assertEqual([e["cache"] for e in events], ["miss", "hit", "miss"])
+        self.assertEqual({e["repo"] for e in events}, {"owner/repo"})
+        self.assertFalse(events[0]["tokens_estimated"])
+
+        text = self.telemetry.prometheus()
+        self.assertIn('llm_latency_seconds_bucket{signature="IssueSummarizer",le="+Inf"} 2', text)
+        self.assertIn('llm_errors_total{signature="IssueSummarizer",error="TimeoutError"} 1', text)
+
+    def test_worker_threads_keep_the_run(self):
+        with run_context(repo="owner/repo") as usage, ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(in_context(lambda title: llm_integration.summarize_issue(title, "")), ["a", "b", "c"]))
+        self.assertEqual(usage.summary()["calls"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
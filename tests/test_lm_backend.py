@@ -0,0 +1,75 @@
+# tests/test_lm_backend.py
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import dsp
+import dspy
+import llm_integration
+from lm_backend import LatencyModel, RecordingLM, ReplayLM, ReplayMiss
+
+
+class FakeLM(dsp.LM):
+    def __init__(self):
+        super().__init__("gpt-test")
+        self.calls = 0
+
+    def basic_request(self, prompt, **kwargs):
+        pass
+
+    def __call__(self, prompt, only_completed=True, return_sorted=False, **kwargs):
+        self.calls += 1
+        return [" it crashes\n\nPriority: high\n\nSuggested Action: fix it"]
+
+
+class TestLMBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tape = os.path.join(self.tmp.name, "tape.jsonl")
+        self.sleeps = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def predict(self, lm, title="Crash"):
+        with dspy.context(lm=lm):
+            return dspy.Predict(llm_integration.IssueSummarizer)(title=title, body="Traceback ...")
+
+    def test_replay_serves_recorded_completions(self):
+        inner = FakeLM()
+        recorded = self.predict(RecordingLM(inner, self.tape))
+        latency = LatencyModel(base_seconds=0.5, tokens_per_second=10, jitter=0)
+        replay = ReplayLM(self.tape, latency=latency, model="gpt-test", sleep=self.sleeps.append)
+        replayed = self.predict(replay)
+
+        self.assertEqual(inner.calls, 1)
+        self.assertEqual(replayed.priority, recorded.priority)
+        self.assertEqual(replayed.suggested_action, "fix it")
+        # 0.5s overhead plus the completion's tokens at 10 tokens/s
+        self.assertGreater(self.sleeps[0], 0.5)
+        self.assertEqual(replay.stats()["misses"], 0)
+        # A direct request is answered from the same tape entry
+        prompt = next(iter(replay.tape.values()))["prompt"]
+        self.assertEqual(replay.basic_request(prompt), replay(prompt))
+
+    def test_unrecorded_prompts_miss_or_are_synthesized(self):
+        with self.assertRaises(ReplayMiss):
+            self.predict(ReplayLM(self.tape, sleep=self.sleeps.append))
+
+        replay = ReplayLM(self.tape, missing="synthetic", sleep=self.sleeps.append)
+        result = self.predict(replay)
+        self.assertTrue(result.summary and result.priority and result.suggested_action)
+        self.assertEqual(replay.stats()["calls"], 1)
+
+    def test_jitter_is_deterministic_per_prompt(self):
+        latency = LatencyModel(base_seconds=1, tokens_per_second=0, jitter=0.5)
+        self.assertEqual(latency.delay("ab" * 32, 10), latency.delay("ab" * 32, 10))
+        self.assertTrue(0.5 <= latency.delay("ff" * 32, 10) <= 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
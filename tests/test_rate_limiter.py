@@ -0,0 +1,103 @@
+# tests/test_rate_limiter.py
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from rate_limiter import GitHubScheduler, RateLimitExceeded, TokenBucket, resource_for
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, remaining=None, reset=None, retry_after=None, text=""):
+        self.status_code = status_code
+        self.text = text
+        self.headers = {}
+        if remaining is not None:
+            self.headers.update({"X-RateLimit-Remaining": str(remaining), "X-RateLimit-Limit": "5000",
+                                 "X-RateLimit-Reset": str(reset or 5000), "X-RateLimit-Resource": "core"})
+        if retry_after is not None:
+            self.headers["Retry-After"] = str(retry_after)
+
+
+class TestGitHubScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = GitHubScheduler(tokens=["aaaa", "bbbb"], rate=1000, burst=1000,
+                                         max_wait=30, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_resource_for(self):
+        self.assertEqual(resource_for("https://api.github.com/graphql"), "graphql")
+        self.assertEqual(resource_for("https://api.github.com/search/issues"), "search")
+        self.assertEqual(resource_for("https://api.github.com/repos/a/b"), "core")
+
+    def test_rotates_to_token_with_most_budget(self):
+        self.scheduler.observe("aaaa", "core", FakeResponse(remaining=10))
+        self.scheduler.observe("bbbb", "core", FakeResponse(remaining=4000))
+        self.assertEqual(self.scheduler.acquire(), "bbbb")
+
+    def test_secondary_limit_retries_on_other_token(self):
+        used = []
+
+        def send(token):
+            used.append(token)
+            return FakeResponse(403, retry_after=60) if token == "aaaa" else FakeResponse(200)
+
+        self.scheduler.observe("bbbb", "core", FakeResponse(remaining=1))
+        self.scheduler.observe("aaaa", "core", FakeResponse(remaining=100))
+        response = self.scheduler.send(send)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(used, ["aaaa", "bbbb"])
+        self.assertEqual(self.scheduler.stats()["rate_limited"], 1)
+
+    def test_backs_off_until_secondary_limit_clears(self):
+        scheduler = GitHubScheduler(tokens=["aaaa"], rate=1000, burst=1000, max_wait=30,
+                                    clock=self.clock, sleep=self.clock.sleep)
+        responses = [FakeResponse(403, retry_after=10), FakeResponse(200)]
+        response = scheduler.send(lambda token: responses.pop(0))
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(self.clock.now, 1010)
+
+    def test_exhausted_pool_raises_instead_of_waiting_past_max_wait(self):
+        for token in ("aaaa", "bbbb"):
+            self.scheduler.observe(token, "core", FakeResponse(remaining=0, reset=self.clock.now + 3600))
+        with self.assertRaises(RateLimitExceeded):
+            self.scheduler.acquire()
+
+    def test_rate_limited_on_every_attempt_raises(self):
+        scheduler = GitHubScheduler(tokens=["aaaa"], rate=1000, burst=1000, max_retries=2, max_wait=30,
+                                    clock=self.clock, sleep=self.clock.sleep)
+        calls = []
+        send = lambda token: calls.append(token) or FakeResponse(429, retry_after=5)
+        with self.assertRaisesRegex(RateLimitExceeded, r"all 3 attempts; last token \.\.\.aaaa got HTTP 429 "
+                                                       r"and resets in 5s"):
+            scheduler.send(send)
+        self.assertEqual(len(calls), 3)
+
+    def test_plain_forbidden_is_not_retried(self):
+        calls = []
+        self.scheduler.send(lambda token: calls.append(token) or FakeResponse(403, remaining=100))
+        self.assertEqual(len(calls), 1)
+
+    def test_token_bucket_paces_requests(self):
+        clock = FakeClock(0.0)
+        bucket = TokenBucket(rate=2, capacity=1, clock=clock, sleep=clock.sleep)
+        for _ in range(5):
+            bucket.take()
+        self.assertAlmostEqual(clock.now, 2.0)
+
+if __name__ == '__main__':
+    unittest.main()
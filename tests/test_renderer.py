@@ -0,0 +1,71 @@
+# tests/test_renderer.py
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import renderer
+from commit_summarizer import summarize_commit
+from newsletter_generator import generate_newsletter
+from renderer import RenderCache, render
+
+
+def window(message):
+    return {
+        "repo_info": {"full_name": "o/r", "description": "<b>bold</b>", "stargazers_count": 1,
+                      "forks_count": 2, "open_issues_count": 3, "language": "Python"},
+        "start_date": "2024-09-10", "end_date": "2024-09-17",
+        "recent_commits": [{"commit": {"author": {"name": "ann"}, "message": message}}],
+        "recent_issues": [], "recent_pull_requests": [],
+    }
+
+
+class TestRenderer(unittest.TestCase):
+    def setUp(self):
+        patch = mock.patch.object(renderer, "render_cache", RenderCache())
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_newsletter_escapes_user_content(self):
+        html = generate_newsletter(window("fix <script>alert(1)</script>"))
+        self.assertIn("fix &lt;script&gt;alert(1)&lt;/script&gt;", html)
+        self.assertIn("&lt;b&gt;bold&lt;/b&gt;", html)
+        self.assertNotIn("<script>", html)
+        self.assertIn("<li>ann: 1 commits</li>", html)
+
+    def test_commit_summary_escapes_user_content(self):
+        html = summarize_commit({"sha": "0123456789abcdef", "stats": {"additions": 3, "deletions": 1},
+                                 "commit": {"author": {"name": "<i>ann</i>", "date": "2024-09-10T00:00:00Z"},
+                                            "message": "fix <script>alert(1)</script>"}})
+        self.assertIn("Commit: 0123456", html)
+        self.assertIn("fix &lt;script&gt;alert(1)&lt;/script&gt;", html)
+        self.assertIn("&lt;i&gt;ann&lt;/i&gt;", html)
+        self.assertIn("+3 -1", html)
+        self.assertNotIn("<script>", html)
+
+    def test_identical_inputs_render_once(self):
+        with mock.patch.object(renderer.env, "get_template", wraps=renderer.env.get_template) as get_template:
+            first = render("panel/message.html", message="a < b")
+            second = render("panel/message.html", message="a < b")
+            render("panel/message.html", message="a > b")
+        self.assertEqual(first, second)
+        self.assertIn("a &lt; b", first)
+        self.assertEqual(get_template.call_count, 2)
+        self.assertEqual(renderer.render_cache.stats()["hits"], 1)
+
+    def test_cache_evicts_least_recently_used(self):
+        cache = RenderCache(max_bytes=10)
+        cache.put("a", "12345")
+        cache.put("b", "12345")
+        cache.get("a")
+        cache.put("c", "12345")
+        self.assertEqual(cache.get("a"), "12345")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.stats()["bytes"], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
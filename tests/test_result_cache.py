@@ -0,0 +1,120 @@
+# tests/test_result_cache.py
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import result_cache
+from result_cache import ResultCache, is_complete, make_key, window_ttl
+
+REPO = "https://github.com/owner/repo"
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(os.path.join(self.tmp.name, "results.sqlite3"), stale_seconds=60)
+
+    def tearDown(self):
+        self.cache.executor.shutdown(wait=True)
+        self.tmp.cleanup()
+
+    def test_key_and_ttl(self):
+        key = make_key("newsletter", REPO, "2024-09-10", "2024-09-17")
+        self.assertEqual(key, make_key("newsletter", REPO + "/", date(2024, 9, 10), date(2024, 9, 17)))
+        self.assertNotEqual(key, make_key("newsletter", REPO, "2024-09-10", "2024-09-17", model="gpt-4"))
+        self.assertNotEqual(key, make_key("result_page", REPO, "2024-09-10", "2024-09-17"))
+        with mock.patch.multiple(result_cache, RESULT_CACHE_LIVE_TTL_SECONDS=10, RESULT_CACHE_CLOSED_TTL_SECONDS=1000):
+            self.assertEqual(window_ttl("2024-09-17", today=date(2024, 9, 17)), 10)
+            self.assertEqual(window_ttl("2024-09-16", today=date(2024, 9, 17)), 1000)
+        self.assertFalse(is_complete({"recent_commits": [], "recent_issues": "API rate limit exceeded",
+                                      "recent_pull_requests": []}))
+
+    def test_hits_and_uncacheable_results(self):
+        compute = mock.Mock(return_value=("<p>page</p>", True))
+        for _ in range(3):
+            self.assertEqual(self.cache.get_or_compute("newsletter", REPO, "2024-09-10", "2024-09-17", compute),
+                             "<p>page</p>")
+        self.assertEqual(compute.call_count, 1)
+        partial = mock.Mock(return_value=("<p>partial</p>", False))
+        self.cache.get_or_compute("newsletter", REPO, "2024-09-01", "2024-09-08", partial)
+        self.cache.get_or_compute("newsletter", REPO, "2024-09-01", "2024-09-08", partial)
+        self.assertEqual(partial.call_count, 2)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (2, 3, 1))
+
+    def test_stale_entries_are_served_while_one_refresh_runs(self):
+        release = threading.Event()
+        refreshed = mock.Mock(side_effect=lambda: release.wait(5) and ("new", True))
+        self.cache.get_or_compute("newsletter", REPO, "2024-09-10", "2024-09-17", lambda: ("old", True))
+        ttl = window_ttl("2024-09-17")
+        with mock.patch("result_cache.time.time", return_value=time.time() + ttl + 1):
+            values = [self.cache.get_or_compute("newsletter", REPO, "2024-09-10", "2024-09-17", refreshed)
+                      for _ in range(3)]
+            release.set()
+            self.cache.executor.shutdown(wait=True)
+            self.assertEqual(values, ["old"] * 3)
+            self.assertEqual(self.cache.lookup("newsletter", REPO, "2024-09-10", "2024-09-17", refreshed), "new")
+        self.assertEqual(refreshed.call_count, 1)
+        self.assertEqual((self.cache.stats()["stale_hits"], self.cache.stats()["refreshes"]), (3, 1))
+
+    def test_concurrent_misses_share_one_computation(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def compute():
+            started.set()
+            release.wait(5)
+            return "page", True
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            self.cache.get_or_compute("result_page", REPO, "2024-09-10", "2024-09-17", compute))) for _ in range(4)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        while self.cache.stats()["coalesced"] < 3:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, ["page"] * 4)
+        self.assertEqual(self.cache.stats()["misses"], 4)
+
+    def test_failures_reach_every_waiter(self):
+        release = threading.Event()
+
+        def compute():
+            release.wait(5)
+            raise RuntimeError("rate limited")
+
+        errors = []
+
+        def request():
+            try:
+                self.cache.get_or_compute("newsletter", REPO, "2024-09-10", "2024-09-17", compute)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=request) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        while self.cache.stats()["misses"] < 2:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(errors, ["rate limited"] * 2)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
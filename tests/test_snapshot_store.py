@@ -0,0 +1,85 @@
+# tests/test_snapshot_store.py
+
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from contextlib import closing
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from snapshot_store import SnapshotStore, migrate_json_snapshots
+
+
+def make_data(commit_shas, repo="owner/repo"):
+    return {
+        "repo_info": {"full_name": repo, "name": repo.split("/")[1]},
+        "recent_commits": [{"sha": sha, "commit": {"message": f"commit {sha}"}} for sha in commit_shas],
+        "recent_issues": "API rate limit exceeded",
+        "recent_pull_requests": [],
+    }
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = SnapshotStore(os.path.join(self.tmp.name, "snapshots.sqlite3"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_and_deduplication(self):
+        _, first_new = self.store.save("owner/repo", make_data(["a", "b"]), created_at=datetime(2024, 9, 1))
+        _, second_new = self.store.save("owner/repo", make_data(["b", "c"]), created_at=datetime(2024, 9, 2))
+
+        self.assertEqual(first_new, 3)  # two commits and repo_info
+        self.assertEqual(second_new, 1)  # only commit c is new
+        self.assertEqual(self.store.load_latest("owner/repo"), make_data(["b", "c"]))
+
+    def test_load_history_keeps_newest_version_of_each_item(self):
+        first = make_data(["a", "b"])
+        first["recent_issues"] = [{"number": 1, "state": "open"}]
+        second = make_data(["b", "c"])
+        second["recent_issues"] = [{"number": 1, "state": "closed"}, {"number": 2, "state": "open"}]
+        self.store.save("owner/repo", second, created_at=datetime(2024, 9, 2))
+        self.store.save("owner/repo", first, created_at=datetime(2024, 9, 1))
+
+        history = self.store.load_history("owner/repo")
+        self.assertEqual(sorted(c["sha"] for c in history["recent_commits"]), ["a", "b", "c"])
+        self.assertEqual(sorted((i["number"], i["state"]) for i in history["recent_issues"]),
+                         [(1, "closed"), (2, "open")])
+
+    def test_latest_is_per_repo_and_ignores_older_imports(self):
+        self.store.save("owner/repo", make_data(["new"]), created_at=datetime(2024, 9, 2))
+        self.store.save("owner/repo", make_data(["old"]), created_at=datetime(2024, 9, 1))
+        self.store.save("other/repo", make_data(["x"], "other/repo"), created_at=datetime(2024, 9, 3))
+
+        self.assertEqual(self.store.load_latest("owner/repo")["recent_commits"][0]["sha"], "new")
+        self.assertIsNone(self.store.load_latest("missing/repo"))
+
+    def test_migrate_json_snapshots(self):
+        for timestamp, shas in (("20240917_172529", ["a"]), ("20240918_174015", ["a", "b"])):
+            with open(os.path.join(self.tmp.name, f"owner_repo_{timestamp}.json"), "w") as f:
+                json.dump(make_data(shas), f, indent=2)
+
+        # Free pages left by earlier writes are reclaimed before measuring, not counted against the import
+        with closing(sqlite3.connect(self.store.path)) as conn, conn:
+            conn.execute("CREATE TABLE scratch AS SELECT randomblob(1000000) AS body")
+            conn.execute("DROP TABLE scratch")
+        report = migrate_json_snapshots(self.store, self.tmp.name)
+
+        self.assertEqual(report["files"], 2)
+        self.assertGreaterEqual(report["store_bytes"], 0)
+        self.assertEqual(len(self.store.list_snapshots("owner/repo")), 2)
+        self.assertEqual(len(self.store.load_latest("owner/repo")["recent_commits"]), 2)
+
+        # A rerun finds both snapshots already imported
+        report = migrate_json_snapshots(self.store, self.tmp.name)
+        self.assertEqual((report["files"], report["skipped"], report["store_bytes"]), (0, 2, 0))
+        self.assertEqual(len(self.store.list_snapshots("owner/repo")), 2)
+
+if __name__ == '__main__':
+    unittest.main()
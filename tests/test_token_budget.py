@@ -0,0 +1,36 @@
+# tests/test_token_budget.py
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from token_budget import estimate_tokens, pack_chunks
+
+
+def messages(start, end):
+    return [f"Fix issue {n} in the scheduler and add a regression test" for n in range(start, end)]
+
+
+class TestPackChunks(unittest.TestCase):
+    def test_chunks_respect_budget_and_keep_order(self):
+        texts = messages(0, 400) + ["x" * 10000]
+        chunks = pack_chunks(texts, max_tokens=300)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(sum(estimate_tokens(t) + 1 for t in chunk), 300)
+        flat = [t for chunk in chunks for t in chunk]
+        self.assertEqual(flat[:400], texts[:400])
+        self.assertEqual(len(flat[-1]), 299 * 4)
+
+    def test_shifted_window_reuses_inner_chunks(self):
+        week = pack_chunks(messages(0, 400), max_tokens=300)
+        shifted = pack_chunks(messages(50, 450), max_tokens=300)
+        shared = set(map(tuple, week)) & set(map(tuple, shifted))
+        # Only the chunks at the two ends of the window may differ
+        self.assertGreaterEqual(len(shared), len(week) - 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
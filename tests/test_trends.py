@@ -0,0 +1,99 @@
+# tests/test_trends.py
+
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_collector import GitHubDataCollector
+from http_cache import HTTPCache
+from snapshot_store import SnapshotStore
+from trends import TrendFrame, load_frame, repo_trends, weekly_trends
+
+
+def commit(sha, author, date):
+    return {"sha": sha, "commit": {"author": {"name": author}, "committer": {"date": date}, "message": sha}}
+
+
+def issue(number, created, closed=None):
+    return {"number": number, "title": f"issue {number}", "created_at": created, "closed_at": closed,
+            "state": "closed" if closed else "open"}
+
+
+# Mondays 2024-09-02, 09-09 and 09-16
+HISTORY = {
+    "recent_commits": [commit("a1", "ann", "2024-09-03T10:00:00Z"), commit("b1", "bob", "2024-09-04T10:00:00Z"),
+                       commit("a2", "ann", "2024-09-10T10:00:00Z"), commit("c1", "cat", "2024-09-11T10:00:00Z"),
+                       commit("c2", "cat", "2024-09-17T10:00:00Z")],
+    "recent_issues": [issue(1, "2024-09-02T00:00:00Z", "2024-09-12T00:00:00Z"),
+                      issue(2, "2024-09-09T00:00:00Z", "2024-09-13T00:00:00Z"),
+                      issue(3, "2024-09-16T00:00:00Z"),
+                      dict(issue(4, "2024-09-16T00:00:00Z"), pull_request={})],
+    "recent_pull_requests": [{"number": 5, "created_at": "2024-09-10T00:00:00Z", "merged_at": "2024-09-17T00:00:00Z"}],
+}
+
+
+class TestTrends(unittest.TestCase):
+    def test_weekly_metrics(self):
+        trends = weekly_trends(TrendFrame.from_history(HISTORY), weeks=8, window=2)
+        self.assertEqual(trends["weeks"], ["2024-09-02", "2024-09-09", "2024-09-16"])
+        self.assertEqual(trends["commits"], [2, 2, 1])
+        self.assertEqual(trends["commits_rolling"], [1.0, 2.0, 1.5])
+        self.assertEqual(trends["issues_opened"], [1, 1, 1])
+        self.assertEqual(trends["issues_closed"], [0, 2, 0])
+        self.assertEqual(trends["median_days_to_close"], [None, 7.0, None])
+        self.assertEqual(trends["pull_requests_merged"], [0, 0, 1])
+        self.assertEqual(trends["active_contributors"], [2, 2, 1])
+        self.assertEqual(trends["new_contributors"], [0, 1, 0])
+        self.assertEqual(trends["churned_contributors"], [0, 1, 1])
+
+    def test_frame_cache_follows_new_snapshots(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SnapshotStore(os.path.join(tmp, "snapshots.sqlite3"))
+            cache_dir = os.path.join(tmp, "trends")
+            early = {key: value[:2] for key, value in HISTORY.items()}
+            store.save("o/r", early, created_at=datetime(2024, 9, 10))
+            self.assertEqual(len(load_frame(store, "o/r", cache_dir).commit_time), 2)
+
+            store.save("o/r", HISTORY, created_at=datetime(2024, 9, 17))
+            frame = load_frame(store, "o/r", cache_dir)
+            self.assertEqual(len(frame.commit_time), 5)
+            self.assertEqual(sorted(frame.authors.tolist()), ["ann", "bob", "cat"])
+            self.assertIsNone(load_frame(store, "o/other", cache_dir))
+            self.assertEqual(os.listdir(cache_dir), ["o_r.npz"])
+
+            # A truncated cache file is rebuilt from the stored snapshots
+            with open(os.path.join(cache_dir, "o_r.npz"), "r+b") as f:
+                f.truncate(100)
+            self.assertEqual(len(load_frame(store, "o/r", cache_dir).commit_time), 5)
+
+    def test_each_collection_only_merges_its_own_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            collector = GitHubDataCollector("https://github.com/o/r", max_workers=1,
+                                            http_cache=HTTPCache(os.path.join(tmp, "http")))
+            collector.snapshot_store = store = SnapshotStore(os.path.join(tmp, "snapshots.sqlite3"))
+            cache_dir = os.path.join(tmp, "trends")
+            week_one = {"repo_info": {"full_name": "o/r"}, "recent_commits": HISTORY["recent_commits"][:2],
+                        "recent_issues": [issue(1, "2024-09-02T00:00:00Z")], "recent_pull_requests": []}
+            week_two = {"repo_info": {"full_name": "o/r"}, "recent_commits": HISTORY["recent_commits"][2:],
+                        "recent_issues": HISTORY["recent_issues"], "recent_pull_requests": HISTORY["recent_pull_requests"]}
+
+            with mock.patch.object(store, "load_history", wraps=store.load_history) as load_history:
+                for window in (week_one, week_two):
+                    with mock.patch.object(collector, "_run_concurrently", return_value=window):
+                        collector.collect_data(datetime(2024, 9, 1), datetime(2024, 9, 18))
+                    trends = repo_trends(store, "o/r", weeks=8, window=2, cache_dir=cache_dir)
+            first_id = store.list_snapshots("o/r")[0]["id"]
+            self.assertEqual([call.kwargs.get("after_id") for call in load_history.call_args_list], [None, first_id])
+
+            # Issue 1 was open in the first snapshot and closed in the second: only the newer row counts
+            self.assertEqual(trends, weekly_trends(TrendFrame.from_history(HISTORY), weeks=8, window=2))
+            self.assertEqual(trends["issues_closed"], [0, 2, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()